@@ -0,0 +1,74 @@
+"""Parse and serialize time of config.json for each available JSON codec.
+
+    python -m benchmarks.codecs --sizes 1000 100000 --repeat 5
+
+Codecs whose library is not installed are left out.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from typing import Any, Callable, List
+
+from benchmarks.run import build_config
+from pls_cli.utils.codec import CODECS, Codec, load_codec
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+
+
+def median_time(
+    function: Callable[[Any], object], argument: Any, repeat: int
+) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(argument)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def available_codecs() -> List[Codec]:
+    codecs = []
+    for name in CODECS:
+        try:
+            codecs.append(load_codec(name))
+        except ImportError:
+            print(f'{name} is not installed, skipped', file=sys.stderr)
+    return codecs
+
+
+def benchmark(sizes: List[int], repeat: int) -> None:
+    codecs = available_codecs()
+    print(
+        f'{"tasks":>9} {"codec":<8} {"parse":>10} {"dump":>10} '
+        f'{"dump compact":>13} {"size":>10} {"compact":>10}'
+    )
+    for size in sizes:
+        document = build_config(size)
+        pretty = Codec().dumps(document)
+        for codec in codecs:
+            parse = median_time(codec.loads, pretty, repeat)
+            dump = median_time(codec.dumps, document, repeat)
+            dump_compact = median_time(codec.dumps_compact, document, repeat)
+            compact_size = len(codec.dumps_compact(document))
+            print(
+                f'{size:>9} {codec.name:<8} {parse * 1000:>7.1f} ms '
+                f'{dump * 1000:>7.1f} ms {dump_compact * 1000:>10.1f} ms '
+                f'{len(pretty) / 1024:>6.0f} KiB '
+                f'{compact_size / 1024:>6.0f} KiB'
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=DEFAULT_SIZES, metavar='N'
+    )
+    parser.add_argument('--repeat', type=int, default=5)
+    options = parser.parse_args()
+    benchmark(options.sizes, options.repeat)
+
+
+if __name__ == '__main__':
+    main()
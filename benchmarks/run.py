@@ -0,0 +1,259 @@
+"""Latency and peak memory of pls commands across task list sizes.
+
+Every command runs in a fresh process against a synthetic config, the
+way it runs from a shell. Results are printed as a table and saved as
+JSON; pass an earlier results file with `--compare` to see the ratios.
+
+    python -m benchmarks.run --sizes 10 1000 --repeat 3
+
+Linux and macOS only, peak memory comes from wait4().
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+from pls_cli.utils.ranks import balanced_ranks
+from pls_cli.utils.task_ids import format_task_id
+
+DEFAULT_SIZES = [10, 1_000, 100_000, 1_000_000]
+
+# Name -> pls arguments, `{last}` is the position of the last task. The
+# first one only starts the CLI, without touching the tasks.
+COMMANDS: Dict[str, List[str]] = {
+    'cold start': ['version'],
+    'pls': [],
+    'tasks': ['tasks'],
+    'add': ['add', 'Benchmark task'],
+    'done': ['done', '1'],
+    'move': ['move', '{last}', '1'],
+    'clean': ['clean'],
+    'count-undone': ['count-undone'],
+}
+
+# Commands that change the config, which is put back before each run.
+WRITING_COMMANDS = {'add', 'done', 'move', 'clean'}
+
+# Answer to the confirmation prompts, like the one of `clean`.
+CONFIRM = b'y\n'
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCHMARKS_DIR, 'results')
+
+
+def write_config(path: str, size: int) -> None:
+    with open(path, 'w', encoding='utf-8') as config_file:
+        json.dump(build_config(size), config_file, indent=2)
+
+
+def build_config(size: int) -> dict:
+    return {
+        'user_name': 'Benchmark',
+        'initial_setup_done': True,
+        'show_task_progress': True,
+        'show_quotes': True,
+        'last_task_id': size,
+        'tasks': [
+            {
+                'id': format_task_id(number),
+                'name': f'Synthetic task number {number}',
+                'done': number % 3 == 0,
+                'rank': rank,
+            }
+            for number, rank in zip(range(1, size + 1), balanced_ranks(size))
+        ],
+    }
+
+
+def child_env(**variables: str) -> Dict[str, str]:
+    # The pls_cli of this checkout, installed or not.
+    python_path = [os.path.dirname(BENCHMARKS_DIR), os.getenv('PYTHONPATH')]
+    return dict(
+        os.environ,
+        PYTHONPATH=os.pathsep.join(filter(None, python_path)),
+        **variables,
+    )
+
+
+def run_pls(home: str, args: List[str]) -> Tuple[float, int]:
+    """Wall time in seconds and peak RSS in KiB of one pls run."""
+    env = child_env(HOME=home, USERPROFILE=home, COLUMNS='100')
+    with tempfile.TemporaryFile() as stdin, tempfile.TemporaryFile() as stderr:
+        stdin.write(CONFIRM)
+        stdin.seek(0)
+        start = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'pls_cli', *args],
+            env=env,
+            stdin=stdin,
+            stdout=subprocess.DEVNULL,
+            stderr=stderr,
+        )
+        _, status, usage = os.wait4(process.pid, 0)
+        elapsed = time.perf_counter() - start
+        process.returncode = os.waitstatus_to_exitcode(status)
+        if process.returncode:
+            stderr.seek(0)
+            raise RuntimeError(
+                f'pls {" ".join(args)} failed:\n{stderr.read().decode()}'
+            )
+    # Bytes on macOS, KiB on Linux.
+    peak = usage.ru_maxrss
+    return elapsed, peak // 1024 if sys.platform == 'darwin' else peak
+
+
+class Sandbox:
+    """A HOME with a config of `size` tasks that can be reset cheaply."""
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.home = tempfile.mkdtemp(prefix=f'pls-bench-{size}-')
+        self.config_dir = os.path.join(self.home, '.config', 'pls')
+        self.pristine = os.path.join(self.home, 'pristine')
+        os.makedirs(self.config_dir)
+        # Built in another process: pls runs are forked from this one and
+        # their peak RSS would include a big config left in its heap.
+        subprocess.run(
+            [
+                sys.executable,
+                '-c',
+                'import sys\n'
+                'from benchmarks.run import write_config\n'
+                'write_config(sys.argv[1], int(sys.argv[2]))',
+                os.path.join(self.config_dir, 'config.json'),
+                str(size),
+            ],
+            env=child_env(),
+            check=True,
+        )
+        # Builds the status cache and the quotes index once, so every run
+        # measures the steady state.
+        run_pls(self.home, ['count-undone'])
+        run_pls(self.home, [])
+        shutil.copytree(self.config_dir, self.pristine)
+
+    def reset(self) -> None:
+        shutil.rmtree(self.config_dir)
+        # copytree keeps the mtimes, so the status cache stays valid.
+        shutil.copytree(self.pristine, self.config_dir)
+
+    def remove(self) -> None:
+        shutil.rmtree(self.home)
+
+
+def benchmark(sizes: List[int], repeat: int) -> List[dict]:
+    results = []
+    for size in sizes:
+        print(f'Preparing {size} tasks...', file=sys.stderr)
+        sandbox = Sandbox(size)
+        try:
+            for name, args in COMMANDS.items():
+                args = [arg.format(last=size) for arg in args]
+                timings, peaks = [], []
+                for _ in range(repeat):
+                    if name in WRITING_COMMANDS:
+                        sandbox.reset()
+                    elapsed, peak = run_pls(sandbox.home, args)
+                    timings.append(elapsed)
+                    peaks.append(peak)
+                results.append(
+                    {
+                        'size': size,
+                        'command': name,
+                        'min_seconds': min(timings),
+                        'median_seconds': statistics.median(timings),
+                        'peak_rss_kib': max(peaks),
+                    }
+                )
+                print_result(results[-1])
+        finally:
+            sandbox.remove()
+    return results
+
+
+def print_result(result: dict, baseline: Optional[dict] = None) -> None:
+    line = (
+        f'{result["size"]:>9} {result["command"]:<13} '
+        f'{result["median_seconds"] * 1000:>10.1f} ms '
+        f'{result["peak_rss_kib"] / 1024:>8.1f} MiB'
+    )
+    if baseline is not None:
+        line += (
+            f'  x{result["median_seconds"] / baseline["median_seconds"]:.2f}'
+            f' time, x{result["peak_rss_kib"] / baseline["peak_rss_kib"]:.2f}'
+            ' memory'
+        )
+    print(line)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: List[dict], baseline_path: str) -> None:
+    with open(baseline_path, encoding='utf-8') as baseline_file:
+        baseline = {
+            (result['size'], result['command']): result
+            for result in json.load(baseline_file)['results']
+        }
+    print(f'\nCompared with {baseline_path}:')
+    for result in results:
+        previous = baseline.get((result['size'], result['command']))
+        if previous is not None:
+            print_result(result, previous)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=DEFAULT_SIZES, metavar='N'
+    )
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument(
+        '--output', help='Results file, by default results/<commit>.json.'
+    )
+    parser.add_argument('--compare', help='Earlier results file.')
+    options = parser.parse_args()
+
+    commit = git_commit()
+    results = benchmark(options.sizes, options.repeat)
+    output = options.output or os.path.join(
+        RESULTS_DIR, f'{commit or "results"}.json'
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as output_file:
+        json.dump(
+            {
+                'commit': commit,
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'storage': os.getenv('PLS_STORAGE', 'json'),
+                'repeat': options.repeat,
+                'results': results,
+            },
+            output_file,
+            indent=2,
+        )
+    print(f'\nSaved to {output}', file=sys.stderr)
+    if options.compare:
+        compare(results, options.compare)
+
+
+if __name__ == '__main__':
+    main()
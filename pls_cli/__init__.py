@@ -1,8 +1,3 @@
-try:
-    from importlib.metadata import (
-        version,  # type: ignore[no-redef] # Python 3.8+
-    )
-except ImportError:
-    from importlib_metadata import version  # type: ignore[no-redef]
-
-__version__ = version('pls-cli')
+# Kept as a literal so reading it costs nothing at startup; the package
+# version is read from here at build time (see [tool.hatch.version]).
+__version__ = '0.4.1'
@@ -0,0 +1,3 @@
+from pls_cli.main import main
+
+main()
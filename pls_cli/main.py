@@ -0,0 +1,48 @@
+import sys
+
+from pls_cli.utils.settings import ConflictError, Settings, wait_for_writes
+from pls_cli.utils.status import format_status
+
+# Commands polled by shell prompts and status lines. They are answered
+# from the status cache, without importing typer and rich.
+INTEGRATION_COMMANDS = {
+    'count-done': lambda status: status['done'],
+    'count-undone': lambda status: status['undone'],
+    'status': format_status,
+}
+
+
+def main() -> None:
+    args = sys.argv[1:]
+    if len(args) == 1 and args[0] in INTEGRATION_COMMANDS:
+        print(INTEGRATION_COMMANDS[args[0]](Settings().get_status()))
+        return
+
+    if not args:
+        from pls_cli.utils import greeting
+
+        if greeting.is_enabled() and greeting.print_cached(Settings()):
+            return
+
+    from pls_cli.utils import daemon
+
+    if daemon.is_forwarded(args):
+        reply = daemon.forward(Settings().socket_path, args)
+        if reply is not None:
+            sys.stdout.write(reply['output'])
+            sys.exit(reply['exit_code'])
+
+    from pls_cli.utils.profile import phase
+
+    with phase('import cli'):
+        from pls_cli.please import app
+
+    try:
+        app()
+    except ConflictError as error:
+        print(error, file=sys.stderr)
+        sys.exit(1)
+    finally:
+        # Commands print their output before config.json is written, an
+        # error writing it still has to fail the command.
+        wait_for_writes()
@@ -1,52 +1,130 @@
+import contextlib
 import datetime
+import io
 import json
 import os
 import shutil
-from typing import Union
+import sys
+import traceback
+from collections import deque
+from itertools import islice
+from typing import (
+    Annotated,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import typer
 from rich import box
 from rich.align import Align
-from rich.console import Console, RenderableType
-from rich.markdown import Markdown
-from rich.progress import BarColumn, MofNCompleteColumn, Progress
+from rich.console import Console
+from rich.errors import MarkupError, StyleSyntaxError
+from rich.progress_bar import ProgressBar
 from rich.rule import Rule
+from rich.style import Style
 from rich.table import Table
+from rich.text import Span, Text
 
 from pls_cli import __version__
+from pls_cli.utils import daemon, durability, greeting, lists
+from pls_cli.utils.journal import apply_change
+from pls_cli.utils.profile import phase, profiled
 from pls_cli.utils.quotes import get_rand_quote
-from pls_cli.utils.settings import Settings
+from pls_cli.utils.ranks import appended_rank, moved_rank, rebalance_ranks
+from pls_cli.utils.settings import Settings, get_config_path, wait_for_writes
+from pls_cli.utils.status import format_status
+from pls_cli.utils.task_ids import new_task_ids
+from pls_cli.utils.theme import DEFAULT_THEME, load_theme, parse_style
+
+try:
+    from click import ClickException
+except ImportError:  # typer 0.22 and later ship their own click
+    from typer._click.exceptions import ClickException
 
 app = typer.Typer(rich_markup_mode='rich')
 console = Console()
 
-error_line_style = os.getenv('PLS_ERROR_LINE_STYLE', '#e56767')
-error_text_style = os.getenv('PLS_ERROR_TEXT_STYLE', '#ff0000 bold')
+# The styles in use, bound by `bind_theme`.
+theme: Dict[str, Style] = {}
+
+error_line_style: Style
+error_text_style: Style
+warning_line_style: Style
+warning_text_style: Style
+update_line_style: Style
+update_text_style: Style
+insert_or_delete_line_style: Style
+insert_or_delete_text_style: Style
+msg_pending_style: Style
+table_header_style: Style
+task_done_style: Style
+task_pending_style: Style
+header_greetings_style: Style
+quote_style: Style
+author_style: Style
+background_bar_style: Style
+complete_bar_style: Style
+finished_bar_style: Style
+
+# Done tasks and their IDs are struck through.
+task_done_struck_style: Style
+task_done_mark_style = Style.parse('#bbf2b3')
+
+
+def bind_theme() -> None:
+    """Bind the styles to theme.json as it is now.
+
+    `pls serve` binds them again for every command it answers, so theme
+    edits show up without restarting it. The file is only compiled again
+    once it changed.
+    """
+    global theme
+    global error_line_style, error_text_style
+    global warning_line_style, warning_text_style
+    global update_line_style, update_text_style
+    global insert_or_delete_line_style, insert_or_delete_text_style
+    global msg_pending_style, table_header_style
+    global task_done_style, task_pending_style, task_done_struck_style
+    global header_greetings_style, quote_style, author_style
+    global background_bar_style, complete_bar_style, finished_bar_style
+    loaded = load_theme(os.path.join(get_config_path(), 'theme.json'))
+    if loaded is theme:
+        return
+    theme = loaded
+    error_line_style = theme['PLS_ERROR_LINE_STYLE']
+    error_text_style = theme['PLS_ERROR_TEXT_STYLE']
 
-warning_line_style = os.getenv('PLS_WARNING_LINE_STYLE', '#FFBF00')
-warning_text_style = os.getenv('PLS_WARNING_TEXT_STYLE', '#FFBF00 bold')
+    warning_line_style = theme['PLS_WARNING_LINE_STYLE']
+    warning_text_style = theme['PLS_WARNING_TEXT_STYLE']
 
-update_line_style = os.getenv('PLS_UPDATE_LINE_STYLE', '#61E294')
-update_text_style = os.getenv('PLS_UPDATE_TEXT_STYLE', '#61E294 bold')
+    update_line_style = theme['PLS_UPDATE_LINE_STYLE']
+    update_text_style = theme['PLS_UPDATE_TEXT_STYLE']
 
-insert_or_delete_line_style = os.getenv(
-    'PLS_INSERT_DELETE_LINE_STYLE', '#bb93f2'
-)
-insert_or_delete_text_style = os.getenv(
-    'PLS_INSERT_DELETE_TEXT_STYLE', '#a0a0a0'
-)
+    insert_or_delete_line_style = theme['PLS_INSERT_DELETE_LINE_STYLE']
+    insert_or_delete_text_style = theme['PLS_INSERT_DELETE_TEXT_STYLE']
 
-msg_pending_style = os.getenv('PLS_MSG_PENDING_STYLE', '#61E294')
-table_header_style = os.getenv('PLS_TABLE_HEADER_STYLE', '#d77dd8')
-task_done_style = os.getenv('PLS_TASK_DONE_STYLE', '#a0a0a0')
-task_pending_style = os.getenv('PLS_TASK_PENDING_STYLE', '#bb93f2')
-header_greetings_style = os.getenv('PLS_HEADER_GREETINGS_STYLE', '#FFBF00')
-quote_style = os.getenv('PLS_QUOTE_STYLE', '#a0a0a0')
-author_style = os.getenv('PLS_AUTHOR_STYLE', '#a0a0a0')
+    msg_pending_style = theme['PLS_MSG_PENDING_STYLE']
+    table_header_style = theme['PLS_TABLE_HEADER_STYLE']
+    task_done_style = theme['PLS_TASK_DONE_STYLE']
+    task_pending_style = theme['PLS_TASK_PENDING_STYLE']
+    header_greetings_style = theme['PLS_HEADER_GREETINGS_STYLE']
+    quote_style = theme['PLS_QUOTE_STYLE']
+    author_style = theme['PLS_AUTHOR_STYLE']
 
-background_bar_style = os.getenv('PLS_BACKGROUND_BAR_STYLE', 'bar.back')
-complete_bar_style = os.getenv('PLS_COMPLETE_BAR_STYLE', 'bar.complete')
-finished_bar_style = os.getenv('PLS_FINISHED_BAR_STYLE', 'bar.finished')
+    background_bar_style = theme['PLS_BACKGROUND_BAR_STYLE']
+    complete_bar_style = theme['PLS_COMPLETE_BAR_STYLE']
+    finished_bar_style = theme['PLS_FINISHED_BAR_STYLE']
+
+    task_done_struck_style = task_done_style + Style(strike=True)
+
+
+bind_theme()
 
 
 def get_terminal_full_width() -> int:
@@ -79,34 +157,38 @@ def print_no_pending_tasks() -> None:
     )
 
 
-class CenteredProgress(Progress):
-    def get_renderable(self) -> RenderableType:
-        return Align.center(super().get_renderable())
-
-
 def print_tasks_progress() -> None:
-    if Settings().show_tasks_progress():
-        with CenteredProgress(
-            BarColumn(
-                bar_width=get_terminal_center_width(),
+    """Print the tasks progress bar.
+
+    Drawn once as a static renderable, the bar never changes while it is on
+    screen so there is no need for a live display and its refresh thread.
+    """
+    settings = Settings()
+    if settings.show_tasks_progress():
+        qty_done = settings.count_tasks_done()
+        qty_total = qty_done + settings.count_tasks_undone()
+        progress = Table.grid(padding=(0, 1))
+        progress.add_row(
+            ProgressBar(
+                total=qty_total,
+                completed=qty_done,
+                width=get_terminal_center_width(),
                 style=background_bar_style,
                 complete_style=complete_bar_style,
                 finished_style=finished_bar_style,
             ),
-            MofNCompleteColumn(),
-        ) as progress:
-            qty_done = Settings().count_tasks_done()
-            qty_undone = Settings().count_tasks_undone()
-            task1 = progress.add_task('Progress', total=qty_done + qty_undone)
-            progress.update(task1, advance=qty_done)
+            Text(
+                f'{qty_done:{len(str(qty_total))}d}/{qty_total}',
+                style='progress.download',
+            ),
+        )
+        center_print(progress)
 
 
 @app.command('tasks-progress', rich_help_panel='Utils and Configs')
 def tasks_progress(show: bool = True) -> None:
     """Show tasks progress 🎯"""
-    settings = Settings().get_settings()
-    settings['show_task_progress'] = show
-    Settings().write_settings(settings)
+    Settings().set_config('show_task_progress', show)
     center_print(
         Rule(
             'Thanks for letting me know that!',
@@ -119,9 +201,7 @@ def tasks_progress(show: bool = True) -> None:
 @app.command('quotes', rich_help_panel='Utils and Configs')
 def quotes(show: bool = True) -> None:
     """Show quotes 🏷"""
-    settings = Settings().get_settings()
-    settings['show_quotes'] = show
-    Settings().write_settings(settings)
+    Settings().set_config('show_quotes', show)
     center_print(
         Rule(
             'Thanks for letting me know that!',
@@ -131,71 +211,291 @@ def quotes(show: bool = True) -> None:
     )
 
 
+# Above this many tasks, `pls tasks` piped to another program prints plain
+# rows as it reads them instead of building the whole table first.
+STREAM_TASKS_THRESHOLD = 1000
+
+
+def select_tasks(
+    tasks: Iterable[dict],
+    page: Optional[int] = None,
+    page_size: int = 20,
+    head: Optional[int] = None,
+    tail: Optional[int] = None,
+    pending_only: bool = False,
+) -> Iterable[Tuple[int, dict]]:
+    """Lazily pick the (position, task) pairs to show.
+
+    Positions are the 1-based IDs of the full list, so they can still be
+    given to `done` or `del`. Only the selected tasks are ever held.
+    """
+    selected: Iterable[Tuple[int, dict]] = enumerate(tasks, 1)
+    if pending_only:
+        selected = (
+            (position, task) for position, task in selected if not task['done']
+        )
+    if page is not None:
+        selected = islice(selected, (page - 1) * page_size, page * page_size)
+    if head is not None:
+        selected = islice(selected, head)
+    if tail is not None:
+        selected = deque(selected, maxlen=tail)
+    return selected
+
+
 @app.command('tasks', short_help='Show all Tasks :open_book:')
 @app.command(short_help='[s]Show all Tasks :open_book:[/]', deprecated=True)
-def showtasks() -> None:
+@profiled('showtasks')
+def showtasks(
+    page: Annotated[
+        Optional[int], typer.Option(min=1, help='Show only this page.')
+    ] = None,
+    page_size: Annotated[int, typer.Option(min=1, help='Tasks per page.')] = 20,
+    head: Annotated[
+        Optional[int], typer.Option(min=1, help='Show only the first N.')
+    ] = None,
+    tail: Annotated[
+        Optional[int], typer.Option(min=1, help='Show only the last N.')
+    ] = None,
+    pending_only: Annotated[
+        bool, typer.Option(help='Hide the tasks already done.')
+    ] = False,
+    ids: Annotated[
+        bool, typer.Option(help='Show the @ IDs that never change.')
+    ] = False,
+    pager: Annotated[
+        Optional[bool],
+        typer.Option(
+            help='Page through the tasks, by default when they overflow.',
+            show_default=False,
+        ),
+    ] = None,
+) -> None:
     """Show all Tasks :open_book:"""
+    settings = Settings()
+    tasks = select_tasks(
+        settings.iter_tasks(), page, page_size, head, tail, pending_only
+    )
+    qty_undone = settings.count_tasks_undone()
+    qty_total = settings.count_tasks_done() + qty_undone
+
+    if not console.is_terminal and qty_total > STREAM_TASKS_THRESHOLD:
+        for position, task in tasks:
+            columns = [
+                str(position),
+                task['name'],
+                '✓' if task['done'] else '○',
+            ]
+            if ids:
+                columns.insert(1, f'@{task.get("id", "")}')
+            typer.echo('\t'.join(columns))
+        return
+
+    with phase('build table'):
+        task_table = build_task_table(tasks, ids)
+        if settings.list_name != lists.DEFAULT_LIST:
+            task_table.title = settings.list_name
+
+    with phase('render table'):
+        if pager is None:
+            pager = (
+                console.is_terminal and task_table.row_count > console.height
+            )
+        if pager:
+            with console.pager(styles=True):
+                center_print(task_table)
+        else:
+            center_print(task_table)
+
+    if page is not None:
+        qty_shown = qty_undone if pending_only else qty_total
+        center_print(
+            f'[{table_header_style}]Page {page} of '
+            f'{max(1, -(-qty_shown // page_size))}[/]'
+        )
+
+    if settings.all_tasks_done():
+        print_no_pending_tasks()
+
+    print_tasks_progress()
+
+
+def styled(text: str, style: Style) -> Text:
+    """`text` in `style`, as markup would style it.
+
+    Text's own style would also paint the padding of its table cell.
+    """
+    return Text(text, spans=[Span(0, len(text), style)])
+
+
+def task_text(name: str, style: Style) -> Text:
+    """A task name in `style`, formatted by the markup it holds.
+
+    Names without markup skip the markup parser. Brackets that don't name
+    a style rich knows, like in `[todo] Fix list[int]`, are shown as typed.
+    """
+    if '[' not in name and ':' not in name:
+        return styled(name, style)
+    try:
+        text = Text.from_markup(name)
+        for span in text.spans:
+            if isinstance(span.style, str):
+                parse_style(span.style)
+    except (MarkupError, StyleSyntaxError):
+        return styled(name, style)
+    text.stylize_before(style)
+    return text
+
+
+def build_task_table(tasks: Iterable[Tuple[int, dict]], ids: bool) -> Table:
     task_table = Table(
         header_style=table_header_style,
+        title_style=table_header_style,
         style=table_header_style,
         box=box.SIMPLE_HEAVY,
     )
 
     task_table.add_column('ID', justify='center')
+    if ids:
+        task_table.add_column('@ID', justify='center')
     task_table.add_column('TASK')
     task_table.add_column('STATUS', justify='center')
 
-    for index, task in enumerate(Settings().get_tasks()):
+    for position, task in tasks:
         if task['done']:
-            task_name = f'[{task_done_style}][s]{task["name"]}[/][/]'
-            task_status = '[#bbf2b3]✓[/]'
-            task_id = f'[{task_done_style}][s]{str(index + 1)}[/][/]'
+            style, struck_style = task_done_style, task_done_struck_style
+            task_status = styled('✓', task_done_mark_style)
         else:
-            task_name = f'[{task_pending_style}]{task["name"]}[/]'
-            task_status = f'[{task_pending_style}]○[/]'
-            task_id = f'[{task_pending_style}]{str(index + 1)}[/]'
-
-        task_table.add_row(task_id, task_name, task_status)
-    center_print(task_table)
-
-    if Settings().all_tasks_done():
-        print_no_pending_tasks()
-
-    print_tasks_progress()
+            style = struck_style = task_pending_style
+            task_status = styled('○', task_pending_style)
+        task_id = styled(str(position), struck_style)
+        task_name = task_text(task['name'], struck_style)
+
+        if ids:
+            task_table.add_row(
+                task_id,
+                styled(f'@{task.get("id", "")}', style),
+                task_name,
+                task_status,
+            )
+        else:
+            task_table.add_row(task_id, task_name, task_status)
+    return task_table
 
 
+@profiled('print_tasks')
 def print_tasks(force_print: bool = False) -> None:
     center_print(' ')
     if not Settings().all_tasks_done() or force_print:
-        showtasks()
+        showtasks(pager=False)
     else:
         print_no_pending_tasks()
         print_tasks_progress()
 
 
+def resolve_task_id(task_id: str) -> int:
+    """1-based position of a task given by position or by `@` task ID.
+
+    Raises ValueError for an unknown task ID or a malformed position.
+    """
+    if task_id.startswith('@'):
+        try:
+            return Settings().get_task_position(task_id[1:]) + 1
+        except KeyError:
+            raise ValueError(f'Unknown task ID: {task_id}') from None
+    return int(task_id)
+
+
+def parse_task_ids(task_ids: List[str], tasks_count: int) -> List[int]:
+    """Turn IDs and ranges like `1 3 7-20 @k2` into 0-based task indexes.
+
+    Raises ValueError if any of them is not the ID of an existing task.
+    """
+    indexes: List[int] = []
+    for task_id in task_ids:
+        if task_id.startswith('@'):
+            start = end = resolve_task_id(task_id)
+        else:
+            first, _, last = task_id.partition('-')
+            start, end = int(first), int(last or first)
+        if not 1 <= start <= end <= tasks_count:
+            raise ValueError(f'Invalid task ID: {task_id}')
+        indexes.extend(range(start - 1, end))
+    return list(dict.fromkeys(indexes))
+
+
+def read_tasks(tasks: List[str]) -> List[str]:
+    """Expand `-` into the tasks read from stdin, one per line."""
+    names: List[str] = []
+    for task in tasks:
+        if task == '-':
+            names.extend(line.strip() for line in sys.stdin if line.strip())
+        else:
+            names.append(task)
+    return names
+
+
 @app.command()
-def add(task: str) -> None:
+def add(tasks: List[str]) -> None:
     """
-    [bold green]Add[/bold green] a Task :sparkles:
-    [light_slate_grey italic](Add task name inside quotes)[/]
+    [bold green]Add[/bold green] Tasks :sparkles:
+    [light_slate_grey italic](Add task names inside quotes, - reads stdin)[/]
     """
-    new_task = {'name': task, 'done': False}
+    names = read_tasks(tasks)
+    if not names:
+        center_print(
+            Rule('No Updates Made', style=warning_line_style),
+            style=warning_text_style,
+        )
+        return
+
     settings = Settings().get_settings()
-    settings['tasks'].append(new_task)
-    Settings().write_settings(settings)
+    new_tasks = []
+    rebalanced = False
+    for task_id, name in zip(new_task_ids(settings, len(names)), names):
+        rank = appended_rank(settings['tasks'])
+        if rank is None:
+            rebalance_ranks(settings['tasks'])
+            rank = appended_rank(settings['tasks'])
+            rebalanced = True
+        task = {'id': task_id, 'name': name, 'done': False, 'rank': rank}
+        settings['tasks'].append(task)
+        new_tasks.append(task)
+    if rebalanced:
+        Settings().write_settings(settings)
+    else:
+        changes = [{'op': 'add', 'task': task} for task in new_tasks]
+        changes.append(
+            {
+                'op': 'set',
+                'key': 'last_task_id',
+                'value': settings['last_task_id'],
+            }
+        )
+        Settings().write_settings(settings, changes)
+    if len(new_tasks) == 1:
+        message = (
+            f'Added "{new_tasks[0]["name"]}" to the list '
+            f'as @{new_tasks[0]["id"]}'
+        )
+    else:
+        message = f'Added {len(new_tasks)} tasks to the list'
     center_print(
-        Rule(f'Added "{task}" to the list', style=insert_or_delete_line_style),
+        Rule(message, style=insert_or_delete_line_style),
         style=insert_or_delete_text_style,
     )
     print_tasks()
 
 
 @app.command()
-def done(taks_id: int) -> None:
-    """Mark a task as [#bbf2b3]done ✓[/]"""
-    task_id = taks_id - 1
-    settings = Settings().get_settings()
-    if not settings['tasks']:
+def done(task_ids: List[str]) -> None:
+    """
+    Mark tasks as [#bbf2b3]done ✓[/] [light_slate_grey italic]
+    (IDs or ranges like 3-7)[/]
+    """
+    settings = Settings()
+    tasks = settings.get_task_rows()
+    if not tasks:
         center_print(
             Rule(
                 'Sorry, There are no tasks to mark as done',
@@ -205,7 +505,9 @@ def done(taks_id: int) -> None:
         )
         return
 
-    if not 0 <= task_id < len(settings['tasks']):
+    try:
+        indexes = parse_task_ids(task_ids, len(tasks))
+    except ValueError:
         center_print(
             Rule(
                 'Are you sure you gave me the correct ID to mark as done?',
@@ -215,7 +517,13 @@ def done(taks_id: int) -> None:
         )
         return
 
-    if settings['tasks'][task_id]['done']:
+    fields = {'done': True, 'done_at': datetime.date.today().isoformat()}
+    changes = [
+        {'op': 'update', 'index': index, 'id': task.get('id'), 'fields': fields}
+        for index, task in zip(indexes, map(tasks.__getitem__, indexes))
+        if not task['done']
+    ]
+    if not changes:
         center_print(
             Rule(
                 'No Updates Made, Task Already Done', style=warning_line_style
@@ -225,15 +533,7 @@ def done(taks_id: int) -> None:
         print_tasks()
         return
 
-    if Settings().all_tasks_done():
-        center_print(
-            Rule('All tasks are already completed!', style=update_line_style),
-            style=update_text_style,
-        )
-        return
-
-    settings['tasks'][task_id]['done'] = True
-    Settings().write_settings(settings)
+    settings.change_tasks(changes)
     center_print(
         Rule('Updated Task List', style=update_line_style),
         style=update_text_style,
@@ -241,11 +541,11 @@ def done(taks_id: int) -> None:
     print_tasks()
 
 
-@app.command(short_help=f'Mark a task as [{task_pending_style}]undone ○[/]')
-def undone(task_id: int) -> None:
-    task_id = task_id - 1
-    settings = Settings().get_settings()
-    if not settings['tasks']:
+@app.command(short_help=f'Mark tasks as [{task_pending_style}]undone ○[/]')
+def undone(task_ids: List[str]) -> None:
+    settings = Settings()
+    tasks = settings.get_task_rows()
+    if not tasks:
         center_print(
             Rule(
                 'Sorry, There are no tasks to mark as undone',
@@ -255,7 +555,9 @@ def undone(task_id: int) -> None:
         )
         return
 
-    if not 0 <= task_id < len(settings['tasks']):
+    try:
+        indexes = parse_task_ids(task_ids, len(tasks))
+    except ValueError:
         center_print(
             Rule(
                 'Are you sure you gave me the correct ID to mark as undone?',
@@ -265,7 +567,17 @@ def undone(task_id: int) -> None:
         )
         return
 
-    if not settings['tasks'][task_id]['done']:
+    changes = [
+        {
+            'op': 'update',
+            'index': index,
+            'id': task.get('id'),
+            'fields': {'done': False},
+        }
+        for index, task in zip(indexes, map(tasks.__getitem__, indexes))
+        if task['done']
+    ]
+    if not changes:
         center_print(
             Rule(
                 'No Updates Made, Task Still Pending', style=warning_line_style
@@ -275,8 +587,7 @@ def undone(task_id: int) -> None:
         print_tasks()
         return
 
-    settings['tasks'][task_id]['done'] = False
-    Settings().write_settings(settings)
+    settings.change_tasks(changes)
     center_print(
         Rule('Updated Task List', style=update_text_style),
         style=update_text_style,
@@ -284,13 +595,16 @@ def undone(task_id: int) -> None:
     print_tasks()
 
 
-@app.command('del', short_help='[bright_red]Delete[/] a Task')
+@app.command('del', short_help='[bright_red]Delete[/] Tasks')
 @app.command(short_help='[s]Delete a Task[/s]', deprecated=True)
-def delete(task_id: int) -> None:
-    """[bright_red]Delete[/] a Task"""
-    task_id = task_id - 1
-    settings = Settings().get_settings()
-    if not settings['tasks']:
+def delete(task_ids: List[str]) -> None:
+    """
+    [bright_red]Delete[/] Tasks [light_slate_grey italic]
+    (IDs or ranges like 3-7)[/]
+    """
+    settings = Settings()
+    tasks = settings.get_task_rows()
+    if not tasks:
         center_print(
             Rule(
                 'Sorry, There are no tasks left to delete',
@@ -300,7 +614,9 @@ def delete(task_id: int) -> None:
         )
         return
 
-    if not 0 <= task_id < len(settings['tasks']):
+    try:
+        indexes = parse_task_ids(task_ids, len(tasks))
+    except ValueError:
         center_print(
             Rule(
                 'Are you sure you gave me the correct ID to delete?',
@@ -310,24 +626,32 @@ def delete(task_id: int) -> None:
         )
         return
 
-    deleted_task = settings['tasks'][task_id]
-    del settings['tasks'][task_id]
-    Settings().write_settings(settings)
+    # From the last to the first, so the other indexes stay valid.
+    indexes.sort(reverse=True)
+    deleted_tasks = [tasks[index] for index in indexes]
+    settings.change_tasks(
+        [
+            {'op': 'delete', 'index': index, 'id': task.get('id')}
+            for index, task in zip(indexes, deleted_tasks)
+        ]
+    )
+    if len(deleted_tasks) == 1:
+        message = f'Deleted "{deleted_tasks[0]["name"]}"'
+    else:
+        message = f'Deleted {len(deleted_tasks)} tasks'
     center_print(
-        Rule(
-            f'Deleted "{deleted_task["name"]}"',
-            style=insert_or_delete_line_style,
-        ),
+        Rule(message, style=insert_or_delete_line_style),
         style=insert_or_delete_text_style,
     )
     print_tasks(True)
 
 
 @app.command()
-def move(old_id: int, new_id: int) -> None:
+def move(old_id: str, new_id: str) -> None:
     """Change task position by floating 🎈 or sinking ⚓"""
-    settings = Settings().get_settings()
-    if not settings['tasks']:
+    settings = Settings()
+    tasks = settings.get_task_rows()
+    if not tasks:
         center_print(
             Rule(
                 'Sorry, cannot move task as the Task list is empty',
@@ -337,18 +661,10 @@ def move(old_id: int, new_id: int) -> None:
         )
         return
 
-    if old_id == new_id:
-        center_print(
-            Rule('No Updates Made', style=warning_line_style),
-            style=warning_text_style,
-        )
-        return
-
     try:
-        _ = (not 0 <= old_id - 1 < len(settings['tasks'])) or (
-            not 0 <= new_id - 1 < len(settings['tasks'])
-        )
-    except IndexError:
+        old_position = resolve_task_id(old_id)
+        new_position = resolve_task_id(new_id)
+    except ValueError:
         center_print(
             Rule(
                 'Are you sure you gave me the correct ID to move?',
@@ -359,35 +675,38 @@ def move(old_id: int, new_id: int) -> None:
         )
         return
 
+    if old_position == new_position:
+        center_print(
+            Rule('No Updates Made', style=warning_line_style),
+            style=warning_text_style,
+        )
+        return
+
     try:
-        if len(settings['tasks']) == 2 and (
-            old_id - 1 == len(settings['tasks'])
-            or new_id - 1 == len(settings['tasks'])
-        ):
-            settings['tasks'][old_id - 1], settings['tasks'][new_id - 1] = (
-                settings['tasks'][new_id - 1],
-                settings['tasks'][old_id - 1],
-            )
-        elif old_id < new_id:
-            for x in range(new_id - 1, old_id - 1, -1):
-                settings['tasks'][old_id - 1], settings['tasks'][x] = (
-                    settings['tasks'][x],
-                    settings['tasks'][old_id - 1],
-                )
+        source, target = old_position - 1, new_position - 1
+        change = {
+            'op': 'move',
+            'from': source,
+            'to': target,
+            'id': tasks[source].get('id'),
+        }
+        rank = moved_rank(tasks, source, target)
+        if rank is None:
+            # No room left between the new neighbours' keys.
+            data = settings.get_settings()
+            apply_change(data, change)
+            rebalance_ranks(data['tasks'])
+            settings.write_settings(data)
         else:
-            for x in range(new_id - 1, old_id):
-                settings['tasks'][old_id - 1], settings['tasks'][x] = (
-                    settings['tasks'][x],
-                    settings['tasks'][old_id - 1],
-                )
-
-        Settings().write_settings(settings)
+            change['rank'] = rank
+            settings.change_tasks([change])
         center_print(
             Rule('Updated Task List', style=update_line_style),
             style=update_text_style,
         )
-        print_tasks(settings['tasks'])
+        print_tasks(True)
     except Exception:
+        Settings().invalidate()
         center_print(
             Rule(
                 "Please check the entered ID's values", style=error_line_style
@@ -398,10 +717,11 @@ def move(old_id: int, new_id: int) -> None:
 
 
 @app.command()
-def swap(old_id: int, new_id: int) -> None:
+def swap(old_id: str, new_id: str) -> None:
     """Swap the positions of two tasks 🔀"""
-    settings = Settings().get_settings()
-    if not settings['tasks']:
+    settings = Settings()
+    tasks = settings.get_task_rows()
+    if not tasks:
         center_print(
             Rule(
                 'Sorry, cannot swap tasks as the Task list is empty',
@@ -411,15 +731,29 @@ def swap(old_id: int, new_id: int) -> None:
         )
         return
 
-    if old_id == new_id:
+    try:
+        old_position = resolve_task_id(old_id)
+        new_position = resolve_task_id(new_id)
+    except ValueError:
+        center_print(
+            Rule(
+                'Are you sure you gave me the correct ID to swap?',
+                style=error_line_style,
+            ),
+            style=error_text_style,
+            wrap=True,
+        )
+        return
+
+    if old_position == new_position:
         center_print(
             Rule('No Updates Made', style=warning_line_style),
             style=warning_text_style,
         )
         return
 
-    if (not 0 <= old_id - 1 < len(settings['tasks'])) or (
-        not 0 <= new_id - 1 < len(settings['tasks'])
+    if (not 0 <= old_position - 1 < len(tasks)) or (
+        not 0 <= new_position - 1 < len(tasks)
     ):
         center_print(
             Rule(
@@ -432,16 +766,21 @@ def swap(old_id: int, new_id: int) -> None:
         return
 
     try:
-        settings['tasks'][old_id - 1], settings['tasks'][new_id - 1] = (
-            settings['tasks'][new_id - 1],
-            settings['tasks'][old_id - 1],
-        )
-        Settings().write_settings(settings)
+        change = {
+            'op': 'swap',
+            'first': old_position - 1,
+            'second': new_position - 1,
+            'ids': [
+                tasks[old_position - 1].get('id'),
+                tasks[new_position - 1].get('id'),
+            ],
+        }
+        settings.change_tasks([change])
         center_print(
             Rule('Updated Task List', style=update_line_style),
             style=update_text_style,
         )
-        print_tasks(settings['tasks'])
+        print_tasks(True)
     except Exception:
         center_print(
             Rule(
@@ -452,13 +791,55 @@ def swap(old_id: int, new_id: int) -> None:
         print_tasks()
 
 
+@app.command()
+def search(
+    terms: List[str],
+    limit: Annotated[
+        int, typer.Option(min=1, help='Show at most N matches.')
+    ] = 20,
+) -> None:
+    """
+    [bold]Search[/] Tasks :mag: [light_slate_grey italic]
+    (tasks with words starting with every term)[/]
+    """
+    from pls_cli.utils.search import COUNT_LIMIT
+
+    matches, count = Settings().search_tasks(terms, limit)
+    if not matches:
+        center_print(
+            Rule('No tasks match your search', style=warning_line_style),
+            style=warning_text_style,
+        )
+        return
+
+    task_table = Table(
+        header_style=table_header_style,
+        style=table_header_style,
+        box=box.SIMPLE_HEAVY,
+    )
+    task_table.add_column('@ID', justify='center')
+    task_table.add_column('TASK')
+    for task_id, name in matches:
+        task_table.add_row(
+            styled(f'@{task_id}', task_pending_style),
+            task_text(name, task_pending_style),
+        )
+    center_print(task_table)
+    if count > len(matches):
+        total = f'{count}+' if count >= COUNT_LIMIT else str(count)
+        center_print(
+            f'[{table_header_style}]Showing {len(matches)} of {total} '
+            'matches, raise --limit to see more[/]'
+        )
+
+
 @app.command()
 def clear() -> None:
     """Clear all tasks :wastebasket:"""
     typer.confirm('Are you sure you want to delete all tasks?', abort=True)
-    settings = Settings().get_settings()
-    settings['tasks'] = []
-    Settings().write_settings(settings)
+    with Settings().transaction() as settings:
+        settings['tasks'] = []
+        Settings().write_settings(settings)
     center_print(
         Rule('Task List Deleted', style=update_line_style),
         style=update_text_style,
@@ -469,15 +850,303 @@ def clear() -> None:
 def clean() -> None:
     """Clean up tasks marked as done :broom:"""
     typer.confirm('Are you sure you want to delete all done tasks?', abort=True)
-    settings = Settings().get_settings()
-    settings['tasks'] = Settings().get_all_tasks_undone()
-    Settings().write_settings(settings)
+    with Settings().transaction() as settings:
+        settings['tasks'] = Settings().get_all_tasks_undone()
+        Settings().write_settings(settings)
     center_print(
         Rule('Done Tasks Deleted', style=update_line_style),
         style=update_text_style,
     )
 
 
+archive_app = typer.Typer(rich_markup_mode='rich')
+app.add_typer(
+    archive_app,
+    name='archive',
+    short_help='Move done Tasks to the archive :file_cabinet:',
+)
+
+
+def archive_tasks(settings: dict, indexes: List[int]) -> List[dict]:
+    """Move the tasks at `indexes` of `settings` to the archive.
+
+    Returns the delete records to write. The tasks are in the archive
+    before they leave the config, so an interruption in between can only
+    leave a task in both.
+    """
+    indexes = sorted(indexes, reverse=True)
+    Settings().get_archive().append(
+        [settings['tasks'][index] for index in reversed(indexes)],
+        datetime.date.today().isoformat(),
+    )
+    changes = []
+    for index in indexes:
+        task = settings['tasks'].pop(index)
+        changes.append({'op': 'delete', 'index': index, 'id': task.get('id')})
+    return changes
+
+
+def auto_archive() -> None:
+    """Archive the tasks done `archive_after_days` ago, once a day."""
+    settings = Settings()
+    days = settings.archive_after_days()
+    today = datetime.date.today()
+    if not days or settings.last_auto_archive() == today.isoformat():
+        return
+    data = settings.get_settings()
+
+    from pls_cli.utils.archive import due_for_archive
+
+    indexes = [
+        index
+        for index, task in enumerate(data['tasks'])
+        if due_for_archive(task, days, today)
+    ]
+    changes = archive_tasks(data, indexes) if indexes else []
+    data['last_auto_archive'] = today.isoformat()
+    changes.append(
+        {'op': 'set', 'key': 'last_auto_archive', 'value': today.isoformat()}
+    )
+    settings.write_settings(data, changes)
+
+
+def print_archived_tasks(tasks: Iterable[dict], limit: int) -> None:
+    archived = list(islice(tasks, limit + 1))
+    if not archived:
+        center_print(
+            Rule('No archived tasks found', style=warning_line_style),
+            style=warning_text_style,
+        )
+        return
+
+    task_table = Table(
+        header_style=table_header_style,
+        style=table_header_style,
+        box=box.SIMPLE_HEAVY,
+    )
+    task_table.add_column('@ID', justify='center')
+    task_table.add_column('TASK')
+    task_table.add_column('ARCHIVED', justify='center')
+    for task in archived[:limit]:
+        task_table.add_row(
+            styled(f'@{task.get("id", "")}', task_done_style),
+            task_text(task['name'], task_done_style),
+            styled(task.get('archived_at', ''), task_done_style),
+        )
+    center_print(task_table)
+    if len(archived) > limit:
+        center_print(
+            f'[{table_header_style}]Showing the last {limit}, '
+            'raise --limit to see more[/]'
+        )
+
+
+@archive_app.callback(invoke_without_command=True)
+def archive(
+    ctx: typer.Context,
+    older_than: Annotated[
+        Optional[int],
+        typer.Option(min=0, help='Only the tasks done at least N days ago.'),
+    ] = None,
+) -> None:
+    """
+    Move done Tasks to the archive :file_cabinet: [light_slate_grey italic]
+    (out of the task list, but not deleted)[/]
+    """
+    if ctx.invoked_subcommand is not None:
+        return
+
+    settings = Settings().get_settings()
+    if older_than is None:
+        indexes = [
+            index
+            for index, task in enumerate(settings['tasks'])
+            if task['done']
+        ]
+    else:
+        from pls_cli.utils.archive import due_for_archive
+
+        indexes = [
+            index
+            for index, task in enumerate(settings['tasks'])
+            if due_for_archive(task, older_than, datetime.date.today())
+        ]
+    if not indexes:
+        center_print(
+            Rule('No Updates Made, No Done Tasks', style=warning_line_style),
+            style=warning_text_style,
+        )
+        return
+
+    Settings().write_settings(settings, archive_tasks(settings, indexes))
+    if len(indexes) == 1:
+        message = 'Archived 1 task'
+    else:
+        message = f'Archived {len(indexes)} tasks'
+    center_print(
+        Rule(message, style=update_line_style), style=update_text_style
+    )
+
+
+@archive_app.command('list')
+def archive_list(
+    limit: Annotated[
+        int, typer.Option(min=1, help='Show at most N tasks.')
+    ] = 20,
+) -> None:
+    """Show the archived Tasks, the last archived first :open_book:"""
+    print_archived_tasks(Settings().get_archive().iter_tasks(), limit)
+
+
+@archive_app.command('search')
+def archive_search(
+    terms: List[str],
+    limit: Annotated[
+        int, typer.Option(min=1, help='Show at most N matches.')
+    ] = 20,
+) -> None:
+    """Search the archived Tasks :mag:"""
+    print_archived_tasks(Settings().get_archive().search(terms), limit)
+
+
+@archive_app.command('restore')
+def archive_restore(task_ids: List[str]) -> None:
+    """Put archived Tasks back at the bottom of the list (by @ ID)"""
+    wanted = list(
+        dict.fromkeys(task_id.removeprefix('@') for task_id in task_ids)
+    )
+    archive = Settings().get_archive()
+    restored = archive.find(wanted)
+    if not restored:
+        center_print(
+            Rule(
+                'Are you sure you gave me the correct ID to restore?',
+                style=error_line_style,
+            ),
+            style=error_text_style,
+        )
+        return
+
+    with Settings().transaction() as settings:
+        # Left in both by an interrupted restore, back in the list already.
+        listed = {task.get('id') for task in settings['tasks']}
+        missing = [task for task in restored if task['id'] not in listed]
+        for task in missing:
+            task['rank'] = appended_rank(settings['tasks'])
+            if task['rank'] is None:
+                rebalance_ranks(settings['tasks'])
+                task['rank'] = appended_rank(settings['tasks'])
+            settings['tasks'].append(task)
+        if missing:
+            Settings().write_settings(settings)
+        archive.remove([task['id'] for task in restored])
+    if len(restored) == 1:
+        message = f'Restored "{restored[0]["name"]}"'
+    else:
+        message = f'Restored {len(restored)} tasks'
+    center_print(
+        Rule(message, style=update_line_style), style=update_text_style
+    )
+    print_tasks()
+
+
+@archive_app.command('auto')
+def archive_auto(
+    days: Annotated[
+        int, typer.Argument(min=0, help='Days after being done, 0 for never.')
+    ],
+) -> None:
+    """Archive done Tasks automatically after some days"""
+    Settings().set_config('archive_after_days', days)
+    if days:
+        message = f'Tasks will be archived {days} days after being done'
+    else:
+        message = 'Tasks will not be archived automatically'
+    center_print(
+        Rule(message, style=update_line_style), style=update_text_style
+    )
+
+
+def check_list_name(name: str) -> None:
+    if not lists.is_valid_name(name):
+        center_print(
+            Rule(
+                f'Invalid list name: {name}, use letters, digits, - and _',
+                style=error_line_style,
+            ),
+            style=error_text_style,
+        )
+        raise typer.Exit(1)
+
+
+# Commands that don't work on the list in use, so they still run when
+# it doesn't exist.
+LISTLESS_COMMANDS = frozenset({'docs', 'lists', 'serve', 'use', 'version'})
+
+
+def check_list_exists(settings: Settings) -> None:
+    if not settings.exists_list():
+        name = settings.list_name
+        center_print(
+            Rule(
+                f'There is no {name} list, create it with: pls use {name}',
+                style=error_line_style,
+            ),
+            style=error_text_style,
+        )
+        raise typer.Exit(1)
+
+
+@app.command('lists')
+def show_lists() -> None:
+    """Show the task lists :card_index_dividers:"""
+    settings = Settings()
+    lists_table = Table(
+        header_style=table_header_style,
+        style=table_header_style,
+        box=box.SIMPLE_HEAVY,
+    )
+    lists_table.add_column('LIST')
+    lists_table.add_column('PENDING', justify='center')
+    lists_table.add_column('DONE', justify='center')
+    lists_table.add_column('IN USE', justify='center')
+
+    for name in lists.list_names(settings.get_lists_dir()):
+        # From each list's status cache, the lists themselves aren't read.
+        status = Settings(name).get_status()
+        in_use = name == settings.list_name
+        style = task_pending_style if in_use else task_done_style
+        lists_table.add_row(
+            styled(name, style),
+            styled(str(status['undone']), style),
+            styled(str(status['done']), style),
+            styled('●', task_pending_style) if in_use else '',
+        )
+    center_print(lists_table)
+
+
+@app.command()
+def use(
+    name: Annotated[
+        str, typer.Argument(help='Name of the list, created if new.')
+    ],
+) -> None:
+    """Switch to another task list :card_index_dividers:"""
+    check_list_name(name)
+    settings = Settings(name)
+    settings.create_list()
+    settings.lists.use(name)
+    lists.select(name)
+    center_print(
+        Rule(
+            f'Now using the {name} list',
+            style=insert_or_delete_line_style,
+        ),
+        style=insert_or_delete_text_style,
+    )
+    print_tasks()
+
+
 @app.command(rich_help_panel='Integration')
 def count_done() -> None:
     """Count done tasks :chart_increasing:"""
@@ -490,15 +1159,19 @@ def count_undone() -> None:
     typer.echo(Settings().count_tasks_undone())
 
 
+@app.command(rich_help_panel='Integration')
+def status() -> None:
+    """Show done/total tasks and the next pending one :pushpin:"""
+    typer.echo(format_status(Settings().get_status()))
+
+
 @app.command(rich_help_panel='Utils and Configs')
 def callme(name: str) -> None:
     """
     Change name :name_badge: [light_slate_grey italic]
     (without resetting data)[/]
     """
-    settings = Settings().get_settings()
-    settings['user_name'] = name
-    Settings().write_settings(settings)
+    Settings().set_config('user_name', name)
     center_print(
         Rule(
             'Thanks for letting me know your name!',
@@ -511,6 +1184,9 @@ def callme(name: str) -> None:
 @app.command(rich_help_panel='Utils and Configs')
 def setup() -> None:
     """Reset all data and run setup :wrench:"""
+    # rich.markdown pulls in markdown-it, only pay for it during setup.
+    from rich.markdown import Markdown
+
     settings: dict = {}
     settings['user_name'] = typer.prompt(
         typer.style('Hello! What can I call you?', fg=typer.colors.CYAN)
@@ -585,45 +1261,151 @@ def setup() -> None:
         settings['show_quotes'] = True
 
     settings['tasks'] = []
-    Settings().write_settings(settings)
+    with Settings().transaction():
+        Settings().write_settings(Settings().separate_config(settings))
+
+
+def print_greeting_header(user_name: str, time_str: str) -> None:
+    header_greetings = (
+        f"[{header_greetings_style}] Hello {user_name}! It's {time_str}[/]"
+    )
+    center_print(Rule(header_greetings, style=header_greetings_style))
+
+
+def print_quote(quote: dict) -> None:
+    center_print(f'[{quote_style}]"{quote["content"]}"[/]', wrap=True)
+    center_print(
+        f'[{author_style}][i]・{quote["author"]}・[/i][/]',
+        wrap=True,
+    )
+
+
+def capture(print_function: Callable[..., None], *args) -> str:
+    """What `print_function` prints, rendered for the console."""
+    with console.capture() as captured:
+        print_function(*args)
+    return captured.get()
+
+
+# Shifted digits give a time as wide as the real one, and highlighted alike.
+_PROBE_DIGITS = str.maketrans('0123456789', '1234567890')
+_PROBE_QUOTE = {'content': 'x', 'author': 'x'}
+
+
+def render_greeting(time_str: str) -> Optional[dict]:
+    """Render the greeting but its quote, and cache it when it can be.
+
+    Returns the cache entry, or None while tasks are due to be archived
+    today. The entry is only saved if the time and a quote can later be
+    spliced into it (see `greeting`).
+    """
+    settings = Settings()
+    today = datetime.date.today().isoformat()
+    if settings.archive_after_days() and settings.last_auto_archive() != today:
+        return None
+
+    stamp = settings.get_store_stamp()
+    user_name = settings.get_name()
+    header = capture(print_greeting_header, user_name, time_str)
+    body = capture(print_tasks)
+
+    probe_time = time_str.translate(_PROBE_DIGITS)
+    cacheable = stamp == settings.get_store_stamp() and greeting.splice_time(
+        header, time_str, probe_time
+    ) == capture(print_greeting_header, user_name, probe_time)
+    quote_styles = None
+    quote_wraps = False
+    if settings.show_quotes():
+        width = get_terminal_full_width()
+        quote_styles = greeting.quote_styles(
+            capture(print_quote, _PROBE_QUOTE), _PROBE_QUOTE, width
+        )
+        cacheable = cacheable and quote_styles is not None
+        if quote_styles is not None:
+            probe = greeting.wrapping_probe(width)
+            quote_wraps = greeting.center_quote(
+                quote_styles, probe, width, wraps=True
+            ) == capture(print_quote, probe)
+
+    entry = {
+        'key': greeting.cache_key(stamp, settings),
+        'header': header,
+        'time': time_str,
+        'body': body,
+        'quote_styles': quote_styles,
+        'quote_wraps': quote_wraps,
+        'archive_day': today if settings.archive_after_days() else None,
+    }
+    if cacheable:
+        settings.get_greeting_cache().save(entry)
+    return entry
+
+
+def refresh_greeting(*args: object, **kwargs: object) -> None:
+    """Render the cached greeting again once a command changed the tasks."""
+    if not greeting.is_enabled() or lists.selected() is not None:
+        # `pls --list` leaves the greeting of the list in use alone.
+        return
+    settings = Settings()
+    if not settings.exists_settings():
+        return
+    # The stamp of config.json as the command's write leaves it.
+    key = greeting.cache_key(settings.get_store_stamp(), settings)
+    if settings.get_greeting_cache().read(key) is None:
+        render_greeting(datetime.datetime.now().strftime(greeting.TIME_FORMAT))
 
 
 @app.callback(
     invoke_without_command=True,
+    result_callback=refresh_greeting,
     epilog=(
         'Made with [red]:heart:[/red] by '
         '[link=https://github.com/guedesfelipe/pls-cli]Felipe Guedes[/link]'
     ),
 )
-def show(ctx: typer.Context) -> None:
+@profiled('show')
+def show(
+    ctx: typer.Context,
+    list_name: Annotated[
+        Optional[str],
+        typer.Option(
+            '--list',
+            help='Work on this task list instead of the one in use.',
+            show_default=False,
+        ),
+    ] = None,
+) -> None:
     """
     💻 [bold]PLS-CLI[/]
 
     ・[i]Minimalist and full configurable greetings and TODO list[/]・
     """
+    if list_name is not None:
+        check_list_name(list_name)
+    lists.select(list_name)
+    if ctx.invoked_subcommand not in LISTLESS_COMMANDS:
+        check_list_exists(Settings())
     try:
         if ctx.invoked_subcommand is None:
-            if Settings().exists_settings():
+            settings = Settings()
+            if settings.is_set_up():
                 date_now = datetime.datetime.now()
-                user_name = Settings().get_name()
-                time_str = date_now.strftime('%d %b | %I:%M %p')
-                header_greetings = (
-                    f'[{header_greetings_style}] Hello {user_name}! '
-                    f"It's {time_str}[/]"
-                )
-                center_print(
-                    Rule(header_greetings, style=header_greetings_style)
-                )
-                quote = get_rand_quote()
-                if Settings().show_quotes():
-                    center_print(
-                        f'[{quote_style}]"{quote["content"]}"[/]', wrap=True
-                    )
-                    center_print(
-                        f'[{author_style}][i]・{quote["author"]}・[/i][/]',
-                        wrap=True,
-                    )
-                print_tasks()
+                time_str = date_now.strftime(greeting.TIME_FORMAT)
+                quote = get_rand_quote() if settings.show_quotes() else None
+                auto_archive()
+                entry = None
+                if greeting.is_enabled():
+                    entry = render_greeting(time_str)
+                if entry is None:
+                    print_greeting_header(settings.get_name(), time_str)
+                    if quote is not None:
+                        print_quote(quote)
+                    print_tasks()
+                else:
+                    console.file.write(entry['header'])
+                    if quote is not None:
+                        print_quote(quote)
+                    console.file.write(entry['body'])
             else:
                 setup()
     except json.JSONDecodeError:
@@ -656,14 +1438,136 @@ def config():
     console.print(f'\n[#61E294]Path:[/] [bold]{config_path}[/]\n')
 
 
+# Read once, when pls is imported: a daemon started with other values
+# can't answer for the client.
+IMPORT_TIME_ENV = (
+    *DEFAULT_THEME,
+    'PLS_JSON_CODEC',
+    'PLS_JSON_COMPACT',
+    'PLS_PROFILE',
+)
+
+
+@contextlib.contextmanager
+def forwarded_terminal(request: dict, output: io.StringIO) -> Iterator[None]:
+    """Run as in the client's terminal, with its env, writing to `output`."""
+    global console
+    env = dict(
+        request['env'],
+        COLUMNS=str(request['columns']),
+        LINES=str(request['lines']),
+    )
+    names = set(env).union(
+        name for name in os.environ if name.startswith('PLS_')
+    )
+    daemon_env = {name: os.environ.get(name) for name in names}
+    daemon_console, daemon_stdin = console, sys.stdin
+    for name in names:
+        os.environ.pop(name, None)
+    os.environ.update(env)
+    console = Console(
+        file=output,
+        width=request['columns'],
+        height=request['lines'],
+        force_terminal=request['terminal'],
+    )
+    sys.stdin = io.StringIO(request['stdin'] or '')
+    try:
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(
+            output
+        ):
+            yield
+    finally:
+        console, sys.stdin = daemon_console, daemon_stdin
+        for name, value in daemon_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def run_forwarded(request: dict) -> Optional[Tuple[int, str]]:
+    """Run a command sent by the `pls` client and capture its output.
+
+    The output is rendered for the client's terminal; the snapshot cache
+    of this process is what makes it fast, and it is dropped if the
+    command fails halfway. Returns None, for the client to run the
+    command itself, when it has settings only read at import or would
+    prompt for the setup.
+    """
+    if any(
+        request['env'].get(name) != os.environ.get(name)
+        for name in IMPORT_TIME_ENV
+    ):
+        return None
+
+    output = io.StringIO()
+    with forwarded_terminal(request, output):
+        if not request['args'] and not Settings().is_set_up():
+            return None
+        bind_theme()
+        try:
+            try:
+                exit_code = app(
+                    request['args'], prog_name='pls', standalone_mode=False
+                )
+            except ClickException as error:
+                error.show(output)
+                exit_code = error.exit_code
+            except typer.Abort:
+                output.write('Aborted!\n')
+                exit_code = 1
+            finally:
+                # Replies wait for config.json to be written, as a
+                # command run without the daemon exits only once it is.
+                wait_for_writes()
+        except Exception:
+            Settings().invalidate()
+            return 1, output.getvalue() + traceback.format_exc()
+        finally:
+            # The daemon never exits, each command is its own group commit.
+            durability.flush()
+    return exit_code or 0, output.getvalue()
+
+
+@app.command(rich_help_panel='Utils and Configs')
+def serve() -> None:
+    """Keep pls running in the background to answer faster :rocket:"""
+    socket_path = Settings().socket_path
+    if not daemon.is_supported():
+        center_print(
+            Rule(
+                'Sorry, pls serve needs Unix domain sockets',
+                style=error_line_style,
+            ),
+            style=error_text_style,
+        )
+        raise typer.Exit(1)
+    if daemon.is_running(socket_path):
+        center_print(
+            Rule('pls is already being served', style=warning_line_style),
+            style=warning_text_style,
+        )
+        return
+
+    center_print(
+        Rule(
+            f'・Serving on {socket_path}・', style=insert_or_delete_line_style
+        ),
+        style=insert_or_delete_text_style,
+    )
+    with contextlib.suppress(KeyboardInterrupt):
+        daemon.serve(socket_path, run_forwarded)
+
+
 @app.command()
-def edit(task_id: int, task: str):
+def edit(task_id: str, task: str):
     """
     [bold yellow]Edit[/bold yellow] a task by id ✏️ [light_slate_grey italic]
     (Add task name inside quotes)[/]
     """
-    settings = Settings().get_settings()
-    tasks = settings['tasks']
+    settings = Settings()
+    tasks = settings.get_task_rows()
 
     # check if task list is empty
     if not tasks:
@@ -676,9 +1580,12 @@ def edit(task_id: int, task: str):
     print_tasks()
 
     # check if task exists
-    if task_id and task_id <= len(tasks):
-        old_task = tasks[task_id - 1]['name']
-        tasks[task_id - 1]['name'] = task
+    try:
+        position = resolve_task_id(task_id)
+    except ValueError:
+        position = 0
+    if 0 < position <= len(tasks):
+        old_task = tasks[position - 1]
     else:
         center_print(
             f'\nTask #{task_id} was not found, pls choose an existing ID\n',
@@ -688,7 +1595,7 @@ def edit(task_id: int, task: str):
 
     # confirm edit task
     center_print(
-        f'\nOld Task: {old_task}\nEdited Task: {task}\n',
+        f'\nOld Task: {old_task["name"]}\nEdited Task: {task}\n',
         style=insert_or_delete_text_style,
     )
     if not typer.confirm(
@@ -698,6 +1605,15 @@ def edit(task_id: int, task: str):
         print_tasks()
         raise typer.Exit()
 
-    Settings().write_settings(settings)
+    settings.change_tasks(
+        [
+            {
+                'op': 'update',
+                'index': position - 1,
+                'id': old_task.get('id'),
+                'fields': {'name': task},
+            }
+        ]
+    )
     typer.clear()
     print_tasks()
@@ -0,0 +1,152 @@
+import contextlib
+import datetime
+import json
+import os
+from typing import Iterable, Iterator, List, Set
+
+from pls_cli.utils import durability
+from pls_cli.utils.search import tokenize
+
+SEGMENT_PREFIX = 'segment-'
+SEGMENT_SUFFIX = '.jsonl'
+
+
+def _segment_max_bytes() -> int:
+    return int(os.getenv('PLS_ARCHIVE_SEGMENT_BYTES', str(1024 * 1024)))
+
+
+def due_for_archive(task: dict, days: int, today: datetime.date) -> bool:
+    """If `task` was marked done at least `days` days before `today`.
+
+    Tasks done before `done_at` was recorded are never due.
+    """
+    if not task['done'] or 'done_at' not in task:
+        return False
+    done_at = datetime.date.fromisoformat(task['done_at'])
+    return (today - done_at).days >= days
+
+
+def matches(task: dict, tokens: List[str]) -> bool:
+    """If every token starts a word of the task name, like `pls search`."""
+    words = tokenize(task['name'])
+    return all(
+        any(word.startswith(token) for word in words) for token in tokens
+    )
+
+
+class Archive:
+    """Done tasks moved out of the config, in append-only segment files.
+
+    Each segment holds one archived task per line, oldest first; a new
+    segment is started once the last one outgrows
+    `PLS_ARCHIVE_SEGMENT_BYTES`. Nothing here is read unless an archive
+    command asks for it, and segments are read one at a time, newest
+    first, until the command has what it needs.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def segments(self) -> List[str]:
+        """Paths of the segments, oldest first."""
+        try:
+            names = os.listdir(self.path)
+        except FileNotFoundError:
+            return []
+        return [
+            os.path.join(self.path, name)
+            for name in sorted(names)
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+        ]
+
+    def next_segment(self, segments: List[str]) -> str:
+        number = 1
+        if segments:
+            name = os.path.basename(segments[-1])
+            number = int(name[len(SEGMENT_PREFIX) : -len(SEGMENT_SUFFIX)])
+            if os.path.getsize(segments[-1]) < _segment_max_bytes():
+                return segments[-1]
+            number += 1
+        return os.path.join(
+            self.path, f'{SEGMENT_PREFIX}{number:06d}{SEGMENT_SUFFIX}'
+        )
+
+    def append(self, tasks: Iterable[dict], archived_at: str) -> None:
+        lines = ''.join(
+            json.dumps(
+                dict(task, archived_at=archived_at), separators=(',', ':')
+            )
+            + '\n'
+            for task in tasks
+        )
+        if not lines:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        segment = self.next_segment(self.segments())
+        durability.append_lines(segment, lines.encode('utf-8'))
+
+    def read_segment(self, segment: str) -> List[dict]:
+        return durability.read_json_lines(segment)
+
+    def iter_tasks(self) -> Iterator[dict]:
+        """Archived tasks, the most recently archived first."""
+        for segment in reversed(self.segments()):
+            yield from reversed(self.read_segment(segment))
+
+    def search(self, terms: Iterable[str]) -> Iterator[dict]:
+        tokens = [token for term in terms for token in tokenize(term)]
+        return (task for task in self.iter_tasks() if matches(task, tokens))
+
+    def find(self, task_ids: List[str]) -> List[dict]:
+        """The archived tasks with `task_ids`, without their `archived_at`.
+
+        In the order of `task_ids`, each task once.
+        """
+        wanted: Set[str] = set(task_ids)
+        found = {}
+        for segment in reversed(self.segments()):
+            if not wanted:
+                break
+            for task in self.read_segment(segment):
+                if task.get('id') in wanted:
+                    task.pop('archived_at', None)
+                    found[task['id']] = task
+            wanted.difference_update(found)
+        return [
+            found[task_id]
+            for task_id in dict.fromkeys(task_ids)
+            if task_id in found
+        ]
+
+    def remove(self, task_ids: List[str]) -> None:
+        """Drop the tasks with `task_ids`, rewriting only their segments.
+
+        Restoring puts the tasks back in the config first and removes them
+        from the archive after, so an interruption in between can only
+        leave a task in both.
+        """
+        wanted: Set[str] = set(task_ids)
+        for segment in reversed(self.segments()):
+            if not wanted:
+                break
+            tasks = self.read_segment(segment)
+            removed = {task.get('id') for task in tasks} & wanted
+            if not removed:
+                continue
+            wanted -= removed
+            self.rewrite_segment(
+                segment,
+                [task for task in tasks if task.get('id') not in removed],
+            )
+
+    def rewrite_segment(self, segment: str, tasks: List[dict]) -> None:
+        if not tasks:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(segment)
+            return
+        durability.write_atomic(
+            segment,
+            ''.join(
+                json.dumps(task, separators=(',', ':')) + '\n' for task in tasks
+            ).encode('utf-8'),
+        )
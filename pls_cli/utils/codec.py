@@ -0,0 +1,146 @@
+"""JSON encoding and decoding of the config, with the fastest library around.
+
+    PLS_JSON_CODEC=auto      orjson if installed, else msgspec, else json
+    PLS_JSON_CODEC=json      always this one (or orjson, msgspec)
+    PLS_JSON_COMPACT=1       write config.json without indentation
+
+Whichever codec is used, config.json is written byte for byte the way
+`json.dump(data, file, indent=2)` writes it, unless compact output is
+asked for. The codec is picked on first use, so commands that never
+decode the config don't pay for importing it.
+"""
+
+import json
+import os
+import re
+from typing import Any, Callable, Dict, Optional, Union
+
+CODEC = os.getenv('PLS_JSON_CODEC', 'auto')
+COMPACT = os.getenv('PLS_JSON_COMPACT', '') not in ('', '0')
+
+AUTO_ORDER = ('orjson', 'msgspec', 'json')
+
+# Characters the json module escapes with ensure_ascii and other encoders
+# write as they are. They can only appear inside strings.
+UNESCAPED = '[^\x00-\x7e]'
+
+
+def _ensure_ascii(encoded: bytes) -> bytes:
+    if encoded.isascii() and b'\x7f' not in encoded:
+        return encoded
+    return re.sub(
+        UNESCAPED,
+        lambda match: json.dumps(match.group())[1:-1],
+        encoded.decode('utf-8'),
+    ).encode('utf-8')
+
+
+class Codec:
+    """Decoder and encoders of one JSON library."""
+
+    name = 'json'
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return json.loads(data)
+
+    def dumps(self, data: Any) -> bytes:
+        """`data` as json.dumps(data, indent=2) would write it."""
+        return json.dumps(data, indent=2, default=dict).encode('utf-8')
+
+    def dumps_compact(self, data: Any) -> bytes:
+        return json.dumps(data, separators=(',', ':'), default=dict).encode(
+            'utf-8'
+        )
+
+
+class OrjsonCodec(Codec):
+    name = 'orjson'
+
+    def __init__(self) -> None:
+        import orjson
+
+        self.orjson = orjson
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError.
+        return self.orjson.loads(data)
+
+    def dumps(self, data: Any) -> bytes:
+        return _ensure_ascii(
+            self.orjson.dumps(
+                data, default=dict, option=self.orjson.OPT_INDENT_2
+            )
+        )
+
+    def dumps_compact(self, data: Any) -> bytes:
+        return self.orjson.dumps(data, default=dict)
+
+
+class MsgspecCodec(Codec):
+    name = 'msgspec'
+
+    def __init__(self) -> None:
+        import msgspec
+
+        self.msgspec = msgspec
+        self.decoder = msgspec.json.Decoder()
+        self.encoder = msgspec.json.Encoder(enc_hook=dict)
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        try:
+            return self.decoder.decode(data)
+        except self.msgspec.DecodeError as error:
+            raise json.JSONDecodeError(str(error), '', 0) from error
+
+    def dumps(self, data: Any) -> bytes:
+        return _ensure_ascii(
+            self.msgspec.json.format(self.encoder.encode(data), indent=2)
+        )
+
+    def dumps_compact(self, data: Any) -> bytes:
+        return self.encoder.encode(data)
+
+
+CODECS: Dict[str, Callable[[], Codec]] = {
+    'json': Codec,
+    'orjson': OrjsonCodec,
+    'msgspec': MsgspecCodec,
+}
+
+_codec: Optional[Codec] = None
+
+
+def load_codec(name: str) -> Codec:
+    """The codec `name`, or the first importable one for 'auto'.
+
+    Raises ImportError when a named codec's library is not installed and
+    ValueError for an unknown name.
+    """
+    if name != 'auto':
+        if name not in CODECS:
+            raise ValueError(f'Unknown JSON codec: {name}')
+        return CODECS[name]()
+    for candidate in AUTO_ORDER:
+        try:
+            return CODECS[candidate]()
+        except ImportError:
+            continue
+    return Codec()
+
+
+def get_codec() -> Codec:
+    global _codec
+    if _codec is None:
+        _codec = load_codec(CODEC)
+    return _codec
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    return get_codec().loads(data)
+
+
+def dumps(data: Any, compact: Optional[bool] = None) -> bytes:
+    """Encode a config document, compact if `compact` or PLS_JSON_COMPACT."""
+    if COMPACT if compact is None else compact:
+        return get_codec().dumps_compact(data)
+    return get_codec().dumps(data)
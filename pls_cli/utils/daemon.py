@@ -0,0 +1,130 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import socket
+import sys
+from typing import Callable, List, Optional, Tuple
+
+# Commands the daemon answers. Anything that prompts, opens an editor or
+# a browser (setup, clear, clean, edit, docs) always runs in the calling
+# process. So does the greeting before setup, which the daemon declines.
+FORWARDED_COMMANDS = frozenset(
+    {
+        'add',
+        'archive',
+        'callme',
+        'config',
+        'count-done',
+        'count-undone',
+        'del',
+        'delete',
+        'done',
+        'lists',
+        'move',
+        'quotes',
+        'search',
+        'showtasks',
+        'status',
+        'swap',
+        'tasks',
+        'tasks-progress',
+        'undone',
+        'use',
+        'version',
+    }
+)
+
+# Reads a request and returns (exit code, output), or None to leave the
+# command to the client.
+Handler = Callable[[dict], Optional[Tuple[int, str]]]
+
+
+def is_supported() -> bool:
+    return hasattr(socket, 'AF_UNIX')
+
+
+def is_forwarded(args: List[str]) -> bool:
+    """If `args` can be answered by the daemon (no args is the greeting)."""
+    return not args or args[0] in FORWARDED_COMMANDS
+
+
+def build_request(args: List[str]) -> dict:
+    """What the daemon needs to render `args` for this terminal."""
+    size = shutil.get_terminal_size()
+    return {
+        'args': args,
+        'stdin': sys.stdin.read() if '-' in args[1:] else None,
+        'columns': size.columns,
+        'lines': size.lines,
+        'terminal': sys.stdout.isatty(),
+        'env': {
+            name: value
+            for name, value in os.environ.items()
+            if name.startswith('PLS_')
+        },
+    }
+
+
+def forward(socket_path: str, args: List[str]) -> Optional[dict]:
+    """Run `args` on the daemon, None if none is listening or it declines.
+
+    Stdin is only read once connected, so it is still there for the
+    in-process fallback.
+    """
+    if not is_supported() or not os.path.exists(socket_path):
+        return None
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        try:
+            client.connect(socket_path)
+        except OSError:
+            # A socket file left behind by a daemon that didn't shut down.
+            return None
+        request = build_request(args)
+        client.sendall(json.dumps(request).encode('utf-8') + b'\n')
+        client.shutdown(socket.SHUT_WR)
+        with client.makefile('rb') as reply_file:
+            reply = json.loads(reply_file.read())
+        if reply is None and request['stdin'] is not None:
+            # Declined: stdin goes back for the in-process run.
+            sys.stdin = io.StringIO(request['stdin'])
+        return reply
+    finally:
+        client.close()
+
+
+def is_running(socket_path: str) -> bool:
+    if not is_supported() or not os.path.exists(socket_path):
+        return False
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(socket_path)
+        except OSError:
+            return False
+    return True
+
+
+def serve(socket_path: str, handle: Handler) -> None:
+    """Answer requests on `socket_path` one at a time until interrupted."""
+    import socketserver
+
+    class RequestHandler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            request = json.loads(self.rfile.readline())
+            result = handle(request)
+            reply = None
+            if result is not None:
+                reply = {'exit_code': result[0], 'output': result[1]}
+            self.wfile.write(json.dumps(reply).encode('utf-8'))
+
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(socket_path)
+    server = socketserver.UnixStreamServer(socket_path, RequestHandler)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(socket_path)
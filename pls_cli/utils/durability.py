@@ -0,0 +1,148 @@
+"""Crash-safe writes of the files pls keeps, and when they reach the disk.
+
+    PLS_DURABILITY=batched   fsync once when the command ends (default)
+    PLS_DURABILITY=always    fsync every write before going on
+    PLS_DURABILITY=none      leave flushing to the operating system
+
+Whatever the policy, a file is never rewritten in place: the new content
+goes to a temporary file that then replaces the old one, so a crash or
+Ctrl-C mid-write leaves the previous version intact. The policy only
+matters for power cuts. With `batched`, every file written during a
+command is synced together when it ends, so back-to-back changes share
+one fsync; a power cut before then can lose or empty the files that
+command wrote.
+"""
+
+import atexit
+import contextlib
+import itertools
+import json
+import os
+from typing import IO, List, Set
+
+POLICIES = ('always', 'batched', 'none')
+
+_pending: Set[str] = set()
+_registered = False
+_temporary_names = itertools.count()
+
+
+def get_policy() -> str:
+    policy = os.getenv('PLS_DURABILITY', 'batched')
+    if policy not in POLICIES:
+        raise ValueError(f'Unknown durability policy: {policy}')
+    return policy
+
+
+def _fsync_directory(path: str) -> None:
+    if os.name == 'nt':
+        # Directories can't be opened, renames are journaled by NTFS.
+        return
+    descriptor = os.open(os.path.dirname(path) or '.', os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+def _fsync_path(path: str) -> None:
+    # Opened for appending, Windows only flushes writable handles.
+    with contextlib.suppress(FileNotFoundError):
+        with open(path, 'ab') as written_file:
+            os.fsync(written_file.fileno())
+        _fsync_directory(path)
+
+
+def _sync_later(path: str) -> None:
+    global _registered
+    if not _registered:
+        atexit.register(flush)
+        _registered = True
+    _pending.add(path)
+
+
+def written(opened_file: IO) -> None:
+    """Make what was just written to `opened_file` durable per the policy.
+
+    Call it before closing the file.
+    """
+    policy = get_policy()
+    if policy == 'none':
+        return
+    opened_file.flush()
+    if policy == 'always':
+        os.fsync(opened_file.fileno())
+        return
+    _sync_later(opened_file.name)
+
+
+def write_atomic(path: str, payload: bytes) -> None:
+    """Replace the file at `path` with `payload` in one step."""
+    policy = get_policy()
+    temporary = f'{path}.{os.getpid()}-{next(_temporary_names)}.tmp'
+    try:
+        with open(temporary, 'wb') as temporary_file:
+            temporary_file.write(payload)
+            if policy == 'always':
+                temporary_file.flush()
+                os.fsync(temporary_file.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(temporary)
+        raise
+    if policy == 'always':
+        _fsync_directory(path)
+    elif policy == 'batched':
+        _sync_later(path)
+
+
+def _cut_torn_line(line_file: IO[bytes]) -> None:
+    """Truncate `line_file` after its last newline."""
+    end = position = line_file.seek(0, os.SEEK_END)
+    while position > 0:
+        start = max(0, position - 4096)
+        line_file.seek(start)
+        chunk = line_file.read(position - start)
+        if position == end and chunk.endswith(b'\n'):
+            return
+        newline = chunk.rfind(b'\n')
+        if newline != -1:
+            line_file.truncate(start + newline + 1)
+            return
+        position = start
+    line_file.truncate(0)
+
+
+def append_lines(path: str, payload: bytes) -> None:
+    """Append newline-terminated lines to the file at `path`.
+
+    An append cut short leaves a last line without its newline, which
+    `read_json_lines` never returns; it is cut off first, or `payload`
+    would be glued onto it and lost with it.
+    """
+    with open(path, 'a+b') as line_file:
+        _cut_torn_line(line_file)
+        line_file.write(payload)
+        written(line_file)
+
+
+def read_json_lines(path: str) -> List[dict]:
+    """The records of a file written by `append_lines`, one per line.
+
+    A last line without its newline is an interrupted append and is
+    skipped; anything else that doesn't decode raises ValueError.
+    """
+    records = []
+    with open(path, encoding='utf-8') as line_file:
+        for line in line_file:
+            if not line.endswith('\n'):
+                break
+            records.append(json.loads(line))
+    return records
+
+
+def flush() -> None:
+    """Sync every file written since the last flush, the group commit."""
+    while _pending:
+        _fsync_path(_pending.pop())
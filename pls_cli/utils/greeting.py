@@ -0,0 +1,303 @@
+"""Opt-in cache of the rendered greeting, enabled with PLS_GREETING_CACHE=1.
+
+`pls` alone, run from a shell's startup file, then prints the greeting
+from the cache without importing typer and rich or reading the tasks.
+Only the clock and the quote change from one greeting to the next: the
+time is spliced into the rendered header, and the quote is centered by
+hand between the escape codes recorded for its style.
+
+The cache is keyed by the list and its store's stamp, the terminal
+size, the theme and lists files and every env var the rendering depends
+on. Commands that change the tasks render it again before exiting, so
+the next terminal finds it current.
+"""
+
+import contextlib
+import datetime
+import itertools
+import json
+import os
+import re
+import shutil
+import sys
+import unicodedata
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from pls_cli import __version__
+
+if TYPE_CHECKING:
+    from pls_cli.utils.settings import Settings
+
+TIME_FORMAT = '%d %b | %I:%M %p'
+
+# Besides the PLS_* env, what rich decides colors and width from.
+TERMINAL_ENV = ('COLORTERM', 'COLUMNS', 'FORCE_COLOR', 'NO_COLOR', 'TERM')
+
+_ANSI_ESCAPE = re.compile(r'\x1b\[[0-9;]*m')
+
+# Quotes are only centered by hand when rich would print them verbatim:
+# no markup, emoji codes or escapes, and no whitespace but spaces.
+_NOT_PLAIN = re.compile(r'[\[:\\]|[^\S ]')
+
+# Letters rich counts as no cells at all (Hangul fillers and jamo).
+_NO_CELL_LETTERS = re.compile('[\u1160-\u11ff\u3164\ud7b0-\ud7ff\uffa0]')
+
+# What rich wraps lines between: a word and the spaces after it.
+_WORD = re.compile(r'\s*\S+\s*')
+
+_temporary_names = itertools.count()
+
+
+def is_enabled() -> bool:
+    return os.getenv('PLS_GREETING_CACHE', '') not in ('', '0')
+
+
+def _file_stamp(path: str) -> Optional[list]:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def cache_key(stamp: list, settings: 'Settings') -> dict:
+    size = shutil.get_terminal_size()
+    return {
+        'version': __version__,
+        'list': settings.list_name,
+        'stamp': stamp,
+        'theme': _file_stamp(settings.theme_path),
+        # Holds the user's name once there are named lists.
+        'lists': _file_stamp(settings.lists.path),
+        'columns': size.columns,
+        'lines': size.lines,
+        'terminal': sys.stdout.isatty(),
+        'env': {
+            name: value
+            for name, value in sorted(os.environ.items())
+            if name.startswith('PLS_') or name in TERMINAL_ENV
+        },
+    }
+
+
+def splice_time(header: str, old: str, new: str) -> Optional[str]:
+    """The rendered `header` showing the time `new` instead of `old`.
+
+    Characters are swapped one for one around the escape codes, so both
+    times must be as wide. None if they aren't.
+    """
+    if len(old) != len(new) or not (old + new).isascii():
+        return None
+    visible: List[int] = []
+    position = 0
+    for escape in _ANSI_ESCAPE.finditer(header):
+        visible.extend(range(position, escape.start()))
+        position = escape.end()
+    visible.extend(range(position, len(header)))
+
+    start = ''.join(header[index] for index in visible).find(f"It's {old}")
+    if start == -1:
+        return None
+    characters = list(header)
+    for offset, character in enumerate(new, start + len("It's ")):
+        characters[visible[offset]] = character
+    return ''.join(characters)
+
+
+def cell_width(text: str) -> Optional[int]:
+    """How many terminal cells `text` takes, as rich counts them.
+
+    East Asian wide letters take two cells, other letters, digits,
+    punctuation and spaces one. None for anything else (marks, controls,
+    emoji), which rich measures with tables of its own.
+    """
+    if text.isascii():
+        return len(text) if text.isprintable() else None
+    if _NO_CELL_LETTERS.search(text):
+        return None
+    cells = 0
+    for character in text:
+        category = unicodedata.category(character)
+        if category[0] not in 'LP' and category not in ('Nd', 'Zs'):
+            return None
+        cells += 2 if unicodedata.east_asian_width(character) in 'WF' else 1
+    return cells
+
+
+def quote_lines(quote: dict) -> Optional[List[Tuple[str, int]]]:
+    """Text and width in cells of the quote's two lines.
+
+    None if either can't be measured.
+    """
+    lines = []
+    for text in (f'"{quote["content"]}"', f'・{quote["author"]}・'):
+        cells = cell_width(text)
+        if cells is None:
+            return None
+        lines.append((text, cells))
+    return lines
+
+
+def center(text: str, cells: int, style: List[str], width: int) -> str:
+    """`text` centered on a line of `width` cells, the way rich pads it."""
+    excess = width - cells
+    return (
+        f'{" " * (excess // 2)}{style[0]}{text}{style[1]}'
+        f'{" " * (excess - excess // 2)}\n'
+    )
+
+
+def wrap(text: str, style: List[str], width: int) -> Optional[str]:
+    """`text` wrapped on lines of `width` cells, the way rich wraps it.
+
+    Lines break before the first word that doesn't fit and keep the
+    spaces after their last word, as far as they fit. None if a word
+    is longer than a line, rich would break it.
+    """
+    lines: List[Tuple[str, int]] = []
+    line, line_cells = '', 0
+    for word in _WORD.findall(text):
+        cells = cell_width(word)
+        spaces = len(word) - len(word.rstrip(' '))
+        if cells is None or cells - spaces > width:
+            return None
+        if line and line_cells + cells - spaces > width:
+            lines.append((line, line_cells))
+            line, line_cells = '', 0
+        line, line_cells = line + word, line_cells + cells
+    lines.append((line, line_cells))
+
+    # Only spaces stick out, one cell each.
+    lines = [
+        (line[: width - cells], width) if cells > width else (line, cells)
+        for line, cells in lines
+    ]
+    # The lines are then centered together, as wide as the widest.
+    block = max(cells for _, cells in lines)
+    excess = width - block
+    return ''.join(
+        f'{" " * (excess // 2)}{style[0]}{line}{style[1]}'
+        f'{" " * (block - cells + excess - excess // 2)}\n'
+        for line, cells in lines
+    )
+
+
+def wrapping_probe(width: int) -> dict:
+    """A quote rich wraps at `width`, in words of many lengths."""
+    text = ' '.join('x' * (length % 7 + 1) for length in range(width))
+    return {'content': text, 'author': text}
+
+
+def quote_styles(rendered: str, quote: dict, width: int) -> Optional[list]:
+    """The escape codes around each line of `quote` as rich `rendered` it.
+
+    None if `rendered` isn't each line centered on its own.
+    """
+    styles = []
+    lines = rendered.splitlines(keepends=True)
+    measured = quote_lines(quote)
+    if len(lines) != 2 or measured is None:
+        return None
+    for line, (text, cells) in zip(lines, measured):
+        padding = len(line) - len(line.lstrip(' '))
+        before, found, after = line[padding:].partition(text)
+        style = [before, after.rstrip(' \n')]
+        if not found or center(text, cells, style, width) != line:
+            return None
+        styles.append(style)
+    return styles
+
+
+def center_quote(
+    styles: list, quote: dict, width: int, wraps: bool = False
+) -> Optional[str]:
+    """The quote centered in the recorded styles, None if rich is needed.
+
+    Lines too long for `width` are wrapped only if `wraps`, once `wrap`
+    was found to do it like rich.
+    """
+    if _NOT_PLAIN.search(quote['content'] + quote['author']):
+        return None
+    measured = quote_lines(quote)
+    if measured is None:
+        return None
+    lines = []
+    for style, (text, cells) in zip(styles, measured):
+        if cells <= width:
+            lines.append(center(text, cells, style, width))
+            continue
+        wrapped = wrap(text, style, width) if wraps else None
+        if wrapped is None:
+            return None
+        lines.append(wrapped)
+    return ''.join(lines)
+
+
+class GreetingCache:
+    """The last greeting rendered, in parts, with the key it is valid for."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def read(self, key: dict) -> Optional[dict]:
+        try:
+            with open(self.path, encoding='utf-8') as greeting_file:
+                entry = json.loads(greeting_file.read())
+        except (FileNotFoundError, ValueError):
+            return None
+        if entry.get('key') != key:
+            return None
+        return entry
+
+    def save(self, entry: dict) -> None:
+        # Each writer has its own temporary file, commands finishing at
+        # once don't write into each other's.
+        temp_path = f'{self.path}.{os.getpid()}-{next(_temporary_names)}.tmp'
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as greeting_file:
+                json.dump(entry, greeting_file)
+            os.replace(temp_path, self.path)
+        except OSError:
+            # Unwritable cache, the greeting is rendered every time.
+            with contextlib.suppress(OSError):
+                os.remove(temp_path)
+
+
+def print_cached(settings: 'Settings') -> bool:
+    """Print the greeting from the cache, False if it has to be rendered."""
+    try:
+        key = cache_key(settings.get_store_stamp(), settings)
+    except FileNotFoundError:
+        return False
+    entry = settings.get_greeting_cache().read(key)
+    if entry is None:
+        return False
+
+    now = datetime.datetime.now()
+    if entry['archive_day'] not in (None, now.date().isoformat()):
+        # Tasks may be due for the daily auto archive.
+        return False
+    header = splice_time(
+        entry['header'], entry['time'], now.strftime(TIME_FORMAT)
+    )
+    if header is None:
+        return False
+
+    quote_text: Optional[str] = ''
+    if entry['quote_styles'] is not None:
+        from pls_cli.utils.quotes import get_rand_quote
+
+        quote = get_rand_quote()
+        if quote is not None:
+            quote_text = center_quote(
+                entry['quote_styles'],
+                quote,
+                key['columns'],
+                entry.get('quote_wraps', False),
+            )
+    if quote_text is None:
+        return False
+
+    sys.stdout.write(header + quote_text + entry['body'])
+    sys.stdout.flush()
+    return True
@@ -0,0 +1,144 @@
+import contextlib
+import json
+import os
+from typing import Iterable, List, Optional
+
+
+def apply_change(data: dict, change: dict) -> None:
+    """Apply one journal record to a config document in place."""
+    from pls_cli.utils.tasks import swap_tasks, update_task
+
+    tasks = data.setdefault('tasks', [])
+    operation = change['op']
+    if operation == 'add':
+        tasks.append(change['task'])
+    elif operation == 'update':
+        update_task(tasks, change['index'], change['fields'])
+    elif operation == 'delete':
+        del tasks[change['index']]
+    elif operation == 'move':
+        task = tasks.pop(change['from'])
+        if 'rank' in change:
+            task['rank'] = change['rank']
+        tasks.insert(change['to'], task)
+    elif operation == 'swap':
+        swap_tasks(tasks, change['first'], change['second'])
+    elif operation == 'set':
+        data[change['key']] = change['value']
+    else:
+        raise ValueError(f'Unknown journal operation: {operation}')
+
+
+def _find_task(tasks: List[dict], task_id: Optional[str]) -> Optional[int]:
+    if task_id is None:
+        return None
+    return next(
+        (
+            index
+            for index, task in enumerate(tasks)
+            if task.get('id') == task_id
+        ),
+        None,
+    )
+
+
+def rebase_changes(data: dict, changes: List[dict]) -> Optional[List[dict]]:
+    """Replay `changes`, made on an older version, onto `data` in place.
+
+    Tasks are found again by ID, so edits of different tasks merge. A
+    change to a task that is gone (deleted by the other writer) is
+    dropped. Added tasks get a new ID if theirs was taken meanwhile and a
+    new rank at the bottom. Returns the records as they apply to `data`,
+    or None when they can't be merged: a record without the task ID, or
+    ranks that need a rebalance.
+    """
+    from pls_cli.utils.ranks import appended_rank
+    from pls_cli.utils.task_ids import new_task_ids
+
+    tasks = data.setdefault('tasks', [])
+    rebased = []
+    for change in changes:
+        operation = change['op']
+        if operation == 'add':
+            task = change['task']
+            if _find_task(tasks, task.get('id')) is not None:
+                task['id'] = new_task_ids(data, 1)[0]
+            if 'rank' in task:
+                task['rank'] = appended_rank(tasks)
+                if task['rank'] is None:
+                    return None
+        elif operation == 'set' and change['key'] == 'last_task_id':
+            value = max(change['value'], data.get('last_task_id', 0))
+            change = dict(change, value=value)
+        elif operation in ('update', 'delete'):
+            if 'id' not in change:
+                return None
+            index = _find_task(tasks, change['id'])
+            if index is None:
+                continue
+            change = dict(change, index=index)
+        elif operation == 'move':
+            if 'id' not in change or 'rank' not in change:
+                return None
+            source = _find_task(tasks, change['id'])
+            if source is None:
+                continue
+            ranks = [task.get('rank') for task in tasks]
+            del ranks[source]
+            if change['rank'] in ranks:
+                return None
+            target = sum(1 for rank in ranks if rank < change['rank'])
+            change = dict(change, **{'from': source, 'to': target})
+        elif operation == 'swap':
+            if 'ids' not in change:
+                return None
+            first, second = (_find_task(tasks, id_) for id_ in change['ids'])
+            if first is None or second is None:
+                continue
+            change = dict(change, first=first, second=second)
+        apply_change(data, change)
+        rebased.append(change)
+    return rebased
+
+
+class Journal:
+    """Append-only log of changes made on top of the config snapshot."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def size(self) -> int:
+        try:
+            return os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+
+    def append(self, changes: Iterable[dict]) -> None:
+        lines = ''.join(
+            json.dumps(change, separators=(',', ':')) + '\n'
+            for change in changes
+        )
+        from pls_cli.utils import durability
+
+        durability.append_lines(self.path, lines.encode('utf-8'))
+
+    def read(self) -> List[dict]:
+        """The changes in the journal, without a torn last record."""
+        from pls_cli.utils import durability
+
+        try:
+            return durability.read_json_lines(self.path)
+        except FileNotFoundError:
+            return []
+
+    def replay(self, data: dict) -> dict:
+        for change in self.read():
+            apply_change(data, change)
+        return data
+
+    def clear(self) -> None:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self.path)
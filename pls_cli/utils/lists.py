@@ -0,0 +1,144 @@
+"""Named task lists, each kept apart from the others.
+
+The default list is the config.json of the config directory, as it
+always was. Every other list lives in `lists/<name>/`, with its own
+config.json and the files that go with it (journal, database, lock,
+status cache, search index and archive), so a command only ever reads
+the list it works on.
+
+`lists.json` is the small file that says which list is in use. Once a
+named list exists, it also holds the configuration (name, greeting and
+archive settings), which then has to be readable without loading a list.
+
+    PLS_LIST=work   work on this list instead of the one in use
+"""
+
+import contextlib
+import json
+import os
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_LIST = 'default'
+
+# What `lists.json` takes over from the default list's config.json.
+CONFIG_KEYS = (
+    'user_name',
+    'initial_setup_done',
+    'show_task_progress',
+    'show_quotes',
+    'archive_after_days',
+)
+
+_NAME = re.compile(r'[A-Za-z0-9][A-Za-z0-9_-]{0,63}')
+
+# Decoded lists.json files keyed by path, each stored with the stamp of
+# the file it was read from; Settings() is built many times per command.
+_indexes: Dict[str, Tuple[Optional[tuple], dict]] = {}
+
+# The list picked with `pls --list` for the command being run.
+_selected: Optional[str] = None
+
+
+def is_valid_name(name: str) -> bool:
+    return _NAME.fullmatch(name) is not None
+
+
+def select(name: Optional[str]) -> None:
+    """Work on `name` for the rest of the command, None to stop."""
+    global _selected
+    _selected = name
+
+
+def selected() -> Optional[str]:
+    return _selected
+
+
+def list_names(lists_dir: str) -> List[str]:
+    """The default list, then every named list by name."""
+    try:
+        names = sorted(
+            name
+            for name in os.listdir(lists_dir)
+            if is_valid_name(name)
+            and os.path.isdir(os.path.join(lists_dir, name))
+        )
+    except FileNotFoundError:
+        names = []
+    return [DEFAULT_LIST] + [name for name in names if name != DEFAULT_LIST]
+
+
+class ListIndex:
+    """`lists.json`: the list in use and, once split, the configuration."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.lock_path = f'{os.path.splitext(path)[0]}.lock'
+
+    def _stamp(self) -> Optional[tuple]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def read(self) -> dict:
+        stamp = self._stamp()
+        cached = _indexes.get(self.path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        index: dict = {}
+        if stamp is not None:
+            try:
+                with open(self.path, encoding='utf-8') as index_file:
+                    index = json.load(index_file)
+            except (FileNotFoundError, ValueError):
+                index = {}
+            if not isinstance(index, dict):
+                index = {}
+        _indexes[self.path] = (stamp, index)
+        return index
+
+    def active(self) -> str:
+        """The list in use: PLS_LIST, else the one `pls use` picked."""
+        name = os.getenv('PLS_LIST') or self.read().get('active')
+        if not isinstance(name, str) or not is_valid_name(name):
+            return DEFAULT_LIST
+        return name
+
+    def config(self) -> Optional[dict]:
+        """The configuration, None while it is still in config.json."""
+        config = self.read().get('config')
+        return config if isinstance(config, dict) else None
+
+    @contextlib.contextmanager
+    def _updating(self) -> Iterator[dict]:
+        """Yield the index to change, then write it, under a lock."""
+        from pls_cli.utils import durability
+        from pls_cli.utils.lock import FileLock
+
+        with FileLock(self.lock_path):
+            _indexes.pop(self.path, None)
+            index = dict(self.read())
+            yield index
+            durability.write_atomic(
+                self.path, json.dumps(index, indent=4).encode('utf-8')
+            )
+            _indexes.pop(self.path, None)
+
+    def use(self, name: str) -> None:
+        with self._updating() as index:
+            index['active'] = name
+
+    def set_config(self, config: dict) -> None:
+        """Merge `config` into the configuration."""
+        with self._updating() as index:
+            index['config'] = dict(self.config() or {}, **config)
+
+    def split_config(self, config: dict) -> None:
+        """Take the configuration over from `config`, unless already done."""
+        with self._updating() as index:
+            if not isinstance(index.get('config'), dict):
+                index['config'] = {
+                    key: config[key] for key in CONFIG_KEYS if key in config
+                }
@@ -0,0 +1,84 @@
+from typing import IO, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+    import msvcrt
+
+# msvcrt locks byte ranges and other processes can't read a locked range,
+# so the byte locked on Windows lies past the version counter.
+_WINDOWS_LOCK_OFFSET = 1 << 30
+
+
+def read_version(path: str) -> int:
+    """The version counter kept in the lock file, 0 if there is none yet."""
+    try:
+        with open(path, 'rb') as lock_file:
+            return int(lock_file.read() or 0)
+    except FileNotFoundError:
+        return 0
+
+
+class FileLock:
+    """Exclusive advisory lock on a file, between processes.
+
+    The lock file also holds the config's version counter, bumped by
+    every write made while holding the lock. Entering the lock again from
+    the same FileLock only counts the depth, so a transaction can call
+    methods that lock on their own.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.depth = 0
+        self.file: Optional[IO[bytes]] = None
+
+    def __enter__(self) -> 'FileLock':
+        if not self.depth:
+            lock_file = open(self.path, 'a+b')
+            try:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                else:  # pragma: no cover - Windows
+                    lock_file.seek(_WINDOWS_LOCK_OFFSET)
+                    while True:
+                        try:
+                            msvcrt.locking(
+                                lock_file.fileno(), msvcrt.LK_LOCK, 1
+                            )
+                            break
+                        except OSError:
+                            # LK_LOCK gives up after ten seconds.
+                            continue
+            except BaseException:
+                lock_file.close()
+                raise
+            self.file = lock_file
+        self.depth += 1
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.depth -= 1
+        if self.depth or self.file is None:
+            return
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+        else:  # pragma: no cover - Windows
+            self.file.seek(_WINDOWS_LOCK_OFFSET)
+            msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+        self.file.close()
+        self.file = None
+
+    def read_version(self) -> int:
+        assert self.file is not None, 'read_version needs the lock'
+        self.file.seek(0)
+        return int(self.file.read() or 0)
+
+    def write_version(self, version: int) -> None:
+        assert self.file is not None, 'write_version needs the lock'
+        self.file.seek(0)
+        self.file.truncate()
+        # Opened for appending, the write lands at the start once empty.
+        self.file.write(str(version).encode('ascii'))
+        self.file.flush()
@@ -0,0 +1,131 @@
+"""Opt-in timing of the phases of a pls run, enabled with PLS_PROFILE.
+
+    PLS_PROFILE=1           table of phases on stderr
+    PLS_PROFILE=time        same, without tracking allocations
+    PLS_PROFILE=pls.json    table, and the phases saved as JSON
+    PLS_PROFILE=pls.prof    table without allocations, and a cProfile
+                            dump of the whole run
+
+Allocations are the bytes still allocated at the end of a phase,
+measured with tracemalloc, which also slows down the run being measured.
+When PLS_PROFILE is not set `profiled` returns functions untouched and
+`phase` hands back one shared no-op context manager.
+"""
+
+import contextlib
+import functools
+import os
+import sys
+import time
+from typing import Any, Callable, ContextManager, Dict, Iterator, TypeVar
+
+PROFILE = os.getenv('PLS_PROFILE', '')
+ENABLED = PROFILE not in ('', '0')
+
+Function = TypeVar('Function', bound=Callable[..., Any])
+
+# Phase name -> {'depth', 'calls', 'seconds', 'bytes'}, in the order each
+# phase was first entered.
+_phases: Dict[str, Dict[str, Any]] = {}
+_depth = 0
+_started = time.perf_counter()
+_disabled = contextlib.nullcontext()
+
+
+def _traced_memory() -> int:
+    import tracemalloc
+
+    return tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+
+
+@contextlib.contextmanager
+def _phase(name: str) -> Iterator[None]:
+    global _depth
+    record = _phases.setdefault(
+        name, {'depth': _depth, 'calls': 0, 'seconds': 0.0, 'bytes': 0}
+    )
+    memory = _traced_memory()
+    start = time.perf_counter()
+    _depth += 1
+    try:
+        yield
+    finally:
+        _depth -= 1
+        record['calls'] += 1
+        record['seconds'] += time.perf_counter() - start
+        record['bytes'] += _traced_memory() - memory
+
+
+def phase(name: str) -> ContextManager[None]:
+    """Time the `with` block as the phase `name`."""
+    if not ENABLED:
+        return _disabled
+    return _phase(name)
+
+
+def profiled(name: str) -> Callable[[Function], Function]:
+    """Time every call to the decorated function as the phase `name`."""
+
+    def decorate(function: Function) -> Function:
+        if not ENABLED:
+            return function
+
+        @functools.wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with _phase(name):
+                return function(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def format_phases(phases: Dict[str, Dict[str, Any]], total: float) -> str:
+    lines = [f'{"phase":<36} {"calls":>5} {"ms":>9} {"KiB":>9}']
+    for name, record in phases.items():
+        label = '  ' * record['depth'] + name
+        lines.append(
+            f'{label:<36} {record["calls"]:>5} '
+            f'{record["seconds"] * 1000:>9.1f} {record["bytes"] / 1024:>9.1f}'
+        )
+    lines.append(f'{"total":<36} {"":>5} {total * 1000:>9.1f}')
+    return '\n'.join(lines)
+
+
+def report() -> None:
+    total = time.perf_counter() - _started
+    print(format_phases(_phases, total), file=sys.stderr)
+    if PROFILE.endswith('.json'):
+        import json
+
+        with open(PROFILE, 'w', encoding='utf-8') as profile_file:
+            json.dump(
+                {'total_seconds': total, 'phases': _phases},
+                profile_file,
+                indent=2,
+            )
+
+
+def start() -> None:
+    import atexit
+
+    if PROFILE.endswith('.prof'):
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+        def dump() -> None:
+            profiler.disable()
+            profiler.dump_stats(PROFILE)
+
+        atexit.register(dump)
+    elif PROFILE != 'time':
+        import tracemalloc
+
+        tracemalloc.start()
+    atexit.register(report)
+
+
+if ENABLED:
+    start()
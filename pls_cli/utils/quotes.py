@@ -1,14 +1,120 @@
 import json
 import os
 import random
+import struct
+from typing import List, Optional, Tuple
 
+from pls_cli.utils import codec
+from pls_cli.utils.profile import profiled
+from pls_cli.utils.settings import get_config_path
 
-def get_rand_quote():
-    __location__ = os.path.realpath(
-        os.path.join(os.getcwd(), os.path.dirname(__file__))
+BUILTIN_QUOTES_PATH = os.path.join(
+    os.path.dirname(os.path.realpath(__file__)), 'quotes.json'
+)
+
+# Index layout: a header with the size and mtime of the quotes file it
+# was built from, then the byte range of every quote object in it.
+INDEX_HEADER = struct.Struct('<QQ')
+INDEX_ENTRY = struct.Struct('<QQ')
+
+
+def build_quote_offsets(quotes_path: str) -> List[Tuple[int, int]]:
+    """Return the (start, end) byte range of each quote in the file."""
+    with open(quotes_path, encoding='utf-8') as quotes_file:
+        text = quotes_file.read()
+
+    decoder = json.JSONDecoder()
+    offsets: List[Tuple[int, int]] = []
+    position = text.index('[') + 1
+    byte_position = len(text[:position].encode('utf-8'))
+    while True:
+        while position < len(text) and text[position] in ' \t\r\n,':
+            position += 1
+            byte_position += 1
+        if position >= len(text) or text[position] == ']':
+            return offsets
+        _, end = decoder.raw_decode(text, position)
+        byte_end = byte_position + len(text[position:end].encode('utf-8'))
+        offsets.append((byte_position, byte_end))
+        position, byte_position = end, byte_end
+
+
+class QuoteStore:
+    """Picks random quotes through a cached byte offset index.
+
+    A greeting costs a stat, one seek into the index and one into the
+    quotes file, however many quotes the file holds. The index is rebuilt
+    whenever the quotes file changes.
+    """
+
+    def __init__(self, quotes_path: str, index_path: str) -> None:
+        self.quotes_path = quotes_path
+        self.index_path = index_path
+
+    def _header(self) -> bytes:
+        stat = os.stat(self.quotes_path)
+        return INDEX_HEADER.pack(stat.st_size, stat.st_mtime_ns)
+
+    def build_index(self) -> List[Tuple[int, int]]:
+        header = self._header()
+        offsets = build_quote_offsets(self.quotes_path)
+        temp_path = f'{self.index_path}.tmp'
+        try:
+            with open(temp_path, 'wb') as index_file:
+                index_file.write(header)
+                index_file.write(
+                    b''.join(INDEX_ENTRY.pack(*entry) for entry in offsets)
+                )
+            os.replace(temp_path, self.index_path)
+        except OSError:
+            # Unwritable cache, keep using the in-memory index.
+            pass
+        return offsets
+
+    def pick_offsets(self) -> Optional[Tuple[int, int]]:
+        try:
+            with open(self.index_path, 'rb') as index_file:
+                if index_file.read(INDEX_HEADER.size) == self._header():
+                    index_file.seek(0, os.SEEK_END)
+                    count = (
+                        index_file.tell() - INDEX_HEADER.size
+                    ) // INDEX_ENTRY.size
+                    if not count:
+                        return None
+                    index_file.seek(
+                        INDEX_HEADER.size
+                        + random.randrange(count) * INDEX_ENTRY.size
+                    )
+                    return INDEX_ENTRY.unpack(index_file.read(INDEX_ENTRY.size))
+        except FileNotFoundError:
+            pass
+
+        offsets = self.build_index()
+        return random.choice(offsets) if offsets else None
+
+    def random_quote(self) -> Optional[dict]:
+        offsets = self.pick_offsets()
+        if offsets is None:
+            return None
+        start, end = offsets
+        with open(self.quotes_path, 'rb') as quotes_file:
+            quotes_file.seek(start)
+            return codec.loads(quotes_file.read(end - start))
+
+
+def get_quote_store() -> QuoteStore:
+    """Store for `PLS_QUOTES_FILE` if set, else for the bundled quotes."""
+    config_path = get_config_path()
+    quotes_path = os.getenv('PLS_QUOTES_FILE')
+    if quotes_path:
+        return QuoteStore(
+            quotes_path, os.path.join(config_path, 'quotes-custom.idx')
+        )
+    return QuoteStore(
+        BUILTIN_QUOTES_PATH, os.path.join(config_path, 'quotes.idx')
     )
-    with open(
-        os.path.join(__location__, 'quotes.json'), encoding='utf-8'
-    ) as quotes_file:
-        list_of_quotes = json.load(quotes_file)
-    return random.choice(list_of_quotes)
+
+
+@profiled('get_rand_quote')
+def get_rand_quote() -> Optional[dict]:
+    return get_quote_store().random_quote()
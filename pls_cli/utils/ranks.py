@@ -0,0 +1,133 @@
+import string
+from typing import List, Optional, Sequence
+
+from pls_cli.utils.tasks import update_task
+
+# Rank keys are base 62 fractions written without the leading "0.", so
+# comparing them as strings orders them like the numbers they stand for.
+# They never end with DIGITS[0], which leaves room before any key.
+DIGITS = string.digits + string.ascii_uppercase + string.ascii_lowercase
+BASE = len(DIGITS)
+
+# Keys longer than this are spread out again with `balanced_ranks`.
+MAX_RANK_LENGTH = 16
+
+
+def _digit(rank: Optional[str], index: int, default: int) -> int:
+    if rank is None or index >= len(rank):
+        return default
+    return DIGITS.index(rank[index])
+
+
+def rank_between(before: Optional[str], after: Optional[str]) -> str:
+    """A key that sorts strictly between `before` and `after`.
+
+    `None` stands for the start or the end of the list. Keys at either end
+    step by one digit, so runs of tasks added at the bottom keep them
+    short; keys between two tasks take the midpoint digit.
+    """
+    if before is not None and after is not None and not before < after:
+        raise ValueError(f'Rank {before!r} is not before {after!r}')
+
+    at_start, at_end = before is None, after is None
+    rank = ''
+    index = 0
+    while True:
+        low = _digit(before, index, 0)
+        high = _digit(after, index, BASE)
+        if high - low > 1:
+            if at_end and not at_start:
+                digit = low + 1
+            elif at_start and not at_end:
+                digit = high - 1
+            else:
+                digit = (low + high) // 2
+            return rank + DIGITS[digit]
+
+        rank += DIGITS[low]
+        if high != low:
+            # Already below `after`, whatever digits come next.
+            after = None
+        index += 1
+
+
+def balanced_ranks(count: int) -> List[str]:
+    """`count` keys of the same length, evenly spread out."""
+    width = 1
+    while BASE**width <= count:
+        width += 1
+    ranks = []
+    for position in range(1, count + 1):
+        value = position * BASE**width // (count + 1)
+        digits = ''
+        for _ in range(width):
+            value, digit = divmod(value, BASE)
+            digits = DIGITS[digit] + digits
+        ranks.append(digits.rstrip(DIGITS[0]))
+    return ranks
+
+
+def rebalance_ranks(tasks: List[dict]) -> None:
+    """Give `tasks` fresh, evenly spread keys in their current order."""
+    for index, rank in enumerate(balanced_ranks(len(tasks))):
+        update_task(tasks, index, {'rank': rank})
+
+
+def assign_task_ranks(data: dict) -> bool:
+    """Make sure every task has a key and the tasks are in key order.
+
+    Returns if anything changed. Tasks without keys (from before they
+    existed) keep their order and get fresh keys.
+    """
+    tasks = data.get('tasks', [])
+    if all('rank' in task for task in tasks):
+        if _in_rank_order(tasks):
+            return False
+        tasks.sort(key=lambda task: task['rank'])
+        if _in_rank_order(tasks):
+            return True
+    rebalance_ranks(tasks)
+    return True
+
+
+def _in_rank_order(tasks: List[dict]) -> bool:
+    return all(
+        previous['rank'] < task['rank']
+        for previous, task in zip(tasks, tasks[1:])
+    )
+
+
+def _checked(rank: str) -> Optional[str]:
+    return rank if len(rank) <= MAX_RANK_LENGTH else None
+
+
+def appended_rank(tasks: List[dict]) -> Optional[str]:
+    """Key for a task added at the bottom of `tasks`.
+
+    None when the keys have grown too long and `rebalance_ranks` is due.
+    """
+    return _checked(rank_between(tasks[-1]['rank'] if tasks else None, None))
+
+
+def moved_rank(
+    tasks: Sequence[dict], source: int, target: int
+) -> Optional[str]:
+    """Key for the task at `source` once it is moved to `target`.
+
+    Only the neighbours at the target are looked at, so this doesn't
+    depend on the length of the list. None when they are too close
+    together and `rebalance_ranks` is due.
+    """
+    if not (0 <= source < len(tasks) and 0 <= target < len(tasks)):
+        raise IndexError(f'Cannot move task {source} to {target}')
+
+    def rank_without_source(index: int) -> Optional[str]:
+        if not 0 <= index < len(tasks) - 1:
+            return None
+        return tasks[index if index < source else index + 1]['rank']
+
+    return _checked(
+        rank_between(
+            rank_without_source(target - 1), rank_without_source(target)
+        )
+    )
@@ -0,0 +1,215 @@
+"""Task counts read straight from config.json, without decoding it.
+
+The file is read in chunks and only the `"done": true|false` keys of the
+tasks array are looked at, so memory stays bounded by the chunk size
+whatever the size of the config and no dict is built for a task; the
+one exception is the first pending task, whose name the status line
+shows. Anything the scanner doesn't expect raises ValueError, and the
+caller decodes the config instead.
+
+A quote inside a JSON string is always escaped, so a `"done"` followed
+by a colon and not preceded by a backslash can only be a key, and only
+task objects have a `done` key.
+"""
+
+import json
+import re
+from typing import BinaryIO, Iterator, Optional, Pattern, Tuple
+
+CHUNK_SIZE = 256 * 1024
+MAX_TOKEN_SIZE = 1024 * 1024
+
+_STRING = rb'"[^"\\]*(?:\\.[^"\\]*)*"'
+# A token of the document before the tasks array.
+_TOKEN = re.compile(
+    rb'\s*(?:(' + _STRING + rb')|([{}\[\]:,])|([^\s{}\[\]:,"]+))', re.DOTALL
+)
+_DONE = re.compile(rb'"done"\s*:\s*(true|false)')
+_PENDING = re.compile(rb'"done"\s*:\s*false')
+# Everything up to the `{` opening the next object.
+_OBJECT_START = re.compile(rb'(?:' + _STRING + rb'|[^"{])*\{', re.DOTALL)
+# The rest of a flat object once its `{` is consumed.
+_OBJECT_END = re.compile(rb'(?:' + _STRING + rb'|[^{}\[\]"])*\}', re.DOTALL)
+
+
+class _Reader:
+    def __init__(self, config_file: BinaryIO) -> None:
+        self.file = config_file
+        self.buffer = b''
+        self.position = 0
+        # File offset of the start of the buffer.
+        self.offset = 0
+        self.eof = False
+
+    def seek(self, offset: int) -> None:
+        self.file.seek(offset)
+        self.buffer = b''
+        self.position = 0
+        self.offset = offset
+        self.eof = False
+
+    def fill(self, keep_from: Optional[int] = None) -> None:
+        """Read the next chunk, keeping the buffer from `keep_from` on."""
+        keep_from = self.position if keep_from is None else keep_from
+        if len(self.buffer) - keep_from > MAX_TOKEN_SIZE:
+            raise ValueError('Token too large to scan')
+        chunk = self.file.read(CHUNK_SIZE)
+        self.eof = not chunk
+        self.offset += keep_from
+        self.position -= keep_from
+        self.buffer = self.buffer[keep_from:] + chunk
+
+    def match(self, pattern: Pattern[bytes]) -> Optional['re.Match[bytes]']:
+        """Match `pattern` at the current position, reading on as needed.
+
+        A match reaching the end of the buffer might grow with more data,
+        so it is only trusted once the file is exhausted.
+        """
+        while True:
+            match = pattern.match(self.buffer, self.position)
+            if self.eof or (match and match.end() < len(self.buffer)):
+                if match:
+                    self.position = match.end()
+                return match
+            self.fill()
+
+
+def _seek_tasks(reader: _Reader) -> bool:
+    """Move past the `[` opening the top-level tasks array, if any."""
+    depth = 0
+    previous = (b'', b'')
+    while True:
+        token = reader.match(_TOKEN)
+        if token is None:
+            if not reader.buffer[reader.position :].strip():
+                return False
+            raise ValueError('Not a config document')
+        value = token.group(token.lastindex or 0)
+        if value == b'[' and depth == 1 and previous == (b'"tasks"', b':'):
+            return True
+        if value in (b'{', b'['):
+            depth += 1
+        elif value in (b'}', b']'):
+            depth -= 1
+        if depth == 1:
+            previous = (previous[1], value)
+
+
+def _regions(reader: _Reader) -> Iterator[Tuple[bytes, int, int, int]]:
+    """Spans of the buffer after the tasks array opens, chunk by chunk.
+
+    Yields the buffer, the span start and end, and the file offset of the
+    buffer. A span ends on a comma or brace, which a `done` key never
+    holds, so no key is ever cut in two.
+    """
+    if not _seek_tasks(reader):
+        return
+    while True:
+        buffer, start = reader.buffer, reader.position
+        if reader.eof:
+            if not buffer.rstrip().endswith(b'}'):
+                # Cut short, maybe by a write still in progress.
+                raise ValueError('Truncated config document')
+            end = len(buffer)
+        else:
+            end = max(buffer.rfind(b',', start), buffer.rfind(b'}', start))
+        if end > start:
+            yield buffer, start, end, reader.offset
+            reader.position = end
+        if reader.eof:
+            return
+        reader.fill()
+
+
+def _is_key(buffer: bytes, key: 're.Match[bytes]') -> bool:
+    return buffer[key.start() - 1 : key.start()] != b'\\'
+
+
+def _count_done(buffer: bytes, start: int, end: int) -> Tuple[int, int]:
+    """How many tasks are done, and how many there are, in a span."""
+    if buffer.find(b'\\"done"', start, end) == -1:
+        flags = _DONE.findall(buffer, start, end)
+    else:
+        flags = [
+            key.group(1)
+            for key in _DONE.finditer(buffer, start, end)
+            if _is_key(buffer, key)
+        ]
+    return flags.count(b'true'), len(flags)
+
+
+def _find_pending(
+    buffer: bytes, start: int, end: int
+) -> Optional['re.Match[bytes]']:
+    """The `done` key of the first pending task in a span."""
+    key = _PENDING.search(buffer, start, end)
+    while key is not None and not _is_key(buffer, key):
+        key = _PENDING.search(buffer, key.end(), end)
+    return key
+
+
+def _last_key_end(buffer: bytes, start: int, end: int) -> Optional[int]:
+    at = buffer.rfind(b'"done"', start, end)
+    while at != -1:
+        key = _DONE.match(buffer, at, end)
+        if key is not None and _is_key(buffer, key):
+            return key.end()
+        at = buffer.rfind(b'"done"', start, at)
+    return None
+
+
+def _task_after(reader: _Reader, offset: Optional[int]) -> dict:
+    """Decode the first task after file `offset`, or in the tasks array."""
+    if offset is None:
+        reader.seek(0)
+        _seek_tasks(reader)
+    else:
+        reader.seek(offset)
+    start = reader.match(_OBJECT_START)
+    end = reader.match(_OBJECT_END)
+    if start is None or end is None:
+        raise ValueError('Unexpected task in config')
+    return json.loads(b'{' + end.group())
+
+
+def summarize_config(path: str) -> dict:
+    """The `status.summarize` of the tasks in the config at `path`."""
+    done = total = 0
+    pending = False
+    # The end of the last `done` key before the first pending task.
+    previous_key: Optional[int] = None
+    with open(path, 'rb') as config_file:
+        reader = _Reader(config_file)
+        for buffer, start, end, offset in _regions(reader):
+            if not pending:
+                key = _find_pending(buffer, start, end)
+                pending = key is not None
+                key_end = _last_key_end(
+                    buffer, start, key.start() if key else end
+                )
+                if key_end is not None:
+                    previous_key = offset + key_end
+            counts = _count_done(buffer, start, end)
+            done += counts[0]
+            total += counts[1]
+        next_task = None
+        if pending:
+            next_task = _task_after(reader, previous_key)['name']
+    return {
+        'done': done,
+        'undone': total - done,
+        'total': total,
+        'next': next_task,
+    }
+
+
+def all_tasks_done(path: str) -> bool:
+    """If no task in the config at `path` is pending.
+
+    Stops at the first pending task, which usually sits near the top.
+    """
+    with open(path, 'rb') as config_file:
+        return not any(
+            _find_pending(buffer, start, end)
+            for buffer, start, end, _ in _regions(_Reader(config_file))
+        )
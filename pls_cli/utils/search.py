@@ -0,0 +1,235 @@
+import contextlib
+import re
+import sqlite3
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    task_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    token TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    PRIMARY KEY (token, task_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_task ON postings (task_id, token);
+CREATE INDEX IF NOT EXISTS entries_age ON entries (length(task_id), task_id);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+TOKEN = re.compile(r'\w+')
+
+# Sorts after every token that starts with a given prefix.
+PREFIX_END = chr(0x10FFFF)
+
+# Past this many postings a prefix is just "common" when picking the
+# rarest one.
+ESTIMATE_LIMIT = 100_000
+
+# Matches are counted up to this many.
+COUNT_LIMIT = 1000
+
+# Task IDs are numbers in base 36 (see `task_ids`): shorter ones are
+# older, and among as long ones they sort like their numbers.
+AGE = 'length(task_id), task_id'
+
+# If the task has a word between the next two bounds.
+HAS_TOKEN = (
+    'EXISTS (SELECT 1 FROM postings AS other WHERE other.task_id = {task} '
+    'AND other.token >= ? AND other.token < ?)'
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words of `text`, each one once."""
+    return list(dict.fromkeys(TOKEN.findall(text.lower())))
+
+
+def age(task_id: str) -> Tuple[int, str]:
+    """Sort key putting older tasks first, like ORDER BY AGE."""
+    return len(task_id), task_id
+
+
+class SearchIndex:
+    """Inverted index of task names, keyed by task ID.
+
+    Kept in its own SQLite file so a search reads only the postings of the
+    searched words, never the task list. The index remembers the store
+    stamp it was last synced with, so edits made behind its back are
+    noticed (see `stamp`).
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.connection = sqlite3.connect(path, isolation_level=None)
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    @property
+    def stamp(self) -> Optional[str]:
+        row = self.connection.execute(
+            "SELECT value FROM meta WHERE key = 'stamp'"
+        ).fetchone()
+        return row[0] if row else None
+
+    def set_stamp(self, stamp: str) -> None:
+        self.connection.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('stamp', ?)",
+            (stamp,),
+        )
+
+    def add(self, task_id: str, name: str) -> None:
+        self.remove(task_id)
+        self.connection.execute(
+            'INSERT INTO entries (task_id, name) VALUES (?, ?)', (task_id, name)
+        )
+        self.connection.executemany(
+            'INSERT INTO postings (token, task_id) VALUES (?, ?)',
+            [(token, task_id) for token in tokenize(name)],
+        )
+
+    def remove(self, task_id: str) -> None:
+        self.connection.execute(
+            'DELETE FROM postings WHERE task_id = ?', (task_id,)
+        )
+        self.connection.execute(
+            'DELETE FROM entries WHERE task_id = ?', (task_id,)
+        )
+
+    def apply(self, data: dict, changes: List[dict], stamp: str) -> None:
+        """Index what the journal records `changes` did to `data`.
+
+        Only added, renamed and deleted tasks are touched; anything that
+        can't be followed record by record falls back to `sync`.
+        """
+        with self.transaction():
+            for change in changes:
+                operation = change['op']
+                if operation == 'add':
+                    self.add(change['task']['id'], change['task']['name'])
+                elif operation == 'update' and 'name' in change['fields']:
+                    if change.get('id') is None:
+                        break
+                    self.add(change['id'], change['fields']['name'])
+                elif operation == 'delete':
+                    if change.get('id') is None:
+                        break
+                    self.remove(change['id'])
+            else:
+                self.set_stamp(stamp)
+                return
+        self.sync(data.get('tasks', []), stamp)
+
+    def sync(self, tasks: Iterable[dict], stamp: str) -> None:
+        """Make the index match `tasks`, only indexing what changed."""
+        with self.transaction():
+            indexed = dict(
+                self.connection.execute('SELECT task_id, name FROM entries')
+            )
+            for task in tasks:
+                task_id = task.get('id')
+                if task_id is None:
+                    continue
+                if indexed.pop(task_id, None) != task['name']:
+                    self.add(task_id, task['name'])
+            for task_id in indexed:
+                self.remove(task_id)
+            self.set_stamp(stamp)
+
+    def search(
+        self, terms: Iterable[str], limit: int
+    ) -> Tuple[List[Tuple[str, str]], int]:
+        """Tasks with words starting with every term, and their count.
+
+        Returns at most `limit` (task ID, name) pairs, oldest task first,
+        and how many tasks match, counted up to COUNT_LIMIT.
+
+        Only the postings of the rarest prefix are read; each of them is
+        checked for the other prefixes by a lookup in the task's own
+        postings, most selective first. When the matches are too many to
+        count they are common enough that walking the tasks in order
+        reaches the first ones sooner.
+        """
+        tokens = self.by_rarity(
+            [token for term in terms for token in tokenize(term)]
+        )
+        if not tokens:
+            return [], 0
+        bounds = [
+            bound for token in tokens for bound in (token, token + PREFIX_END)
+        ]
+        matches = ' AND '.join(
+            ['first.token >= ? AND first.token < ?']
+            + [HAS_TOKEN.format(task='first.task_id')] * (len(tokens) - 1)
+        )
+        found = self.connection.execute(
+            f'SELECT task_id FROM postings AS first WHERE {matches} LIMIT ?',
+            [*bounds, COUNT_LIMIT],
+        ).fetchall()
+        if len(found) < COUNT_LIMIT:
+            task_ids = sorted({task_id for (task_id,) in found}, key=age)
+            first = task_ids[:limit]
+            names = dict(
+                self.connection.execute(
+                    'SELECT task_id, name FROM entries WHERE task_id IN '
+                    f'({", ".join("?" * len(first))})',
+                    first,
+                )
+            )
+            return [(task_id, names[task_id]) for task_id in first], len(
+                task_ids
+            )
+
+        matches = ' AND '.join(
+            [HAS_TOKEN.format(task='entries.task_id')] * len(tokens)
+        )
+        rows = self.connection.execute(
+            f'SELECT task_id, name FROM entries WHERE {matches} '
+            f'ORDER BY {AGE} LIMIT ?',
+            [*bounds, limit],
+        ).fetchall()
+        return rows, COUNT_LIMIT
+
+    def by_rarity(self, tokens: List[str]) -> List[str]:
+        """`tokens` from the one with the fewest postings on.
+
+        Each token is only counted up to the fewest postings found so far:
+        past that it isn't the rarest, and checking it for a task is a
+        lookup whatever its count.
+        """
+        # Longer prefixes tend to be rarer, counted first they bound the
+        # others sooner.
+        tokens = sorted(dict.fromkeys(tokens), key=len, reverse=True)
+        if len(tokens) < 2:
+            return tokens
+        fewest = ESTIMATE_LIMIT
+        counts = {}
+        for token in tokens:
+            counts[token] = self.estimate(token, fewest)
+            fewest = min(fewest, counts[token])
+        return sorted(tokens, key=counts.__getitem__)
+
+    def estimate(self, token: str, limit: int = ESTIMATE_LIMIT) -> int:
+        """Postings starting with `token`, counted up to `limit`."""
+        (count,) = self.connection.execute(
+            'SELECT COUNT(*) FROM (SELECT 1 FROM postings '
+            'WHERE token >= ? AND token < ? LIMIT ?)',
+            (token, token + PREFIX_END, limit),
+        ).fetchone()
+        return count
+
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator[None]:
+        self.connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except BaseException:
+            self.connection.execute('ROLLBACK')
+            raise
+        self.connection.execute('COMMIT')
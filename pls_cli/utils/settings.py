@@ -1,79 +1,901 @@
+import contextlib
 import json
 import os
 from os.path import expanduser
-from typing import List
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from pls_cli.utils import lists
+from pls_cli.utils.journal import Journal, apply_change
+from pls_cli.utils.profile import profiled
+from pls_cli.utils.status import StatusCache, summarize
+
+if TYPE_CHECKING:
+    import threading
+
+    from pls_cli.utils.archive import Archive
+    from pls_cli.utils.greeting import GreetingCache
+    from pls_cli.utils.lock import FileLock
+    from pls_cli.utils.search import SearchIndex
+    from pls_cli.utils.sqlite_store import SqliteStore
+
+STORAGE_JSON = 'json'
+STORAGE_JOURNAL = 'journal'
+STORAGE_SQLITE = 'sqlite'
+
+# Parsed config documents keyed by path, each stored with the
+# (mtime_ns, size) stamp of the file it was read from. Every Settings()
+# instance in a process shares this, so the file is parsed only once
+# until it changes on disk.
+_snapshots: Dict[str, Tuple[tuple, dict]] = {}
+
+# Journal compactions still writing in the background, keyed by path.
+_compactions: Dict[str, 'threading.Thread'] = {}
+
+# Full writes of config.json still running in the background, keyed by
+# path, each with the list its error goes to if it fails.
+_writes: Dict[str, Tuple['threading.Thread', List[BaseException]]] = {}
+
+# Task ID -> position maps, each built once for the snapshot it is stored
+# with and dropped whenever the tasks are written.
+_task_positions: Dict[str, Tuple[dict, Dict[str, int]]] = {}
+
+# Open SQLite stores keyed by database path, one connection per process.
+_stores: Dict[str, 'SqliteStore'] = {}
+
+# Open search indexes keyed by path, like the stores.
+_search_indexes: Dict[str, 'SearchIndex'] = {}
+
+# Config locks keyed by lock file path, one per process so it can be
+# entered again by nested calls.
+_locks: Dict[str, 'FileLock'] = {}
+
+# The version of the config each snapshot was read at, keyed by lock
+# file path. A write finding another version in the lock file knows
+# some other process wrote in between.
+_versions: Dict[str, int] = {}
+
+
+class ConflictError(Exception):
+    """The config changed under a write that can't be merged with it."""
+
+
+def get_config_path() -> str:
+    """The config directory, with what every list shares."""
+    return os.path.join(expanduser('~'), '.config', 'pls')
+
+
+def wait_for_writes() -> None:
+    """Wait for every background write, raising the first error.
+
+    Unlike `Settings.wait_for_write`, this doesn't depend on which list
+    is in use by the time it is called.
+    """
+    errors: List[BaseException] = []
+    while _writes:
+        _, (writer, write_errors) = _writes.popitem()
+        writer.join()
+        errors.extend(write_errors)
+    if errors:
+        raise errors[0]
+
+
+def _file_stamp(path: str) -> Tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _journal_max_bytes() -> int:
+    return int(os.getenv('PLS_JOURNAL_MAX_BYTES', str(256 * 1024)))
 
 
 class Settings:
-    def __init__(self) -> None:
+    def __init__(self, list_name: Optional[str] = None) -> None:
+        """The settings of `list_name`, by default the list in use.
+
+        Everything about the tasks (config.json and the files kept next to
+        it) lives in the list's directory; what is shared by all lists
+        stays in the config directory.
+        """
         self.config_name = self.get_config_name()
         self.config_path = self.get_config_path()
-        self.full_settings_path = os.path.join(
-            self.config_path, self.config_name
+        self.lists = lists.ListIndex(
+            os.path.join(self.config_path, self.get_lists_name())
         )
+        self.list_name = list_name or lists.selected() or self.lists.active()
+        self.list_path = self.get_list_path()
+        self.full_settings_path = os.path.join(self.list_path, self.config_name)
         self.create_dir_if_not_exists()
         self.minimal_default_config = {'user_name': '', 'tasks': []}
+        self.storage = self.get_storage()
+        self.journal = Journal(
+            os.path.join(self.list_path, self.get_journal_name())
+        )
+        self.database_path = os.path.join(
+            self.list_path, self.get_database_name()
+        )
+        self.status_cache = StatusCache(
+            os.path.join(self.list_path, self.get_status_name())
+        )
+        self.socket_path = os.path.join(
+            self.config_path, self.get_socket_name()
+        )
+        self.search_path = os.path.join(self.list_path, self.get_search_name())
+        self.archive_path = os.path.join(
+            self.list_path, self.get_archive_name()
+        )
+        self.lock_path = os.path.join(self.list_path, self.get_lock_name())
+        self.greeting_path = os.path.join(
+            self.config_path, self.get_greeting_name()
+        )
+        self.theme_path = os.path.join(self.config_path, self.get_theme_name())
 
     def get_config_name(self):
         return 'config.json'
 
+    def get_journal_name(self):
+        return 'config.journal'
+
+    def get_database_name(self):
+        return 'config.db'
+
+    def get_status_name(self):
+        return 'status.json'
+
+    def get_socket_name(self):
+        return 'pls.sock'
+
+    def get_search_name(self):
+        return 'search.db'
+
+    def get_archive_name(self):
+        return 'archive'
+
+    def get_lock_name(self):
+        return 'config.lock'
+
+    def get_greeting_name(self):
+        return 'greeting.json'
+
+    def get_theme_name(self):
+        return 'theme.json'
+
+    def get_lists_name(self):
+        return 'lists.json'
+
+    def get_lists_dir(self) -> str:
+        return os.path.join(self.config_path, 'lists')
+
+    def get_list_path(self) -> str:
+        if self.list_name == lists.DEFAULT_LIST:
+            return self.config_path
+        return os.path.join(self.get_lists_dir(), self.list_name)
+
+    def get_storage(self) -> str:
+        return os.getenv('PLS_STORAGE', STORAGE_JSON)
+
     def get_config_path(self):
-        return os.path.join(expanduser('~'), '.config', 'pls')
+        return get_config_path()
 
     def get_full_settings_path(self):
         return self.full_settings_path
 
     def create_dir_if_not_exists(self) -> None:
+        # Named lists are only made by `create_list`.
         if not os.path.exists(self.config_path):
             os.makedirs(self.config_path)
 
+    def exists_list(self) -> bool:
+        return self.list_name == lists.DEFAULT_LIST or os.path.isdir(
+            self.list_path
+        )
+
+    def create_list(self) -> None:
+        os.makedirs(self.list_path, exist_ok=True)
+        if self.list_name != lists.DEFAULT_LIST and self.lists.config() is None:
+            # The first named list: the configuration moves out of the
+            # default list, which the other lists shouldn't have to load.
+            default = Settings(lists.DEFAULT_LIST)
+            self.lists.split_config(
+                default.get_settings() if default.exists_settings() else {}
+            )
+
+    def get_config(self) -> dict:
+        """The configuration shared by every list, like the user's name."""
+        config = self.lists.config()
+        if config is not None:
+            return config
+        return self.get_list_settings()
+
+    def get_list_settings(self) -> dict:
+        """The settings of this list, its tasks left out if that's cheaper."""
+        if (
+            self.uses_sqlite()
+            and self.exists_settings()
+            and self.database_path not in _snapshots
+        ):
+            # Not worth loading every task for.
+            return self.get_store().load_settings()
+        return self.get_settings()
+
+    def set_config(self, key: str, value: object) -> None:
+        config = self.lists.config()
+        if config is not None:
+            self.lists.set_config({key: value})
+            return
+        data = self.get_settings()
+        data[key] = value
+        self.write_settings(data, [{'op': 'set', 'key': key, 'value': value}])
+
+    def separate_config(self, data: dict) -> dict:
+        """Move the configuration out of `data` if lists.json holds it.
+
+        For a whole document about to be written, like the one `setup`
+        builds; returns `data`.
+        """
+        if self.lists.config() is not None:
+            self.lists.set_config(
+                {key: data.pop(key) for key in lists.CONFIG_KEYS if key in data}
+            )
+        return data
+
+    def is_set_up(self) -> bool:
+        config = self.lists.config()
+        if config is not None:
+            return bool(config)
+        return self.exists_settings()
+
     def exists_settings(self) -> bool:
+        if self.uses_sqlite() and os.path.exists(self.database_path):
+            return True
         return os.path.exists(self.full_settings_path)
 
+    def uses_journal(self) -> bool:
+        return self.storage == STORAGE_JOURNAL
+
+    def uses_sqlite(self) -> bool:
+        return self.storage == STORAGE_SQLITE
+
+    def get_store(self) -> 'SqliteStore':
+        """Open the SQLite store, migrating config.json into it once.
+
+        config.json is left in place as a backup; once the database exists
+        it is the only source of truth for the sqlite storage.
+        """
+        store = _stores.get(self.database_path)
+        if store is not None:
+            return store
+
+        from pls_cli.utils.sqlite_store import SqliteStore
+
+        migrate = not os.path.exists(self.database_path) and os.path.exists(
+            self.full_settings_path
+        )
+        store = SqliteStore(self.database_path)
+        if migrate:
+            store.replace(self.read_json_settings())
+        _stores[self.database_path] = store
+        return store
+
+    def _stamp(self) -> tuple:
+        stamp = _file_stamp(self.full_settings_path)
+        if self.journal.exists():
+            return stamp + _file_stamp(self.journal.path)
+        return stamp
+
+    @profiled('Settings.get_settings')
     def get_settings(self) -> dict:
-        if os.path.exists(self.full_settings_path):
-            with open(self.full_settings_path, encoding='utf-8') as config_file:
-                return json.load(config_file)
-        return self.minimal_default_config
+        """Return the config snapshot, parsing the file only if it changed.
+
+        The returned dict is shared by every caller in the process, so
+        changes made to it must either be persisted with `write_settings`
+        or dropped with `invalidate`.
+        """
+        if self.uses_sqlite():
+            return self.get_sqlite_settings()
+
+        if self.writing_in_background():
+            # Our own snapshot is the newest state while it is being
+            # written back, so there is nothing to re-read yet.
+            return _snapshots[self.full_settings_path][1]
+
+        try:
+            stamp = self._stamp()
+        except FileNotFoundError:
+            self.record_version()
+            return self.minimal_default_config
+
+        cached = _snapshots.get(self.full_settings_path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        self.record_version()
+        data = self.read_json_settings()
+        _snapshots[self.full_settings_path] = (stamp, data)
+        if self.migrate(data):
+            self.write_settings(data)
+        return data
+
+    def read_json_settings(self) -> dict:
+        from pls_cli.utils import codec
+        from pls_cli.utils.tasks import TaskList
+
+        with open(self.full_settings_path, 'rb') as config_file:
+            data = codec.loads(config_file.read())
+        data['tasks'] = TaskList(data.get('tasks', []))
+        # Replayed whatever the storage setting, so switching back to plain
+        # JSON never loses journaled changes.
+        return self.journal.replay(data)
+
+    def get_sqlite_settings(self) -> dict:
+        if not self.exists_settings():
+            self.record_version()
+            return self.minimal_default_config
+
+        from pls_cli.utils.tasks import TaskList
+
+        store = self.get_store()
+        stamp = _file_stamp(self.database_path)
+        cached = _snapshots.get(self.database_path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        self.record_version()
+        data = store.load()
+        data['tasks'] = TaskList(data.get('tasks', []))
+        _snapshots[self.database_path] = (stamp, data)
+        if self.migrate(data):
+            self.write_settings(data)
+        return data
+
+    def migrate(self, data: dict) -> bool:
+        """Bring a document from an older version up to date in place.
+
+        Gives tasks their IDs and rank keys; returns if it changed
+        anything, so the caller can save it once.
+        """
+        # Imported here to keep them off the integration fast path, which
+        # only reads the status cache.
+        from pls_cli.utils.ranks import assign_task_ranks
+        from pls_cli.utils.task_ids import assign_task_ids
+
+        ids_changed = assign_task_ids(data)
+        ranks_changed = assign_task_ranks(data)
+        return ids_changed or ranks_changed
+
+    @profiled('Settings.write_settings')
+    def write_settings(
+        self, data: dict, changes: Optional[List[dict]] = None
+    ) -> None:
+        """Persist `data`, the full config document.
+
+        With the journal storage, `changes` (the journal records that turn
+        the previous snapshot into `data`) are appended to the journal
+        instead of rewriting the whole file. Without them, or once the
+        journal outgrows `PLS_JOURNAL_MAX_BYTES`, the document is written
+        in full and the journal is folded away. The sqlite storage applies
+        `changes` as single-row updates instead.
 
-    def write_settings(self, data: dict) -> None:
-        with open(
-            self.full_settings_path, 'w', encoding='utf-8'
-        ) as config_file:
-            json.dump(data, config_file, indent=2)
+        The write happens under the config lock. If another process wrote
+        since `data` was read, `changes` are replayed onto its version
+        (see `journal.rebase_changes`) and `data` becomes that merged
+        document; a write without `changes` can't be merged and raises
+        ConflictError, use `transaction` around those.
+
+        A full rewrite of config.json outside of a transaction returns as
+        soon as `data` is encoded, see `persist_in_background`.
+        """
+        in_background = False
+        with self.lock() as lock:
+            version = lock.read_version()
+            if _versions.get(self.lock_path, version) != version:
+                data, changes = self.rebase(data, changes)
+                version = lock.read_version()
+            if lock.depth == 1 and self.can_persist_in_background(changes):
+                # Held on past this block for the writer thread, which
+                # lets go of it once done.
+                lock.__enter__()
+                in_background = True
+            else:
+                self.persist(data, changes)
+                lock.write_version(version + 1)
+                if (
+                    not self.uses_sqlite()
+                    and self.journal.size() > _journal_max_bytes()
+                ):
+                    self.compact_in_background(data, version + 1)
+            _versions[self.lock_path] = version + 1
+        if in_background:
+            self.persist_in_background(data, lock, version + 1)
+
+    def persist(self, data: dict, changes: Optional[List[dict]]) -> None:
+        from pls_cli.utils.tasks import TaskList
+
+        _task_positions.pop(self.full_settings_path, None)
+        if not isinstance(data.get('tasks'), TaskList):
+            # Commands may have replaced the list with a plain one.
+            data['tasks'] = TaskList(data.get('tasks', []))
+        if self.uses_sqlite():
+            store = self.get_store()
+            if changes:
+                store.apply(changes)
+            else:
+                store.replace(data)
+            _snapshots[self.database_path] = (
+                _file_stamp(self.database_path),
+                data,
+            )
+            self.write_status(data)
+            self.update_search_index(data, changes)
+            return
+
+        if self.uses_journal() and changes and self.exists_settings():
+            self.journal.append(changes)
+            _snapshots[self.full_settings_path] = (self._stamp(), data)
+            self.write_status(data)
+            self.update_search_index(data, changes)
+            return
+
+        from pls_cli.utils import codec, durability
+
+        durability.write_atomic(self.full_settings_path, codec.dumps(data))
+        self.journal.clear()
+        _snapshots[self.full_settings_path] = (self._stamp(), data)
+        self.write_status(data)
+        self.update_search_index(data, changes)
+
+    def can_persist_in_background(self, changes: Optional[List[dict]]) -> bool:
+        """If `persist` would rewrite config.json in full, and nothing else.
+
+        The SQLite connections of the store and the search index can only
+        be used from the thread that opened them, and journal appends are
+        too small to be worth a thread.
+        """
+        return not (
+            self.uses_sqlite()
+            or (self.uses_journal() and changes and self.exists_settings())
+            or os.path.exists(self.search_path)
+        )
+
+    def persist_in_background(
+        self, data: dict, lock: 'FileLock', version: int
+    ) -> None:
+        """Rewrite config.json with `data` on a worker thread.
+
+        Like `compact_in_background`, the document and its status are
+        encoded up front and the thread is not a daemon, so the process
+        waits for the write before exiting; the durability policy applies
+        to it as to any write. Meanwhile the snapshot serves reads, and
+        `lock`, held by the caller, keeps other processes out until the
+        thread lets go of it with the config at `version`.
+        """
+        import threading
+
+        from pls_cli.utils import codec, durability
+        from pls_cli.utils.tasks import TaskList
+
+        try:
+            _task_positions.pop(self.full_settings_path, None)
+            if not isinstance(data.get('tasks'), TaskList):
+                data['tasks'] = TaskList(data.get('tasks', []))
+            payload = codec.dumps(data)
+            status = summarize(data['tasks'])
+        except BaseException:
+            lock.__exit__()
+            raise
+        # No file has this stamp, the snapshot is re-read if the write
+        # fails.
+        _snapshots[self.full_settings_path] = ((), data)
+        errors: List[BaseException] = []
+
+        def write() -> None:
+            try:
+                durability.write_atomic(self.full_settings_path, payload)
+                self.journal.clear()
+                stamp = self._stamp()
+                _snapshots[self.full_settings_path] = (stamp, data)
+                self.status_cache.save(status, list(stamp))
+                lock.write_version(version)
+            except BaseException as error:
+                errors.append(error)
+            finally:
+                lock.__exit__()
+
+        writer = threading.Thread(target=write, name='pls-write')
+        _writes[self.full_settings_path] = (writer, errors)
+        writer.start()
+
+    def wait_for_write(self) -> None:
+        """Wait for the background write, raising the error it ran into."""
+        pending = _writes.pop(self.full_settings_path, None)
+        if pending is None:
+            return
+        writer, errors = pending
+        writer.join()
+        if errors:
+            raise errors[0]
+
+    def writing_in_background(self) -> bool:
+        """If a thread is writing config.json from the snapshot."""
+        compaction = _compactions.get(self.full_settings_path)
+        if compaction is not None and compaction.is_alive():
+            return True
+        pending = _writes.get(self.full_settings_path)
+        return pending is not None and pending[0].is_alive()
+
+    def rebase(
+        self, data: dict, changes: Optional[List[dict]]
+    ) -> Tuple[dict, List[dict]]:
+        """Replay `changes` onto the config as another process left it."""
+        from pls_cli.utils.journal import rebase_changes
+
+        rebased = None
+        if changes is not None:
+            self.invalidate()
+            data = self.get_settings()
+            rebased = rebase_changes(data, changes)
+        if rebased is None:
+            self.invalidate()
+            raise ConflictError(
+                'The tasks were changed by another pls meanwhile, '
+                'please try again'
+            )
+        return data, rebased
+
+    def compact_in_background(self, data: dict, version: int) -> None:
+        """Fold the journal back into config.json on a worker thread.
+
+        The document is encoded up front so later in-memory changes can't
+        leak into the snapshot; the thread is not a daemon, so the process
+        waits for the write to finish before exiting. It takes the config
+        lock once the write that started it lets go, and gives up if the
+        config is no longer at `version` by then.
+        """
+        import threading
+
+        from pls_cli.utils import codec, durability
+        from pls_cli.utils.lock import FileLock
+
+        payload = codec.dumps(data)
+
+        def compact() -> None:
+            with FileLock(self.lock_path) as lock:
+                if lock.read_version() != version:
+                    return
+                durability.write_atomic(self.full_settings_path, payload)
+                self.journal.clear()
+                _snapshots[self.full_settings_path] = (self._stamp(), data)
+                self.write_status(data)
+
+        compaction = threading.Thread(target=compact, name='pls-compaction')
+        _compactions[self.full_settings_path] = compaction
+        compaction.start()
+
+    def wait_for_compaction(self) -> None:
+        lock = _locks.get(self.lock_path)
+        if lock is not None and lock.depth:
+            # The compaction is waiting for this lock, and checks the
+            # version once it has it.
+            return
+        compaction = _compactions.pop(self.full_settings_path, None)
+        if compaction is not None:
+            compaction.join()
+
+    def record_version(self) -> None:
+        """Note the config version a snapshot is about to be read at.
+
+        Read before the data and without the lock: a writer bumps it after
+        writing, so the worst case is an older version than the data,
+        which only makes the next write merge needlessly.
+        """
+        from pls_cli.utils.lock import read_version
+
+        _versions[self.lock_path] = read_version(self.lock_path)
+
+    @contextlib.contextmanager
+    def lock(self) -> Iterator['FileLock']:
+        """Hold the config lock, between processes, for a critical section."""
+        lock = _locks.get(self.lock_path)
+        if lock is None:
+            from pls_cli.utils.lock import FileLock
+
+            lock = _locks[self.lock_path] = FileLock(self.lock_path)
+        # Also the lock's only other holder, which is not reentrant
+        # across threads.
+        self.wait_for_write()
+        if not lock.depth:
+            self.wait_for_compaction()
+        with lock:
+            yield lock
+
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator[dict]:
+        """Read, change and write the config with no other writer between.
+
+        Yields the current document with the lock held; writes made inside
+        never need merging. Meant for whole-list rewrites (clear, clean)
+        that `write_settings` can't merge, keep the work inside short.
+        """
+        with self.lock() as lock:
+            if _versions.get(self.lock_path) != lock.read_version():
+                self.invalidate()
+            yield self.get_settings()
+
+    def get_store_stamp(self) -> list:
+        if self.uses_sqlite():
+            if self.exists_settings():
+                # Runs the config.json migration if it is still pending.
+                self.get_store()
+            return list(_file_stamp(self.database_path))
+        self.wait_for_write()
+        return list(self._stamp())
+
+    def write_status(self, data: dict) -> dict:
+        return self.status_cache.write(
+            data.get('tasks', []), self.get_store_stamp()
+        )
+
+    def get_status(self) -> dict:
+        """Return task counts and the next pending task for prompts.
+
+        Served from the status cache when it matches the store, otherwise
+        recomputed from the store and cached again.
+        """
+        if not self.exists_list():
+            return summarize([])
+        try:
+            stamp = self.get_store_stamp()
+        except FileNotFoundError:
+            return summarize([])
+        status = self.status_cache.read(stamp)
+        if status is None and self.can_scan():
+            from pls_cli.utils import scan
+
+            with contextlib.suppress(ValueError):
+                status = self.status_cache.save(
+                    scan.summarize_config(self.full_settings_path), stamp
+                )
+        if status is None:
+            status = self.write_status(self.get_settings())
+        return status
+
+    def can_scan(self) -> bool:
+        """If task counts can be read off config.json without decoding it.
+
+        Only when the file alone holds every task (no journal to replay,
+        no compaction writing it) and this process hasn't decoded it
+        already, in which case the counters are free.
+        """
+        if self.uses_sqlite() or self.journal.exists():
+            return False
+        if self.writing_in_background():
+            return False
+        try:
+            stamp = self._stamp()
+        except FileNotFoundError:
+            return False
+        cached = _snapshots.get(self.full_settings_path)
+        return cached is None or cached[0] != stamp
+
+    def get_search_index(self) -> 'SearchIndex':
+        index = _search_indexes.get(self.search_path)
+        if index is None:
+            from pls_cli.utils.search import SearchIndex
+
+            index = SearchIndex(self.search_path)
+            _search_indexes[self.search_path] = index
+        return index
+
+    def update_search_index(
+        self, data: dict, changes: Optional[List[dict]]
+    ) -> None:
+        """Bring the search index in line with a write, if there is one.
+
+        The index is only created by the first search, writes pay nothing
+        for it until then.
+        """
+        if not os.path.exists(self.search_path):
+            return
+        stamp = json.dumps(self.get_store_stamp())
+        if changes:
+            self.get_search_index().apply(data, changes, stamp)
+        else:
+            self.get_search_index().sync(data.get('tasks', []), stamp)
+
+    def search_tasks(
+        self, terms: List[str], limit: int
+    ) -> Tuple[List[Tuple[str, str]], int]:
+        """Up to `limit` (task ID, name) matches of `terms`, and the count.
+
+        The index is resynced first when the tasks were changed by
+        something other than pls, like a hand edit of config.json.
+        """
+        index = self.get_search_index()
+        stamp = json.dumps(
+            self.get_store_stamp() if self.exists_settings() else None
+        )
+        if index.stamp != stamp:
+            index.sync(
+                self.get_tasks() if self.exists_settings() else [], stamp
+            )
+        return index.search(terms, limit)
+
+    def get_archive(self) -> 'Archive':
+        from pls_cli.utils.archive import Archive
+
+        return Archive(self.archive_path)
+
+    def get_greeting_cache(self) -> 'GreetingCache':
+        from pls_cli.utils.greeting import GreetingCache
+
+        return GreetingCache(self.greeting_path)
+
+    def invalidate(self) -> None:
+        """Drop the cached snapshot so the next read hits the disk."""
+        self.wait_for_write()
+        self.wait_for_compaction()
+        _snapshots.pop(self.full_settings_path, None)
+        _snapshots.pop(self.database_path, None)
+        _task_positions.pop(self.full_settings_path, None)
 
     def get_name(self) -> str:
-        return self.get_settings().get('user_name', '')
+        return self.get_config().get('user_name', '')
 
     def get_tasks(self) -> List[dict]:
         return self.get_settings().get('tasks', [])
 
+    def get_task_positions(self) -> Dict[str, int]:
+        """Map of task ID to 0-based position, built once per snapshot."""
+        from pls_cli.utils.task_ids import build_task_positions
+
+        data = self.get_settings()
+        cached = _task_positions.get(self.full_settings_path)
+        if cached is None or cached[0] is not data:
+            cached = (data, build_task_positions(data.get('tasks', [])))
+            _task_positions[self.full_settings_path] = cached
+        return cached[1]
+
+    def get_task_position(self, task_id: str) -> int:
+        """0-based position of the task with this ID, KeyError if none."""
+        if self.uses_indexed_rows():
+            return self.get_store().position_of(task_id)
+        return self.get_task_positions()[task_id]
+
+    def uses_indexed_rows(self) -> bool:
+        """If tasks can be looked up and changed one row at a time.
+
+        Only with the sqlite storage, once the migration gave every task
+        its ID and rank.
+        """
+        return (
+            self.uses_sqlite()
+            and self.exists_settings()
+            and not self.get_store().needs_migration()
+        )
+
+    def get_task_rows(self) -> Sequence[dict]:
+        """The tasks, for commands that only look at a few by position.
+
+        Read-only, change them with `change_tasks`. With the sqlite
+        storage each task is read from its row when indexed, the others
+        are never loaded.
+        """
+        if self.uses_indexed_rows():
+            from pls_cli.utils.sqlite_store import TaskRows
+
+            if self.database_path not in _snapshots:
+                # What `change_tasks` checks the positions against.
+                self.record_version()
+            return TaskRows(self.get_store())
+        return self.get_tasks()
+
+    def change_tasks(self, changes: List[dict]) -> None:
+        """Apply the journal records `changes` to the tasks and persist.
+
+        With the sqlite storage they only touch the rows they name; the
+        other storages apply them to the snapshot for `write_settings`.
+        """
+        if not self.uses_indexed_rows():
+            data = self.get_settings()
+            for change in changes:
+                apply_change(data, change)
+            self.write_settings(data, changes)
+            return
+
+        with self.lock() as lock:
+            version = lock.read_version()
+            if _versions.get(self.lock_path, version) != version:
+                # The positions may be stale, find the tasks again by ID.
+                data, changes = self.rebase({}, changes)
+                self.persist(data, changes)
+            else:
+                self.persist_rows(changes)
+            lock.write_version(version + 1)
+            _versions[self.lock_path] = version + 1
+
+    def persist_rows(self, changes: List[dict]) -> None:
+        """`persist` for the sqlite storage, without the whole document."""
+        store = self.get_store()
+        store.apply(changes)
+        _task_positions.pop(self.full_settings_path, None)
+        stamp = self.get_store_stamp()
+        cached = _snapshots.get(self.database_path)
+        if cached is not None:
+            for change in changes:
+                apply_change(cached[1], change)
+            _snapshots[self.database_path] = (tuple(stamp), cached[1])
+        self.status_cache.save(store.summarize(), stamp)
+        if os.path.exists(self.search_path):
+            self.get_search_index().apply(
+                {'tasks': store.iter_tasks()}, changes, json.dumps(stamp)
+            )
+
     def show_tasks_progress(self) -> bool:
-        return self.get_settings().get('show_task_progress', True)
+        return self.get_config().get('show_task_progress', True)
 
     def show_quotes(self) -> bool:
-        return self.get_settings().get('show_quotes', True)
+        return self.get_config().get('show_quotes', True)
+
+    def archive_after_days(self) -> int:
+        return self.get_config().get('archive_after_days', 0)
+
+    def last_auto_archive(self) -> Optional[str]:
+        """The day `pls` last archived this list's done tasks by itself."""
+        return self.get_list_settings().get('last_auto_archive')
+
+    def iter_tasks(self) -> Iterator[dict]:
+        """Yield tasks in order, streaming rows with the sqlite storage."""
+        if self.uses_sqlite() and self.exists_settings():
+            return self.get_store().iter_tasks()
+        return iter(self.get_tasks())
 
     def all_tasks_done(self) -> bool:
-        return all(task.get('done', '') for task in self.get_tasks())
+        if self.uses_sqlite() and self.exists_settings():
+            return self.count_tasks_undone() == 0
+        if self.can_scan():
+            from pls_cli.utils import scan
+
+            with contextlib.suppress(ValueError):
+                return scan.all_tasks_done(self.full_settings_path)
+        from pls_cli.utils.tasks import TaskList
+
+        tasks = self.get_tasks()
+        if isinstance(tasks, TaskList):
+            return tasks.undone_count == 0
+        return all(task.get('done', '') for task in tasks)
 
     def get_all_tasks_undone(self) -> List[dict]:
-        return [task for task in self.get_tasks() if not task['done']]
+        if self.uses_sqlite() and self.exists_settings():
+            return list(self.get_store().iter_tasks(done=False))
+        return [dict(task) for task in self.get_tasks() if not task['done']]
 
     def count_tasks_done(self) -> int:
-        if not self.get_tasks():
-            return 0
-        return len(
-            [task.get('done', '') for task in self.get_tasks() if task['done']]
-        )
+        if self.uses_sqlite() and self.exists_settings():
+            return self.get_store().count_tasks(done=True)
+        if self.can_scan():
+            return self.get_status()['done']
+        from pls_cli.utils.tasks import TaskList
+
+        tasks = self.get_tasks()
+        if isinstance(tasks, TaskList):
+            return tasks.done_count
+        return sum(1 for task in tasks if task['done'])
 
     def count_tasks_undone(self) -> int:
-        if not self.get_tasks():
-            return 0
-        return len(
-            [
-                task.get('done', '')
-                for task in self.get_tasks()
-                if not task['done']
-            ]
-        )
+        if self.uses_sqlite() and self.exists_settings():
+            return self.get_store().count_tasks(done=False)
+        if self.can_scan():
+            return self.get_status()['undone']
+        from pls_cli.utils.tasks import TaskList
+
+        tasks = self.get_tasks()
+        if isinstance(tasks, TaskList):
+            return tasks.undone_count
+        return sum(1 for task in tasks if not task['done'])
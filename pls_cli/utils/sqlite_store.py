@@ -0,0 +1,319 @@
+import contextlib
+import json
+import sqlite3
+from collections.abc import Sequence
+from typing import Any, Iterator, List, Optional
+
+from pls_cli.utils import durability
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    position REAL NOT NULL,
+    name TEXT NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS tasks_position ON tasks (position);
+CREATE INDEX IF NOT EXISTS tasks_done ON tasks (done, position);
+CREATE INDEX IF NOT EXISTS tasks_id ON tasks (json_extract(extra, '$.id'));
+CREATE INDEX IF NOT EXISTS tasks_rank ON tasks (json_extract(extra, '$.rank'));
+"""
+
+TASK_COLUMNS = ('name', 'done')
+
+# SQLite syncs its own writes, as often as the durability policy asks.
+SYNCHRONOUS = {'always': 'FULL', 'batched': 'NORMAL', 'none': 'OFF'}
+
+
+def _task_from_row(name: str, done: int, extra: Optional[str]) -> dict:
+    task = {'name': name, 'done': bool(done)}
+    if extra:
+        task.update(json.loads(extra))
+    return task
+
+
+def _task_extra(task: dict) -> Optional[str]:
+    extra = {
+        key: value for key, value in task.items() if key not in TASK_COLUMNS
+    }
+    return json.dumps(extra) if extra else None
+
+
+class SqliteStore:
+    """Config and tasks kept in an SQLite database.
+
+    Tasks are ordered by a sparse `position` key, so adding, deleting or
+    moving one task only touches its own row. The 0-based indexes used by
+    the commands are resolved with an indexed ORDER BY ... OFFSET lookup.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.connection = sqlite3.connect(path, isolation_level=None)
+        self.connection.execute(
+            f'PRAGMA synchronous = {SYNCHRONOUS[durability.get_policy()]}'
+        )
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def load(self) -> dict:
+        data = self.load_settings()
+        data['tasks'] = list(self.iter_tasks())
+        return data
+
+    def load_settings(self) -> dict:
+        """Everything but the tasks."""
+        return {
+            key: json.loads(value)
+            for key, value in self.connection.execute(
+                'SELECT key, value FROM settings'
+            )
+        }
+
+    def iter_tasks(self, done: Optional[bool] = None) -> Iterator[dict]:
+        if done is None:
+            rows = self.connection.execute(
+                'SELECT name, done, extra FROM tasks ORDER BY position'
+            )
+        else:
+            rows = self.connection.execute(
+                'SELECT name, done, extra FROM tasks WHERE done = ? '
+                'ORDER BY position',
+                (int(done),),
+            )
+        for row in rows:
+            yield _task_from_row(*row)
+
+    def count_tasks(self, done: bool) -> int:
+        (count,) = self.connection.execute(
+            'SELECT COUNT(*) FROM tasks WHERE done = ?', (int(done),)
+        ).fetchone()
+        return count
+
+    def summarize(self) -> dict:
+        """What `status.summarize` makes of the tasks, counted in SQL."""
+        done, undone = self.count_tasks(True), self.count_tasks(False)
+        row = self.connection.execute(
+            'SELECT name FROM tasks WHERE done = 0 ORDER BY position LIMIT 1'
+        ).fetchone()
+        return {
+            'done': done,
+            'undone': undone,
+            'total': done + undone,
+            'next': row[0] if row else None,
+        }
+
+    def position_of(self, task_id: str) -> int:
+        """0-based position of the task with this ID, KeyError if none."""
+        row = self.connection.execute(
+            "SELECT position FROM tasks WHERE json_extract(extra, '$.id') = ?",
+            (task_id,),
+        ).fetchone()
+        if row is None:
+            raise KeyError(task_id)
+        (position,) = self.connection.execute(
+            'SELECT COUNT(*) FROM tasks WHERE position < ?', row
+        ).fetchone()
+        return position
+
+    def needs_migration(self) -> bool:
+        """If some task still waits for its ID or rank key."""
+        return any(
+            self.connection.execute(
+                f"SELECT 1 FROM tasks WHERE json_extract(extra, '$.{key}') "
+                'IS NULL LIMIT 1'
+            ).fetchone()
+            for key in ('id', 'rank')
+        )
+
+    def replace(self, data: dict) -> None:
+        """Overwrite everything with the full config document `data`."""
+        with self.transaction():
+            self.connection.execute('DELETE FROM settings')
+            self.connection.execute('DELETE FROM tasks')
+            self.connection.executemany(
+                'INSERT INTO settings (key, value) VALUES (?, ?)',
+                [
+                    (key, json.dumps(value))
+                    for key, value in data.items()
+                    if key != 'tasks'
+                ],
+            )
+            self.connection.executemany(
+                'INSERT INTO tasks (position, name, done, extra) '
+                'VALUES (?, ?, ?, ?)',
+                [
+                    (
+                        position,
+                        task['name'],
+                        int(task.get('done', False)),
+                        _task_extra(task),
+                    )
+                    for position, task in enumerate(data.get('tasks', []), 1)
+                ],
+            )
+
+    def apply(self, changes: List[dict]) -> None:
+        """Apply journal records (see `journal.apply_change`) as SQL."""
+        with self.transaction():
+            for change in changes:
+                self.apply_change(change)
+
+    def apply_change(self, change: dict) -> None:
+        operation = change['op']
+        if operation == 'add':
+            task = change['task']
+            self.connection.execute(
+                'INSERT INTO tasks (position, name, done, extra) VALUES ('
+                '(SELECT COALESCE(MAX(position), 0) + 1 FROM tasks), ?, ?, ?)',
+                (task['name'], int(task.get('done', False)), _task_extra(task)),
+            )
+        elif operation == 'update':
+            self.update_task(self.row_at(change['index']), change['fields'])
+        elif operation == 'delete':
+            self.connection.execute(
+                'DELETE FROM tasks WHERE id = ?',
+                (self.row_at(change['index']),),
+            )
+        elif operation == 'move':
+            row_id = self.row_at(change['from'])
+            self.move_task(row_id, change['to'])
+            if 'rank' in change:
+                self.update_task(row_id, {'rank': change['rank']})
+        elif operation == 'swap':
+            first = self.row_at(change['first'])
+            second = self.row_at(change['second'])
+            positions = dict(
+                self.connection.execute(
+                    'SELECT id, position FROM tasks WHERE id IN (?, ?)',
+                    (first, second),
+                )
+            )
+            self.connection.executemany(
+                'UPDATE tasks SET position = ? WHERE id = ?',
+                [(positions[second], first), (positions[first], second)],
+            )
+            first_task, second_task = (
+                self.get_task(first),
+                self.get_task(second),
+            )
+            if 'rank' in first_task and 'rank' in second_task:
+                self.update_task(first, {'rank': second_task['rank']})
+                self.update_task(second, {'rank': first_task['rank']})
+        elif operation == 'set':
+            self.connection.execute(
+                'INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)',
+                (change['key'], json.dumps(change['value'])),
+            )
+        else:
+            raise ValueError(f'Unknown journal operation: {operation}')
+
+    def count_all_tasks(self) -> int:
+        (count,) = self.connection.execute(
+            'SELECT COUNT(*) FROM tasks'
+        ).fetchone()
+        return count
+
+    def row_at(self, index: int) -> int:
+        row = self.connection.execute(
+            'SELECT id FROM tasks ORDER BY position LIMIT 1 OFFSET ?', (index,)
+        ).fetchone()
+        if row is None:
+            raise IndexError(f'No task at index {index}')
+        return row[0]
+
+    def get_task(self, row_id: int) -> dict:
+        return _task_from_row(
+            *self.connection.execute(
+                'SELECT name, done, extra FROM tasks WHERE id = ?', (row_id,)
+            ).fetchone()
+        )
+
+    def update_task(self, row_id: int, fields: dict) -> None:
+        task = self.get_task(row_id)
+        task.update(fields)
+        self.connection.execute(
+            'UPDATE tasks SET name = ?, done = ?, extra = ? WHERE id = ?',
+            (task['name'], int(task['done']), _task_extra(task), row_id),
+        )
+
+    def move_task(self, row_id: int, index: int) -> None:
+        """Give `row_id` a position between its new neighbours."""
+        neighbours = [
+            position
+            for (position,) in self.connection.execute(
+                'SELECT position FROM tasks WHERE id != ? '
+                'ORDER BY position LIMIT 2 OFFSET ?',
+                (row_id, max(index - 1, 0)),
+            )
+        ]
+        if index == 0:
+            before, after = None, (neighbours[0] if neighbours else None)
+        else:
+            before = neighbours[0]
+            after = neighbours[1] if len(neighbours) > 1 else None
+
+        if before is None:
+            position = after - 1 if after is not None else 0
+        elif after is None:
+            position = before + 1
+        else:
+            position = (before + after) / 2
+            if not before < position < after:
+                # Out of float precision between these two: spread every
+                # task out again and retry.
+                self.renumber()
+                self.move_task(row_id, index)
+                return
+        self.connection.execute(
+            'UPDATE tasks SET position = ? WHERE id = ?', (position, row_id)
+        )
+
+    def renumber(self) -> None:
+        row_ids = self.connection.execute(
+            'SELECT id FROM tasks ORDER BY position'
+        ).fetchall()
+        self.connection.executemany(
+            'UPDATE tasks SET position = ? WHERE id = ?',
+            [(position, row_id) for position, (row_id,) in enumerate(row_ids)],
+        )
+
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator[None]:
+        self.connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except BaseException:
+            self.connection.execute('ROLLBACK')
+            raise
+        self.connection.execute('COMMIT')
+
+
+class TaskRows(Sequence):
+    """The tasks of a store, each read from its row when indexed.
+
+    For commands that only look at a few tasks by position; read-only,
+    changes go through `SqliteStore.apply`.
+    """
+
+    def __init__(self, store: SqliteStore) -> None:
+        self.store = store
+
+    def __len__(self) -> int:
+        return self.store.count_all_tasks()
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index < 0:
+            raise IndexError(f'No task at index {index}')
+        return self.store.get_task(self.store.row_at(index))
@@ -0,0 +1,64 @@
+import itertools
+import json
+import os
+from typing import List, Optional
+
+# Prompts of several shells may save the cache at once, each writes its
+# own temporary file.
+_temporary_names = itertools.count()
+
+
+def summarize(tasks: List[dict]) -> dict:
+    from pls_cli.utils.tasks import TaskList
+
+    if isinstance(tasks, TaskList):
+        done = tasks.done_count
+    else:
+        done = sum(1 for task in tasks if task['done'])
+    next_task = next((task['name'] for task in tasks if not task['done']), None)
+    return {
+        'done': done,
+        'undone': len(tasks) - done,
+        'total': len(tasks),
+        'next': next_task,
+    }
+
+
+def format_status(status: dict) -> str:
+    summary = f'{status["done"]}/{status["total"]}'
+    if status['next'] is None:
+        return summary
+    return f'{summary} {status["next"]}'
+
+
+class StatusCache:
+    """Precomputed task counts for shell prompts and status lines.
+
+    Each summary records the stamp of the store it was computed from, so
+    readers can tell with a single stat whether it is still current.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def read(self, stamp: list) -> Optional[dict]:
+        try:
+            with open(self.path, encoding='utf-8') as status_file:
+                status = json.loads(status_file.read())
+        except (FileNotFoundError, ValueError):
+            return None
+        if status.get('stamp') != stamp:
+            return None
+        return status
+
+    def write(self, tasks: List[dict], stamp: list) -> dict:
+        return self.save(summarize(tasks), stamp)
+
+    def save(self, status: dict, stamp: list) -> dict:
+        status['stamp'] = stamp
+        # Replaced atomically, pollers never see a half written file.
+        temp_path = f'{self.path}.{os.getpid()}-{next(_temporary_names)}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as status_file:
+            json.dump(status, status_file)
+        os.replace(temp_path, self.path)
+        return status
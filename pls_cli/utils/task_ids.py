@@ -0,0 +1,46 @@
+import string
+from typing import Dict, List
+
+from pls_cli.utils.tasks import update_task
+
+DIGITS = string.digits + string.ascii_lowercase
+
+
+def format_task_id(number: int) -> str:
+    """Compact base 36 form of a task number, e.g. 1295 -> 'zz'."""
+    task_id = ''
+    while True:
+        number, digit = divmod(number, len(DIGITS))
+        task_id = DIGITS[digit] + task_id
+        if not number:
+            return task_id
+
+
+def new_task_ids(data: dict, count: int) -> List[str]:
+    """Reserve `count` new IDs, bumping the `last_task_id` counter."""
+    last_task_id = data.get('last_task_id', 0)
+    data['last_task_id'] = last_task_id + count
+    return [
+        format_task_id(number)
+        for number in range(last_task_id + 1, last_task_id + count + 1)
+    ]
+
+
+def assign_task_ids(data: dict) -> bool:
+    """Give an ID to every task that has none, returns if any changed."""
+    tasks = data.get('tasks', [])
+    missing = [index for index, task in enumerate(tasks) if 'id' not in task]
+    if not missing:
+        return False
+    for index, task_id in zip(missing, new_task_ids(data, len(missing))):
+        update_task(tasks, index, {'id': task_id})
+    return True
+
+
+def build_task_positions(tasks: List[dict]) -> Dict[str, int]:
+    """Map each task ID to its 0-based position in `tasks`."""
+    return {
+        task['id']: position
+        for position, task in enumerate(tasks)
+        if 'id' in task
+    }
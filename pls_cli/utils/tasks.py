@@ -0,0 +1,142 @@
+from types import MappingProxyType
+from typing import Any, Iterable, Iterator, List, Tuple, TypedDict
+
+
+class _RequiredTask(TypedDict):
+    name: str
+    done: bool
+
+
+class Task(_RequiredTask, total=False):
+    """A task as it is stored in config.json."""
+
+    id: str
+    rank: str
+    done_at: str
+
+
+def _count_done(tasks: Iterable[Task]) -> int:
+    return sum(1 for task in tasks if task.get('done'))
+
+
+def _own(task: Task) -> Task:
+    """`task` to keep in a TaskList, a copy if it is a view of a task."""
+    if isinstance(task, MappingProxyType):
+        return dict(task)  # type: ignore[return-value]
+    return task
+
+
+def _stored(tasks: Iterable[Task]) -> List[Task]:
+    """`tasks` to keep in a TaskList, none shared with another one."""
+    return list(map(_own, tasks))
+
+
+def update_task(tasks: List[Any], index: int, fields: dict) -> None:
+    """Change fields of `tasks[index]`, a TaskList or a plain list."""
+    if isinstance(tasks, TaskList):
+        tasks.update_task(index, fields)
+    else:
+        tasks[index].update(fields)  # type: ignore[typeddict-item]
+
+
+def swap_tasks(tasks: List[Any], first: int, second: int) -> None:
+    """Swap two tasks and, if both have one, their ranks."""
+    first_task = list.__getitem__(tasks, first)
+    second_task = list.__getitem__(tasks, second)
+    list.__setitem__(tasks, first, second_task)
+    list.__setitem__(tasks, second, first_task)
+    if 'rank' in first_task and 'rank' in second_task:
+        first_task['rank'], second_task['rank'] = (
+            second_task['rank'],
+            first_task['rank'],
+        )
+
+
+class TaskList(List[Task]):
+    """The tasks of a config, with the number of done ones kept current.
+
+    The tasks stay the dicts they were parsed into: turning 100k of them
+    into objects costs more than the parse itself. Every list operation
+    adjusts `done_count`, so after the single count on load the counters
+    are O(1). Indexing and iterating give read-only views of the tasks,
+    so their fields only change through `update_task` and the count
+    can't go stale.
+    """
+
+    def __init__(self, tasks: Iterable[Task] = ()) -> None:
+        super().__init__(_stored(tasks))
+        self.done_count = _count_done(self)
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return list(map(MappingProxyType, super().__getitem__(index)))
+        return MappingProxyType(super().__getitem__(index))
+
+    def __iter__(self) -> Iterator[Task]:
+        return map(MappingProxyType, super().__iter__())  # type: ignore
+
+    def __reversed__(self) -> Iterator[Task]:
+        return map(MappingProxyType, super().__reversed__())  # type: ignore
+
+    @property
+    def undone_count(self) -> int:
+        return len(self) - self.done_count
+
+    def update_task(self, index: int, fields: dict) -> None:
+        task = super().__getitem__(index)
+        if 'done' in fields:
+            self.done_count += bool(fields['done']) - bool(task.get('done'))
+        task.update(fields)  # type: ignore[typeddict-item]
+
+    def append(self, task: Task) -> None:
+        task = _own(task)
+        super().append(task)
+        self.done_count += bool(task.get('done'))
+
+    def extend(self, tasks: Iterable[Task]) -> None:
+        tasks = _stored(tasks)
+        super().extend(tasks)
+        self.done_count += _count_done(tasks)
+
+    def __iadd__(  # type: ignore[override,misc]
+        self, tasks: Iterable[Task]
+    ) -> 'TaskList':
+        self.extend(tasks)
+        return self
+
+    def insert(self, index: Any, task: Task) -> None:
+        task = _own(task)
+        super().insert(index, task)
+        self.done_count += bool(task.get('done'))
+
+    def pop(self, index: Any = -1) -> Task:
+        task = super().pop(index)
+        self.done_count -= bool(task.get('done'))
+        return task
+
+    def remove(self, task: Task) -> None:
+        super().remove(task)
+        self.done_count -= bool(task.get('done'))
+
+    def clear(self) -> None:
+        super().clear()
+        self.done_count = 0
+
+    def __delitem__(self, index: Any) -> None:
+        removed = self[index] if isinstance(index, slice) else [self[index]]
+        super().__delitem__(index)
+        self.done_count -= _count_done(removed)
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        if isinstance(index, slice):
+            value = _stored(value)
+            self.done_count += _count_done(value) - _count_done(self[index])
+        else:
+            value = _own(value)
+            self.done_count += bool(value.get('done')) - bool(
+                self[index].get('done')
+            )
+        super().__setitem__(index, value)
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return TaskList, (_stored(self),)
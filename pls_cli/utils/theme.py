@@ -0,0 +1,94 @@
+"""The styles pls prints with, resolved into rich Style objects once.
+
+Each style is taken from its `PLS_*_STYLE` env var, else from
+`theme.json` in the config directory, else from `DEFAULT_THEME`. The
+theme file maps the same env var names to style definitions, so a theme
+shared as a list of exports fits in it as is. Definitions that don't
+parse fall back to the default.
+"""
+
+import json
+import os
+from typing import Dict, Optional, Tuple
+
+from rich.default_styles import DEFAULT_STYLES
+from rich.errors import StyleSyntaxError
+from rich.style import Style
+
+DEFAULT_THEME = {
+    'PLS_ERROR_LINE_STYLE': '#e56767',
+    'PLS_ERROR_TEXT_STYLE': '#ff0000 bold',
+    'PLS_WARNING_LINE_STYLE': '#FFBF00',
+    'PLS_WARNING_TEXT_STYLE': '#FFBF00 bold',
+    'PLS_UPDATE_LINE_STYLE': '#61E294',
+    'PLS_UPDATE_TEXT_STYLE': '#61E294 bold',
+    'PLS_INSERT_DELETE_LINE_STYLE': '#bb93f2',
+    'PLS_INSERT_DELETE_TEXT_STYLE': '#a0a0a0',
+    'PLS_MSG_PENDING_STYLE': '#61E294',
+    'PLS_TABLE_HEADER_STYLE': '#d77dd8',
+    'PLS_TASK_DONE_STYLE': '#a0a0a0',
+    'PLS_TASK_PENDING_STYLE': '#bb93f2',
+    'PLS_HEADER_GREETINGS_STYLE': '#FFBF00',
+    'PLS_QUOTE_STYLE': '#a0a0a0',
+    'PLS_AUTHOR_STYLE': '#a0a0a0',
+    'PLS_BACKGROUND_BAR_STYLE': 'bar.back',
+    'PLS_COMPLETE_BAR_STYLE': 'bar.complete',
+    'PLS_FINISHED_BAR_STYLE': 'bar.finished',
+}
+
+# Compiled themes keyed by theme file path, each stored with the stamp
+# of the file it was read from (None when there is no file), so a
+# long-running `pls serve` picks up edits.
+_themes: Dict[str, Tuple[Optional[tuple], Dict[str, Style]]] = {}
+
+
+def parse_style(definition: str) -> Style:
+    """Parse a style definition, or name one of rich's own styles.
+
+    Raises StyleSyntaxError if it is neither.
+    """
+    style = DEFAULT_STYLES.get(definition)
+    if style is not None:
+        return style
+    return Style.parse(definition)
+
+
+def read_theme_file(path: str) -> Dict[str, str]:
+    try:
+        with open(path, encoding='utf-8') as theme_file:
+            theme = json.load(theme_file)
+    except (FileNotFoundError, ValueError):
+        return {}
+    if not isinstance(theme, dict):
+        return {}
+    return {
+        name: value
+        for name, value in theme.items()
+        if name in DEFAULT_THEME and isinstance(value, str)
+    }
+
+
+def compile_theme(path: str) -> Dict[str, Style]:
+    definitions = dict(DEFAULT_THEME, **read_theme_file(path))
+    theme = {}
+    for name, default in DEFAULT_THEME.items():
+        try:
+            theme[name] = parse_style(os.getenv(name, definitions[name]))
+        except StyleSyntaxError:
+            theme[name] = parse_style(default)
+    return theme
+
+
+def load_theme(path: str) -> Dict[str, Style]:
+    """The theme for the theme file at `path`, compiled once per change."""
+    try:
+        stat = os.stat(path)
+        stamp: Optional[tuple] = (stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        stamp = None
+    cached = _themes.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    theme = compile_theme(path)
+    _themes[path] = (stamp, theme)
+    return theme
@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+from pls_cli.utils import (
+    lists,
+    settings as settings_module,
+)
+
+
+def reset_caches():
+    """Forget every file pls has read, written or opened in this process."""
+    for registry in (settings_module._compactions, settings_module._writes):
+        for pending in list(registry.values()):
+            thread = pending[0] if isinstance(pending, tuple) else pending
+            thread.join()
+        registry.clear()
+    for store in settings_module._stores.values():
+        store.close()
+    for index in settings_module._search_indexes.values():
+        index.close()
+    for cache in (
+        settings_module._snapshots,
+        settings_module._task_positions,
+        settings_module._stores,
+        settings_module._search_indexes,
+        settings_module._locks,
+        settings_module._versions,
+        lists._indexes,
+    ):
+        cache.clear()
+    lists.select(None)
+
+
+@pytest.fixture(autouse=True)
+def home(tmp_path, monkeypatch):
+    """Give every test an empty home directory and cold caches.
+
+    Tests then never read or write the config of whoever runs them.
+    """
+    monkeypatch.setenv('HOME', str(tmp_path))
+    monkeypatch.setenv('USERPROFILE', str(tmp_path))
+    for name in list(os.environ):
+        if name.startswith('PLS_'):
+            monkeypatch.delenv(name)
+    reset_caches()
+    yield tmp_path
+    reset_caches()
@@ -0,0 +1,114 @@
+import datetime
+import os
+
+import pytest
+
+from pls_cli.utils.archive import Archive, due_for_archive
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return Archive(str(tmp_path / 'archive'))
+
+
+def task(task_id, name, **fields):
+    return dict({'id': task_id, 'name': name, 'done': True}, **fields)
+
+
+def test_empty_archive(archive):
+    assert archive.segments() == []
+    assert list(archive.iter_tasks()) == []
+    assert archive.find(['1']) == []
+    archive.remove(['1'])
+
+
+def test_iter_tasks_newest_first(archive):
+    archive.append([task('1', 'First'), task('2', 'Second')], '2024-01-01')
+    archive.append([task('3', 'Third')], '2024-01-02')
+    assert [archived['id'] for archived in archive.iter_tasks()] == [
+        '3',
+        '2',
+        '1',
+    ]
+    assert next(archive.iter_tasks())['archived_at'] == '2024-01-02'
+
+
+def test_append_starts_new_segments(archive, monkeypatch):
+    monkeypatch.setenv('PLS_ARCHIVE_SEGMENT_BYTES', '1')
+    for number in range(1, 4):
+        archive.append([task(str(number), f'Task {number}')], '2024-01-01')
+    assert [os.path.basename(path) for path in archive.segments()] == [
+        'segment-000001.jsonl',
+        'segment-000002.jsonl',
+        'segment-000003.jsonl',
+    ]
+    assert [archived['id'] for archived in archive.iter_tasks()] == [
+        '3',
+        '2',
+        '1',
+    ]
+
+
+def test_read_skips_torn_line(archive):
+    archive.append([task('1', 'First')], '2024-01-01')
+    with open(archive.segments()[0], 'a', encoding='utf-8') as segment:
+        segment.write('{"id": "2", "na')
+    assert [archived['id'] for archived in archive.iter_tasks()] == ['1']
+
+
+def test_search(archive):
+    archive.append(
+        [task('1', 'Buy milk'), task('2', 'Buy bread'), task('3', 'Walk')],
+        '2024-01-01',
+    )
+    assert [archived['id'] for archived in archive.search(['bu'])] == [
+        '2',
+        '1',
+    ]
+    assert [archived['id'] for archived in archive.search(['buy mil'])] == ['1']
+
+
+def test_find_each_task_once(archive):
+    archive.append([task('1', 'First'), task('2', 'Second')], '2024-01-01')
+    assert archive.find(['2', 'missing', '2', '1']) == [
+        task('2', 'Second'),
+        task('1', 'First'),
+    ]
+    assert len(list(archive.iter_tasks())) == 2
+
+
+def test_remove_rewrites_only_its_segment(archive, monkeypatch):
+    monkeypatch.setenv('PLS_ARCHIVE_SEGMENT_BYTES', '1')
+    archive.append([task('1', 'First'), task('2', 'Second')], '2024-01-01')
+    archive.append([task('3', 'Third')], '2024-01-02')
+    first_segment, last_segment = archive.segments()
+    last_modified = os.stat(last_segment).st_mtime_ns
+
+    archive.remove(['2', 'missing'])
+    assert [archived['id'] for archived in archive.iter_tasks()] == ['3', '1']
+    assert os.stat(last_segment).st_mtime_ns == last_modified
+
+    archive.remove(['1'])
+    assert archive.segments() == [last_segment]
+    assert not os.path.exists(first_segment)
+
+
+def test_append_after_torn_line(archive):
+    archive.append([task('1', 'First')], '2024-01-01')
+    (segment,) = archive.segments()
+    with open(segment, 'a') as segment_file:
+        segment_file.write('{"id":"2","na')
+    archive.append([task('3', 'Third')], '2024-01-02')
+    assert [archived['id'] for archived in archive.iter_tasks()] == ['3', '1']
+
+
+def test_due_for_archive():
+    today = datetime.date(2024, 1, 10)
+    assert due_for_archive(task('1', 'Old', done_at='2024-01-03'), 7, today)
+    assert not due_for_archive(
+        task('1', 'Recent', done_at='2024-01-04'), 7, today
+    )
+    assert not due_for_archive(task('1', 'Unknown date'), 7, today)
+    assert not due_for_archive(
+        task('1', 'Undone', done=False, done_at='2024-01-01'), 7, today
+    )
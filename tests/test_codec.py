@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from pls_cli.utils import codec
+
+DOCUMENT = {
+    'user_name': 'Zoë 🍰',
+    'initial_setup_done': True,
+    'last_task_id': 2,
+    'archive_after_days': None,
+    'tasks': [
+        {'id': '1', 'name': 'Café "quoted" \\ \t\x7f', 'done': True},
+        {'id': '2', 'name': 'Plain', 'done': False, 'rank': 'V'},
+    ],
+    'empty': {'list': [], 'dict': {}},
+}
+
+
+@pytest.fixture(params=['json', 'orjson', 'msgspec'])
+def any_codec(request):
+    try:
+        return codec.load_codec(request.param)
+    except ImportError:
+        pytest.skip(f'{request.param} is not installed')
+
+
+def test_dumps_matches_json_module(any_codec):
+    assert any_codec.dumps(DOCUMENT) == json.dumps(DOCUMENT, indent=2).encode()
+
+
+def test_round_trip(any_codec):
+    assert any_codec.loads(any_codec.dumps(DOCUMENT)) == DOCUMENT
+    assert any_codec.loads(any_codec.dumps_compact(DOCUMENT)) == DOCUMENT
+    assert any_codec.loads(json.dumps(DOCUMENT)) == DOCUMENT
+
+
+def test_compact_is_smaller(any_codec):
+    assert b'\n' not in any_codec.dumps_compact(DOCUMENT)
+    assert len(any_codec.dumps_compact(DOCUMENT)) < len(
+        any_codec.dumps(DOCUMENT)
+    )
+
+
+def test_decode_error_is_json_decode_error(any_codec):
+    with pytest.raises(json.JSONDecodeError):
+        any_codec.loads(b'{"user_name": ')
+
+
+def test_load_codec():
+    assert codec.load_codec('json').name == 'json'
+    assert codec.load_codec('auto').name in codec.AUTO_ORDER
+    with pytest.raises(ValueError):
+        codec.load_codec('yaml')
+
+
+def test_dumps_compact_setting(monkeypatch):
+    monkeypatch.setattr(codec, 'COMPACT', True)
+    assert b'\n' not in codec.dumps(DOCUMENT)
+    assert b'\n' in codec.dumps(DOCUMENT, compact=False)
@@ -0,0 +1,168 @@
+import json
+import multiprocessing
+import os
+from unittest.mock import patch
+
+import pytest
+
+from pls_cli.utils import settings as settings_module
+from pls_cli.utils.journal import rebase_changes
+from pls_cli.utils.settings import ConflictError, Settings
+
+WRITERS = 4
+TASKS_PER_WRITER = 10
+
+
+def add_tasks(home, storage, writer):
+    """Add tasks one `pls add` at a time, in a process of its own."""
+    os.environ['HOME'] = os.environ['USERPROFILE'] = str(home)
+    os.environ['PLS_STORAGE'] = storage
+    from typer.testing import CliRunner
+
+    from pls_cli.please import app
+
+    for index in range(TASKS_PER_WRITER):
+        result = CliRunner().invoke(app, ['add', f'Task {writer}-{index}'])
+        assert result.exit_code == 0, result.output
+
+
+@pytest.mark.parametrize('storage', ['json', 'journal', 'sqlite'])
+def test_concurrent_writers_lose_no_tasks(home, storage, monkeypatch):
+    monkeypatch.setenv('PLS_STORAGE', storage)
+    Settings().write_settings(
+        {'user_name': 'Test name', 'initial_setup_done': True, 'tasks': []}
+    )
+
+    context = multiprocessing.get_context('spawn')
+    writers = [
+        context.Process(target=add_tasks, args=(home, storage, writer))
+        for writer in range(WRITERS)
+    ]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+    assert [writer.exitcode for writer in writers] == [0] * WRITERS
+
+    Settings().invalidate()
+    tasks = Settings().get_tasks()
+    assert sorted(task['name'] for task in tasks) == sorted(
+        f'Task {writer}-{index}'
+        for writer in range(WRITERS)
+        for index in range(TASKS_PER_WRITER)
+    )
+    assert len({task['id'] for task in tasks}) == len(tasks)
+    ranks = [task['rank'] for task in tasks]
+    assert ranks == sorted(set(ranks))
+
+
+def write_behind_back(home, data):
+    """Write the config the way another process would."""
+    # Which would wait for the lock held by our background write.
+    Settings().wait_for_write()
+    config_dir = home / '.config' / 'pls'
+    with open(config_dir / 'config.json', 'w') as config_file:
+        json.dump(data, config_file)
+    lock_path = config_dir / 'config.lock'
+    version = int(lock_path.read_text() or 0) if lock_path.exists() else 0
+    lock_path.write_text(str(version + 1))
+
+
+def test_write_merges_changes_of_other_tasks(home):
+    tasks = [
+        {'id': '1', 'name': 'Task 1', 'done': False, 'rank': 'V'},
+        {'id': '2', 'name': 'Task 2', 'done': False, 'rank': 'k'},
+    ]
+    Settings().write_settings(
+        {'user_name': 'Test name', 'last_task_id': 2, 'tasks': tasks}
+    )
+    settings = Settings().get_settings()
+
+    write_behind_back(
+        home,
+        {
+            'user_name': 'Test name',
+            'last_task_id': 3,
+            'tasks': [
+                {'id': '2', 'name': 'Task 2', 'done': False, 'rank': 'k'},
+                {'id': '3', 'name': 'Task 3', 'done': False, 'rank': 'l'},
+            ],
+        },
+    )
+    change = {'op': 'update', 'index': 1, 'id': '2', 'fields': {'done': True}}
+    settings['tasks'].update_task(1, {'done': True})
+    Settings().write_settings(settings, [change])
+
+    Settings().invalidate()
+    assert Settings().get_tasks() == [
+        {'id': '2', 'name': 'Task 2', 'done': True, 'rank': 'k'},
+        {'id': '3', 'name': 'Task 3', 'done': False, 'rank': 'l'},
+    ]
+
+
+def test_full_write_conflict_raises(home):
+    Settings().write_settings({'user_name': 'Test name', 'tasks': []})
+    settings = Settings().get_settings()
+    write_behind_back(home, {'user_name': 'Other name', 'tasks': []})
+
+    settings['tasks'] = []
+    with pytest.raises(ConflictError):
+        Settings().write_settings(settings)
+    assert Settings().get_name() == 'Other name'
+
+
+def test_transaction_sees_latest_version(home):
+    Settings().write_settings({'user_name': 'Test name', 'tasks': []})
+    Settings().get_settings()
+    write_behind_back(home, {'user_name': 'Other name', 'tasks': []})
+
+    # Same stamp as the snapshot, only the version tells them apart.
+    with patch.object(Settings, '_stamp', return_value=(0, 0)):
+        settings_module._snapshots[Settings().full_settings_path] = (
+            (0, 0),
+            {'user_name': 'Test name', 'tasks': []},
+        )
+        with Settings().transaction() as settings:
+            assert settings['user_name'] == 'Other name'
+            settings['user_name'] = 'New name'
+            Settings().write_settings(settings)
+
+
+def test_rebase_changes():
+    data = {
+        'last_task_id': 3,
+        'tasks': [
+            {'id': '1', 'name': 'Task 1', 'done': False, 'rank': 'V'},
+            {'id': '3', 'name': 'Theirs', 'done': False, 'rank': 'k'},
+        ],
+    }
+    mine = {'id': '3', 'name': 'Mine', 'done': False, 'rank': 'k'}
+    changes = [
+        {'op': 'add', 'task': mine},
+        {'op': 'set', 'key': 'last_task_id', 'value': 3},
+        {'op': 'delete', 'index': 1, 'id': '2'},
+        {'op': 'update', 'index': 0, 'id': '1', 'fields': {'done': True}},
+        {'op': 'swap', 'first': 0, 'second': 1, 'ids': ['1', '3']},
+    ]
+    rebased = rebase_changes(data, changes)
+
+    assert mine['id'] == '4'
+    assert data['last_task_id'] == 4
+    assert [task['name'] for task in data['tasks']] == [
+        'Theirs',
+        'Task 1',
+        'Mine',
+    ]
+    assert data['tasks'][1]['done']
+    assert [change['op'] for change in rebased] == [
+        'add',
+        'set',
+        'update',
+        'swap',
+    ]
+
+
+def test_rebase_changes_without_ids():
+    data = {'tasks': [{'name': 'Task 1', 'done': False}]}
+    changes = [{'op': 'update', 'index': 0, 'fields': {'done': True}}]
+    assert rebase_changes(data, changes) is None
@@ -0,0 +1,151 @@
+import json
+import os
+import socket
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from pls_cli import __version__
+from pls_cli.please import bind_theme, run_forwarded
+from pls_cli.utils import daemon
+from pls_cli.utils.settings import Settings
+
+requires_unix_sockets = pytest.mark.skipif(
+    not hasattr(socket, 'AF_UNIX'), reason='needs Unix domain sockets'
+)
+
+
+def forwarded_request(*args, stdin=None, env=None):
+    return {
+        'args': list(args),
+        'stdin': stdin,
+        'columns': 80,
+        'lines': 24,
+        'terminal': False,
+        'env': env or {},
+    }
+
+
+def test_is_forwarded():
+    assert daemon.is_forwarded([])
+    assert daemon.is_forwarded(['done', '1'])
+    assert not daemon.is_forwarded(['edit', '1', 'Task'])
+    assert not daemon.is_forwarded(['clean'])
+    assert not daemon.is_forwarded(['serve'])
+
+
+def test_forward_without_daemon(tmp_path):
+    assert daemon.forward(str(tmp_path / 'pls.sock'), ['tasks']) is None
+
+
+@requires_unix_sockets
+def test_forward_to_daemon(tmp_path):
+    socket_path = str(tmp_path / 'pls.sock')
+    requests = []
+
+    def handle(request):
+        requests.append(request)
+        return 3, 'Output\n'
+
+    threading.Thread(
+        target=daemon.serve, args=(socket_path, handle), daemon=True
+    ).start()
+    for _ in range(100):
+        if daemon.is_running(socket_path):
+            break
+        time.sleep(0.01)
+
+    assert daemon.forward(socket_path, ['done', '1']) == {
+        'exit_code': 3,
+        'output': 'Output\n',
+    }
+    assert requests[0]['args'] == ['done', '1']
+    assert requests[0]['stdin'] is None
+
+
+@patch(
+    'pls_cli.utils.settings.Settings.get_settings',
+    return_value={
+        'user_name': 'Test name',
+        'initial_setup_done': True,
+        'tasks': [{'name': 'Task 1', 'done': False}],
+    },
+)
+def test_run_forwarded(mock_get_settings):
+    assert run_forwarded(forwarded_request('count-undone')) == (0, '1\n')
+
+    exit_code, output = run_forwarded(forwarded_request('test'))
+    assert exit_code == 2
+    assert "No such command 'test'" in output
+
+    exit_code, output = run_forwarded(forwarded_request('tasks', '--help'))
+    assert exit_code == 0
+    assert 'Show all Tasks' in output
+
+
+def test_run_forwarded_applies_client_env(home, monkeypatch):
+    monkeypatch.setenv('PLS_ARCHIVE_SEGMENT_BYTES', '1')
+    run_forwarded(forwarded_request('use', 'work'))
+    run_forwarded(forwarded_request('use', 'default'))
+
+    exit_code, output = run_forwarded(
+        forwarded_request('add', 'Work task', env={'PLS_LIST': 'work'})
+    )
+    assert exit_code == 0
+    assert 'Work task' in output
+    assert os.environ['PLS_ARCHIVE_SEGMENT_BYTES'] == '1'
+    assert 'PLS_LIST' not in os.environ
+    assert Settings('work').count_tasks_undone() == 1
+    assert Settings().count_tasks_undone() == 0
+
+
+def test_run_forwarded_declines_import_time_env(monkeypatch):
+    monkeypatch.setenv('PLS_QUOTE_STYLE', 'red')
+    assert run_forwarded(forwarded_request('tasks')) is None
+    assert run_forwarded(
+        forwarded_request('version', env={'PLS_QUOTE_STYLE': 'red'})
+    ) == (0, f'pls CLI Version: {__version__}\n')
+
+
+def test_run_forwarded_declines_prompts(home):
+    # The setup prompts would read the daemon's empty stdin and abort.
+    assert run_forwarded(forwarded_request()) is None
+    assert not (home / '.config' / 'pls' / 'config.json').exists()
+
+
+def test_run_forwarded_follows_theme_edits(home):
+    Settings().write_settings(
+        {
+            'user_name': 'Test name',
+            'initial_setup_done': True,
+            'tasks': [{'id': '1', 'name': 'Task 1', 'done': False}],
+        }
+    )
+    request = dict(forwarded_request('tasks'), terminal=True)
+    theme_path = home / '.config' / 'pls' / 'theme.json'
+    try:
+        assert '\x1b[31m' not in run_forwarded(request)[1]
+        theme_path.write_text(json.dumps({'PLS_TASK_PENDING_STYLE': 'red'}))
+        assert '\x1b[31m' in run_forwarded(request)[1]
+    finally:
+        theme_path.unlink(missing_ok=True)
+        bind_theme()
+
+
+@patch(
+    'pls_cli.utils.settings.Settings.get_settings',
+    return_value={
+        'user_name': 'Test name',
+        'initial_setup_done': True,
+        'tasks': [],
+    },
+)
+@patch('pls_cli.utils.settings.Settings.write_settings')
+def test_run_forwarded_reads_stdin(mock_write_settings, mock_get_settings):
+    exit_code, output = run_forwarded(
+        forwarded_request('add', '-', stdin='Task 1\nTask 2\n')
+    )
+    assert exit_code == 0
+    assert 'Added 2 tasks to the list' in output
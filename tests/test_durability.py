@@ -0,0 +1,94 @@
+import os
+from unittest.mock import patch
+
+import pytest
+
+from pls_cli.utils import durability
+
+
+@pytest.fixture(autouse=True)
+def no_pending():
+    durability._pending.clear()
+    yield
+    durability._pending.clear()
+
+
+def test_write_atomic_replaces_file(tmp_path):
+    path = tmp_path / 'config.json'
+    path.write_bytes(b'old')
+    durability.write_atomic(str(path), b'new')
+    assert path.read_bytes() == b'new'
+    assert [entry.name for entry in tmp_path.iterdir()] == ['config.json']
+
+
+def test_interrupted_write_keeps_previous_file(tmp_path):
+    path = tmp_path / 'config.json'
+    path.write_bytes(b'old')
+    with patch('os.replace', side_effect=KeyboardInterrupt), pytest.raises(
+        KeyboardInterrupt
+    ):
+        durability.write_atomic(str(path), b'new')
+    assert path.read_bytes() == b'old'
+    assert [entry.name for entry in tmp_path.iterdir()] == ['config.json']
+
+
+def test_always_syncs_every_write(tmp_path, monkeypatch):
+    monkeypatch.setenv('PLS_DURABILITY', 'always')
+    with patch('os.fsync') as mock_fsync:
+        durability.write_atomic(str(tmp_path / 'config.json'), b'new')
+        assert mock_fsync.called
+    assert not durability._pending
+
+
+def test_batched_syncs_once_on_flush(tmp_path, monkeypatch):
+    monkeypatch.setenv('PLS_DURABILITY', 'batched')
+    path = str(tmp_path / 'config.json')
+    with patch('os.fsync') as mock_fsync:
+        for payload in (b'one', b'two', b'three'):
+            durability.write_atomic(path, payload)
+        with open(tmp_path / 'config.journal', 'a') as journal_file:
+            journal_file.write('{}\n')
+            durability.written(journal_file)
+        mock_fsync.assert_not_called()
+
+        durability.flush()
+        # Each path written is synced once, with its directory but on
+        # Windows.
+        assert mock_fsync.call_count == (2 if os.name == 'nt' else 4)
+    assert not durability._pending
+
+
+def test_none_never_syncs(tmp_path, monkeypatch):
+    monkeypatch.setenv('PLS_DURABILITY', 'none')
+    with patch('os.fsync') as mock_fsync:
+        durability.write_atomic(str(tmp_path / 'config.json'), b'new')
+        durability.flush()
+        mock_fsync.assert_not_called()
+
+
+def test_unknown_policy(monkeypatch):
+    monkeypatch.setenv('PLS_DURABILITY', 'sometimes')
+    with pytest.raises(ValueError):
+        durability.get_policy()
+
+
+@pytest.mark.parametrize(
+    'content', [b'', b'{"a":1}\n', b'{"a":1}\n{"b":', b'{"b":']
+)
+def test_append_lines_cuts_torn_line(tmp_path, content):
+    path = tmp_path / 'records.jsonl'
+    path.write_bytes(content)
+    durability.append_lines(str(path), b'{"c":3}\n')
+    records = durability.read_json_lines(str(path))
+    assert records[-1] == {'c': 3}
+    assert records[:-1] == ([{'a': 1}] if content.startswith(b'{"a"') else [])
+
+
+def test_read_json_lines_skips_only_a_torn_last_line(tmp_path):
+    path = tmp_path / 'records.jsonl'
+    path.write_bytes(b'{"a":1}\n{"b":2}')
+    assert durability.read_json_lines(str(path)) == [{'a': 1}]
+
+    path.write_bytes(b'{"a":\n{"b":2}\n')
+    with pytest.raises(ValueError):
+        durability.read_json_lines(str(path))
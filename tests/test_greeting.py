@@ -0,0 +1,178 @@
+import os
+
+import pytest
+from rich.align import Align
+from rich.console import Console
+from rich.rule import Rule
+
+from pls_cli.utils import greeting
+from pls_cli.utils.settings import Settings
+
+WIDTH = 60
+
+
+@pytest.fixture
+def console():
+    return Console(force_terminal=True, width=WIDTH, color_system='truecolor')
+
+
+def render(console, *renderables):
+    with console.capture() as captured:
+        for renderable in renderables:
+            console.print(renderable)
+    return captured.get()
+
+
+def render_header(console, time_str):
+    return render(
+        console,
+        Rule(f"[#FFBF00] Hello Ana! It's {time_str}[/]", style='#FFBF00'),
+    )
+
+
+def render_quote(console, quote):
+    return render(
+        console,
+        Align.center(f'[#a0a0a0]"{quote["content"]}"[/]', width=WIDTH),
+        Align.center(f'[#a0a0a0][i]・{quote["author"]}・[/i][/]', width=WIDTH),
+    )
+
+
+def test_splice_time(console):
+    header = render_header(console, '18 Oct | 01:49 PM')
+    assert greeting.splice_time(
+        header, '18 Oct | 01:49 PM', '02 Nov | 11:05 AM'
+    ) == render_header(console, '02 Nov | 11:05 AM')
+
+
+def test_splice_time_of_another_width(console):
+    header = render_header(console, '18 Oct | 01:49 PM')
+    assert (
+        greeting.splice_time(header, '18 Oct | 01:49 PM', '18 Okt. | 01:49')
+        is None
+    )
+
+
+def test_center_quote_like_rich(console):
+    probe = {'content': 'x', 'author': 'x'}
+    styles = greeting.quote_styles(render_quote(console, probe), probe, WIDTH)
+    assert styles is not None
+
+    for quote in (
+        {'content': 'Short and plain, 42 times.', 'author': 'Someone'},
+        {'content': 'Odd', 'author': 'Even'},
+        {'content': 'x' * (WIDTH - 2), 'author': 'x' * (WIDTH - 4)},
+        {'content': 'Ação, não só palavras.', 'author': 'Alguém'},
+        {'content': '千里之行，始于足下。', 'author': '老子'},
+    ):
+        assert greeting.center_quote(styles, quote, WIDTH) == render_quote(
+            console, quote
+        )
+
+
+@pytest.mark.parametrize(
+    'quote',
+    [
+        {'content': 'Too long ' * 10, 'author': 'Someone'},
+        {'content': 'Words of many lengths ' * 9, 'author': 'Someone'},
+        {'content': '一二三四五六七八九十 ' * 8, 'author': 'Someone'},
+    ],
+)
+def test_wrap_like_rich(console, quote):
+    probe = {'content': 'x', 'author': 'x'}
+    styles = greeting.quote_styles(render_quote(console, probe), probe, WIDTH)
+    assert greeting.center_quote(styles, quote, WIDTH) is None
+    assert greeting.center_quote(
+        styles, quote, WIDTH, wraps=True
+    ) == render_quote(console, quote)
+
+
+def test_wrapping_probe_wraps(console):
+    probe = greeting.wrapping_probe(WIDTH)
+    styles = greeting.quote_styles(
+        render_quote(console, {'content': 'x', 'author': 'x'}),
+        {'content': 'x', 'author': 'x'},
+        WIDTH,
+    )
+    rendered = greeting.center_quote(styles, probe, WIDTH, wraps=True)
+    assert rendered == render_quote(console, probe)
+    assert len(rendered.splitlines()) > 2
+
+
+@pytest.mark.parametrize(
+    'text, cells',
+    [
+        ('plain', 5),
+        ('Ação', 4),
+        ('・x・', 5),
+        ('始于足下', 8),
+        ('tab\there', None),
+        ('e\u0301', None),
+        ('\U0001f600', None),
+    ],
+)
+def test_cell_width(text, cells):
+    assert greeting.cell_width(text) == cells
+
+
+@pytest.mark.parametrize(
+    'quote',
+    [
+        {'content': 'Some [b]markup[/b]', 'author': 'Someone'},
+        {'content': 'An emoji :smile:', 'author': 'Someone'},
+        {'content': 'A combining e\u0301', 'author': 'Someone'},
+        {'content': 'A\ttab', 'author': 'Someone'},
+        {'content': 'x' * (WIDTH + 1), 'author': 'Someone'},
+    ],
+)
+def test_center_quote_leaves_the_rest_to_rich(console, quote):
+    probe = {'content': 'x', 'author': 'x'}
+    styles = greeting.quote_styles(render_quote(console, probe), probe, WIDTH)
+    assert greeting.center_quote(styles, quote, WIDTH, wraps=True) is None
+
+
+@pytest.fixture
+def settings():
+    return Settings()
+
+
+def test_cache_key_changes_with_theme(monkeypatch, settings):
+    key = greeting.cache_key([1, 2], settings)
+    monkeypatch.setenv('PLS_TASK_DONE_STYLE', '#000000')
+    assert greeting.cache_key([1, 2], settings) != key
+
+    key = greeting.cache_key([1, 2], settings)
+    with open(settings.theme_path, 'w') as theme_file:
+        theme_file.write('{}')
+    assert greeting.cache_key([1, 2], settings) != key
+
+
+def test_cache_key_changes_with_list(settings):
+    key = greeting.cache_key([1, 2], settings)
+    assert greeting.cache_key([1, 2], Settings('work')) != key
+
+
+def test_cache_round_trip(tmp_path, settings):
+    cache = greeting.GreetingCache(str(tmp_path / 'greeting.json'))
+    key = greeting.cache_key([1, 2], settings)
+    assert cache.read(key) is None
+
+    cache.save({'key': key, 'body': 'Tasks'})
+    assert cache.read(key) == {'key': key, 'body': 'Tasks'}
+    assert cache.read(greeting.cache_key([1, 3], settings)) is None
+
+
+def test_cache_writers_use_their_own_file(tmp_path, settings, monkeypatch):
+    cache = greeting.GreetingCache(str(tmp_path / 'greeting.json'))
+    replaced = []
+    replace = os.replace
+
+    def record(source, target):
+        replaced.append(source)
+        replace(source, target)
+
+    monkeypatch.setattr(os, 'replace', record)
+    cache.save({'key': 'first'})
+    cache.save({'key': 'second'})
+    assert len(set(replaced)) == 2
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
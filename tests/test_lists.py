@@ -0,0 +1,181 @@
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+from typer.testing import CliRunner
+
+from pls_cli.please import app
+from pls_cli.utils import (
+    lists,
+    settings as settings_module,
+)
+from pls_cli.utils.settings import Settings
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def config_dir(home):
+    config_dir = home / '.config' / 'pls'
+    config_dir.mkdir(parents=True)
+    with open(config_dir / 'config.json', 'w') as config_file:
+        json.dump(
+            {
+                'user_name': 'Test name',
+                'initial_setup_done': True,
+                'show_quotes': False,
+                'show_task_progress': False,
+                'last_task_id': 1,
+                'tasks': [
+                    {'id': '1', 'name': 'Home task', 'done': False, 'rank': 'V'}
+                ],
+            },
+            config_file,
+        )
+    return config_dir
+
+
+def test_list_names(tmp_path):
+    assert lists.list_names(str(tmp_path / 'lists')) == ['default']
+    for name in ('work', 'books', 'not a list'):
+        (tmp_path / 'lists' / name).mkdir(parents=True)
+    assert lists.list_names(str(tmp_path / 'lists')) == [
+        'default',
+        'books',
+        'work',
+    ]
+
+
+@pytest.mark.parametrize('name', ['work', 'to-do_2'])
+def test_valid_names(name):
+    assert lists.is_valid_name(name)
+
+
+@pytest.mark.parametrize('name', ['', '../work', '-work', 'a b', 'x' * 65])
+def test_invalid_names(name):
+    assert not lists.is_valid_name(name)
+
+
+def test_named_list_keeps_its_own_files(config_dir):
+    settings = Settings('work')
+    assert settings.full_settings_path == str(
+        config_dir / 'lists' / 'work' / 'config.json'
+    )
+    assert os.path.dirname(settings.lock_path) == settings.list_path
+    assert os.path.dirname(settings.status_cache.path) == settings.list_path
+    assert settings.theme_path == str(config_dir / 'theme.json')
+    assert Settings().full_settings_path == str(config_dir / 'config.json')
+
+
+def test_named_lists_are_only_made_by_use(config_dir, monkeypatch):
+    assert not Settings('work').exists_list()
+    monkeypatch.setenv('PLS_LIST', 'work')
+    for args in (['tasks'], ['add', 'Work task'], []):
+        result = runner.invoke(app, args)
+        assert result.exit_code == 1
+        assert 'There is no work list' in result.stdout
+    result = runner.invoke(app, ['--list', 'wrok', 'tasks'])
+    assert result.exit_code == 1
+    assert 'There is no wrok list' in result.stdout
+    assert Settings('work').get_status()['undone'] == 0
+
+    assert not (config_dir / 'lists').exists()
+    assert not (config_dir / 'lists.json').exists()
+
+    result = runner.invoke(app, ['use', 'work'])
+    assert result.exit_code == 0
+    assert Settings('work').exists_list()
+
+
+def test_first_named_list_takes_the_config_over(config_dir):
+    Settings('work').create_list()
+    with open(config_dir / 'lists.json') as lists_file:
+        assert json.load(lists_file)['config'] == {
+            'user_name': 'Test name',
+            'initial_setup_done': True,
+            'show_quotes': False,
+            'show_task_progress': False,
+        }
+
+    settings_module._snapshots.clear()
+    with patch.object(
+        Settings, 'read_json_settings', side_effect=AssertionError
+    ):
+        settings = Settings('work')
+        assert settings.get_name() == 'Test name'
+        assert not settings.show_quotes()
+
+    Settings('work').set_config('user_name', 'New name')
+    assert Settings().get_name() == 'New name'
+
+
+def test_add_to_another_list(config_dir):
+    Settings('work').create_list()
+    result = runner.invoke(app, ['--list', 'work', 'add', 'Work task'])
+    assert result.exit_code == 0
+    assert 'Work task' in result.stdout
+    assert 'Home task' not in result.stdout
+
+    lists.select(None)
+    assert [task['name'] for task in Settings().get_tasks()] == ['Home task']
+    assert [task['name'] for task in Settings('work').get_tasks()] == [
+        'Work task'
+    ]
+
+
+def test_use_switches_the_list_in_use(config_dir):
+    result = runner.invoke(app, ['use', 'work'])
+    assert result.exit_code == 0
+    assert 'Now using the work list' in result.stdout
+
+    result = runner.invoke(app, ['add', 'Work task'])
+    assert result.exit_code == 0
+    assert Settings().list_name == 'work'
+    assert [task['name'] for task in Settings().get_tasks()] == ['Work task']
+
+    result = runner.invoke(app, ['use', 'default'])
+    assert result.exit_code == 0
+    assert 'Home task' in result.stdout
+
+
+def test_pls_list_env_overrides_the_list_in_use(config_dir, monkeypatch):
+    monkeypatch.setenv('PLS_LIST', 'work')
+    assert Settings().list_name == 'work'
+
+
+def test_lists_shows_cached_counts(config_dir):
+    Settings('work').create_list()
+    runner.invoke(app, ['--list', 'work', 'add', 'One', 'Two'])
+    runner.invoke(app, ['--list', 'work', 'done', '1'])
+    settings_module._snapshots.clear()
+
+    with patch.object(
+        Settings, 'read_json_settings', side_effect=AssertionError
+    ):
+        result = runner.invoke(app, ['lists'])
+    assert result.exit_code == 0
+    rows = [line.split() for line in result.stdout.splitlines()]
+    assert ['default', '1', '0', '●'] in rows
+    assert ['work', '1', '1'] in rows
+
+
+def test_invalid_list_name(config_dir):
+    result = runner.invoke(app, ['--list', '../work', 'tasks'])
+    assert result.exit_code == 1
+    assert 'Invalid list name' in result.stdout
+    assert not (config_dir.parent / 'work').exists()
+
+
+def test_setup_on_a_named_list_writes_config_apart(home):
+    runner.invoke(app, ['use', 'work'])
+    result = runner.invoke(app, input='Ana\ny\nn\n')
+    assert result.exit_code == 0
+    assert 'Hello! What can I call you?: Ana' in result.stdout
+
+    config_dir = home / '.config' / 'pls'
+    with open(config_dir / 'lists.json') as lists_file:
+        assert json.load(lists_file)['config']['user_name'] == 'Ana'
+    Settings('work').wait_for_write()
+    with open(config_dir / 'lists' / 'work' / 'config.json') as config_file:
+        assert 'user_name' not in json.load(config_file)
@@ -0,0 +1,114 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+# Budget for answering an integration command, on top of starting the
+# interpreter and loading the JSON decoder every answer needs.
+INTEGRATION_STARTUP_TARGET = 0.020
+
+
+@pytest.fixture
+def home(home):
+    config_dir = home / '.config' / 'pls'
+    config_dir.mkdir(parents=True)
+    with open(config_dir / 'config.json', 'w') as config_file:
+        json.dump(
+            {
+                'user_name': 'Test name',
+                'tasks': [
+                    {'name': 'Task 1', 'done': True},
+                    {'name': 'Task 2', 'done': False},
+                    {'name': 'Task 3', 'done': False},
+                ],
+            },
+            config_file,
+        )
+    return home
+
+
+def run_python(home, code, *args, env=None):
+    env = dict(os.environ, HOME=str(home), USERPROFILE=str(home), **env or {})
+    env.pop('PLS_STORAGE', None)
+    return subprocess.run(
+        [sys.executable, '-c', code, *args],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+
+
+RUN_MAIN = (
+    'import sys\n'
+    'from pls_cli.main import main\n'
+    'main()\n'
+    "print(sorted({'rich', 'typer'} & set(sys.modules)))\n"
+)
+
+
+def test_count_done_fast_path(home):
+    result = run_python(home, RUN_MAIN, 'count-done')
+    assert result.stdout == '1\n[]\n'
+
+
+def test_count_undone_fast_path(home):
+    result = run_python(home, RUN_MAIN, 'count-undone')
+    assert result.stdout == '2\n[]\n'
+
+
+def test_status_fast_path(home):
+    result = run_python(home, RUN_MAIN, 'status')
+    assert result.stdout == '1/3 Task 2\n[]\n'
+
+
+def test_other_commands_use_typer_app(home):
+    result = run_python(home, RUN_MAIN, 'version')
+    assert result.stdout.startswith('pls CLI Version: ')
+
+
+def run_time(home, code, *args):
+    start = time.perf_counter()
+    run_python(home, code, *args)
+    return time.perf_counter() - start
+
+
+def test_integration_startup_time(home):
+    # Interleaved so both sides see the same machine load.
+    interpreter, count_undone = [], []
+    for _ in range(10):
+        interpreter.append(run_time(home, 'import json'))
+        count_undone.append(
+            run_time(
+                home, 'from pls_cli.main import main; main()', 'count-undone'
+            )
+        )
+    assert min(count_undone) - min(interpreter) < INTEGRATION_STARTUP_TARGET
+
+
+def test_cached_greeting_fast_path(home, tmp_path):
+    quotes_path = tmp_path / 'quotes.json'
+    quotes_path.write_text(
+        json.dumps([{'content': 'A plain quote', 'author': 'Someone'}])
+    )
+    env = {
+        'PLS_GREETING_CACHE': '1',
+        'PLS_QUOTES_FILE': str(quotes_path),
+        'COLUMNS': '80',
+    }
+
+    rendered = run_python(home, RUN_MAIN, env=env).stdout
+    cached = run_python(home, RUN_MAIN, env=env).stdout
+    assert cached.endswith('\n[]\n')
+    # The header line holds the time, which may have moved on.
+    assert cached.splitlines()[1:-1] == rendered.splitlines()[1:]
+    assert '"A plain quote"' in cached
+    assert 'Task 3' in cached
+
+    run_python(home, RUN_MAIN, 'add', 'Task 4', env=env)
+    cached = run_python(home, RUN_MAIN, env=env).stdout
+    assert cached.endswith('\n[]\n')
+    assert 'Task 4' in cached
@@ -1,10 +1,15 @@
-from unittest.mock import patch
+import json
+from unittest.mock import PropertyMock, patch
 
 from freezegun import freeze_time
+from rich.console import Console
 from typer.testing import CliRunner
 
 from pls_cli import __version__
 from pls_cli.please import app
+from pls_cli.utils import codec
+from pls_cli.utils.archive import Archive
+from pls_cli.utils.settings import Settings
 
 try:
     from importlib.metadata import version  # Python 3.8+
@@ -111,7 +116,7 @@ def test_config_ok_no_tasks_pending_with_progress(
     return_value={
         'user_name': 'Test name',
         'initial_setup_done': True,
-        'tasks': [{'name': 'Task 1', 'done': False}],
+        'tasks': [{'name': 'Task 1', 'done': False, 'rank': 'V'}],
     },
 )
 @patch('pls_cli.utils.settings.Settings.write_settings')
@@ -232,10 +237,10 @@ def test_edit_empty_tasks(mock_write_settings, mock_get_settings):
         'user_name': 'Test name',
         'initial_setup_done': True,
         'tasks': [
-            {'name': 'Task 1', 'done': False},
-            {'name': 'Task 2', 'done': False},
-            {'name': 'Task 3', 'done': False},
-            {'name': 'Task 4', 'done': False},
+            {'name': 'Task 1', 'done': False, 'rank': 'C'},
+            {'name': 'Task 2', 'done': False, 'rank': 'P'},
+            {'name': 'Task 3', 'done': False, 'rank': 'c'},
+            {'name': 'Task 4', 'done': False, 'rank': 'p'},
         ],
     },
 )
@@ -261,6 +266,10 @@ def test_move_task_success(mock_write_settings, mock_get_settings):
     assert '3 Task 3 ○' in single_spaces
     assert '4 Task 1 ○' in single_spaces
 
+    (change,) = mock_write_settings.call_args[0][1]
+    assert change['op'] == 'move'
+    assert 'P' < change['rank'] < 'c'
+
 
 @patch(
     'pls_cli.utils.settings.Settings.get_settings',
@@ -503,6 +512,54 @@ def test_clean_command_success(
     assert 'Done Tasks Deleted' in result.stdout
 
 
+def test_clean_command_writes_the_config(home, monkeypatch):
+    monkeypatch.setattr(codec, '_codec', codec.load_codec('auto'))
+    config_dir = home / '.config' / 'pls'
+    config_dir.mkdir(parents=True)
+    (config_dir / 'config.json').write_text(
+        json.dumps(
+            {
+                'user_name': 'Test name',
+                'initial_setup_done': True,
+                'last_task_id': 2,
+                'tasks': [
+                    {'id': '1', 'name': 'Task 1', 'done': True, 'rank': 'V'},
+                    {'id': '2', 'name': 'Task 2', 'done': False, 'rank': 'k'},
+                ],
+            }
+        )
+    )
+    result = runner.invoke(app, ['clean'], input='y\n')
+    assert result.exit_code == 0
+    assert 'Done Tasks Deleted' in result.stdout
+
+    Settings().wait_for_write()
+    with open(config_dir / 'config.json') as config_file:
+        assert json.load(config_file)['tasks'] == [
+            {'id': '2', 'name': 'Task 2', 'done': False, 'rank': 'k'}
+        ]
+
+
+@patch(
+    'pls_cli.utils.settings.Settings.search_tasks',
+    return_value=([('1', 'Buy milk'), ('2', 'Buy bread')], 3),
+)
+def test_search_command(mock_search_tasks):
+    result = runner.invoke(app, ['search', 'buy', '--limit', '2'])
+    assert result.exit_code == 0
+    mock_search_tasks.assert_called_once_with(['buy'], 2)
+    assert '@1' in result.stdout
+    assert 'Buy bread' in result.stdout
+    assert 'Showing 2 of 3 matches' in result.stdout
+
+
+@patch('pls_cli.utils.settings.Settings.search_tasks', return_value=([], 0))
+def test_search_command_no_match(mock_search_tasks):
+    result = runner.invoke(app, ['search', 'nothing'])
+    assert result.exit_code == 0
+    assert 'No tasks match your search' in result.stdout
+
+
 @patch(
     'pls_cli.utils.settings.Settings.get_settings',
     return_value={
@@ -539,6 +596,16 @@ def test_count_undone_command(mock_count_tasks_undone, mock_get_settings):
     assert '1' in result.stdout
 
 
+@patch(
+    'pls_cli.utils.settings.Settings.get_status',
+    return_value={'done': 1, 'undone': 1, 'total': 2, 'next': 'Task 2'},
+)
+def test_status_command(mock_get_status):
+    result = runner.invoke(app, ['status'])
+    assert result.exit_code == 0
+    assert result.stdout == '1/2 Task 2\n'
+
+
 @patch(
     'pls_cli.utils.settings.Settings.get_settings',
     return_value={
@@ -701,3 +768,415 @@ def test_showtasks_command(mock_get_tasks, mock_get_settings):
     result = runner.invoke(app, ['tasks'])
     assert result.exit_code == 0
     assert 'TASK' in result.stdout
+
+
+@patch(
+    'pls_cli.utils.settings.Settings.get_settings',
+    return_value={
+        'user_name': 'Test name',
+        'initial_setup_done': True,
+        'tasks': [
+            {'name': '[todo] Fix list[int]', 'done': False},
+            {'name': '[b]Bold[/] and :star:', 'done': False},
+        ],
+    },
+)
+def test_showtasks_markup_in_task_names(mock_get_settings):
+    result = runner.invoke(app, ['tasks'])
+    assert result.exit_code == 0
+    assert '[todo] Fix list[int]' in result.stdout
+    assert 'Bold and ⭐' in result.stdout
+
+
+@patch(
+    'pls_cli.utils.settings.Settings.get_settings',
+    return_value={
+        'user_name': 'Test name',
+        'initial_setup_done': True,
+        'show_task_progress': True,
+        'tasks': [
+            {'name': 'Task 1', 'done': True},
+            {'name': 'Task 2', 'done': False},
+            {'name': 'Task 3', 'done': False},
+        ],
+    },
+)
+@patch('threading.Thread.start')
+def test_showtasks_progress_bar(mock_thread_start, mock_get_settings):
+    result = runner.invoke(app, ['tasks'])
+    assert result.exit_code == 0
+    assert '━━━━━━━━━━' in result.stdout
+    assert '1/3' in result.stdout
+    mock_thread_start.assert_not_called()
+
+
+@patch(
+    'pls_cli.utils.settings.Settings.get_settings',
+    return_value={
+        'user_name': 'Test name',
+        'initial_setup_done': True,
+        'tasks': [],
+    },
+)
+@patch('pls_cli.utils.settings.Settings.write_settings')
+def test_add_many_tasks(mock_write_settings, mock_get_settings):
+    result = runner.invoke(
+        app, ['add', 'Task 1', '-', 'Task 4'], input='Task 2\n\nTask 3\n'
+    )
+    assert result.exit_code == 0
+    assert 'Added 4 tasks to the list' in result.stdout
+    mock_write_settings.assert_called_once()
+    assert [
+        task['name'] for task in mock_get_settings.return_value['tasks']
+    ] == ['Task 1', 'Task 2', 'Task 3', 'Task 4']
+
+
+@patch(
+    'pls_cli.utils.settings.Settings.get_settings',
+    return_value={
+        'user_name': 'Test name',
+        'initial_setup_done': True,
+        'tasks': [{'name': f'Task {n}', 'done': n == 2} for n in range(1, 7)],
+    },
+)
+@patch('pls_cli.utils.settings.Settings.write_settings')
+def test_done_many_tasks(mock_write_settings, mock_get_settings):
+    result = runner.invoke(app, ['done', '1', '2-4', '6'])
+    assert result.exit_code == 0
+    assert 'Updated Task List' in result.stdout
+    mock_write_settings.assert_called_once()
+    assert [
+        task['done'] for task in mock_get_settings.return_value['tasks']
+    ] == [True, True, True, True, False, True]
+    assert [
+        change['index'] for change in mock_write_settings.call_args[0][1]
+    ] == [0, 2, 3, 5]
+
+
+@patch(
+    'pls_cli.utils.settings.Settings.get_settings',
+    return_value={
+        'user_name': 'Test name',
+        'initial_setup_done': True,
+        'tasks': [
+            {'name': 'Task 1', 'done': False},
+            {'name': 'Task 2', 'done': False},
+        ],
+    },
+)
+@patch('pls_cli.utils.settings.Settings.write_settings')
+def test_done_many_tasks_invalid_range(mock_write_settings, mock_get_settings):
+    result = runner.invoke(app, ['done', '1', '2-3'])
+    assert result.exit_code == 0
+    assert (
+        'Are you sure you gave me the correct ID to mark as done?'
+        in result.stdout
+    )
+    mock_write_settings.assert_not_called()
+    assert not mock_get_settings.return_value['tasks'][0]['done']
+
+
+@patch(
+    'pls_cli.utils.settings.Settings.get_settings',
+    return_value={
+        'user_name': 'Test name',
+        'initial_setup_done': True,
+        'tasks': [{'name': f'Task {n}', 'done': True} for n in range(1, 5)],
+    },
+)
+@patch('pls_cli.utils.settings.Settings.write_settings')
+def test_undone_many_tasks(mock_write_settings, mock_get_settings):
+    result = runner.invoke(app, ['undone', '1-2', '4'])
+    assert result.exit_code == 0
+    assert 'Updated Task List' in result.stdout
+    mock_write_settings.assert_called_once()
+    assert [
+        task['done'] for task in mock_get_settings.return_value['tasks']
+    ] == [False, False, True, False]
+
+
+@patch(
+    'pls_cli.utils.settings.Settings.get_settings',
+    return_value={
+        'user_name': 'Test name',
+        'initial_setup_done': True,
+        'tasks': [{'name': f'Task {n}', 'done': False} for n in range(1, 6)],
+    },
+)
+@patch('pls_cli.utils.settings.Settings.write_settings')
+def test_delete_many_tasks(mock_write_settings, mock_get_settings):
+    result = runner.invoke(app, ['del', '2-3', '5'])
+    assert result.exit_code == 0
+    assert 'Deleted 3 tasks' in result.stdout
+    mock_write_settings.assert_called_once()
+    assert [
+        task['name'] for task in mock_get_settings.return_value['tasks']
+    ] == ['Task 1', 'Task 4']
+    assert [
+        change['index'] for change in mock_write_settings.call_args[0][1]
+    ] == [4, 2, 1]
+
+
+TEN_TASKS = {
+    'user_name': 'Test name',
+    'initial_setup_done': True,
+    'tasks': [
+        {'name': f'Task {n:02d}', 'done': n % 3 == 0} for n in range(1, 11)
+    ],
+}
+
+
+def shown_task_ids(output):
+    return [
+        int(line.split()[0])
+        for line in output.splitlines()
+        if 'Task ' in line and line.split()[0].isdigit()
+    ]
+
+
+@patch('pls_cli.utils.settings.Settings.get_settings', return_value=TEN_TASKS)
+def test_showtasks_page(mock_get_settings):
+    result = runner.invoke(app, ['tasks', '--page', '2', '--page-size', '4'])
+    assert result.exit_code == 0
+    assert shown_task_ids(result.stdout) == [5, 6, 7, 8]
+    assert 'Page 2 of 3' in result.stdout
+
+
+@patch('pls_cli.utils.settings.Settings.get_settings', return_value=TEN_TASKS)
+def test_showtasks_pending_only_head_and_tail(mock_get_settings):
+    result = runner.invoke(app, ['tasks', '--pending-only', '--head', '3'])
+    assert result.exit_code == 0
+    assert shown_task_ids(result.stdout) == [1, 2, 4]
+
+    result = runner.invoke(app, ['tasks', '--tail', '2'])
+    assert result.exit_code == 0
+    assert shown_task_ids(result.stdout) == [9, 10]
+
+
+@patch('pls_cli.please.STREAM_TASKS_THRESHOLD', 5)
+@patch('pls_cli.utils.settings.Settings.get_settings', return_value=TEN_TASKS)
+def test_showtasks_streams_large_lists(mock_get_settings):
+    result = runner.invoke(app, ['tasks', '--head', '3'])
+    assert result.exit_code == 0
+    assert result.stdout == '1\tTask 01\t○\n2\tTask 02\t○\n3\tTask 03\t✓\n'
+
+
+@patch(
+    'pls_cli.utils.settings.Settings.get_settings',
+    return_value={
+        'user_name': 'Test name',
+        'initial_setup_done': True,
+        'last_task_id': 35,
+        'tasks': [],
+    },
+)
+@patch('pls_cli.utils.settings.Settings.write_settings')
+def test_add_task_reports_its_id(mock_write_settings, mock_get_settings):
+    result = runner.invoke(app, ['add', 'Task 1'])
+    assert result.exit_code == 0
+    assert 'Added "Task 1" to the list as @10' in result.stdout
+    assert mock_get_settings.return_value['last_task_id'] == 36
+    assert mock_write_settings.call_args[0][1][-1] == {
+        'op': 'set',
+        'key': 'last_task_id',
+        'value': 36,
+    }
+
+
+@patch(
+    'pls_cli.utils.settings.Settings.get_settings',
+    return_value={
+        'user_name': 'Test name',
+        'initial_setup_done': True,
+        'tasks': [
+            {'id': 'a', 'name': 'Task 1', 'done': False},
+            {'id': 'b', 'name': 'Task 2', 'done': False},
+            {'id': 'c', 'name': 'Task 3', 'done': False},
+        ],
+    },
+)
+@patch('pls_cli.utils.settings.Settings.write_settings')
+def test_done_task_by_id(mock_write_settings, mock_get_settings):
+    result = runner.invoke(app, ['done', '@c', '1'])
+    assert result.exit_code == 0
+    assert [
+        task['done'] for task in mock_get_settings.return_value['tasks']
+    ] == [True, False, True]
+
+    result = runner.invoke(app, ['done', '@z'])
+    assert (
+        'Are you sure you gave me the correct ID to mark as done?'
+        in result.stdout
+    )
+
+
+@patch(
+    'pls_cli.utils.settings.Settings.get_settings',
+    return_value={
+        'user_name': 'Test name',
+        'initial_setup_done': True,
+        'tasks': [
+            {'id': 'k2', 'name': 'Task 1', 'done': False},
+            {'id': 'k3', 'name': 'Task 2', 'done': True},
+        ],
+    },
+)
+def test_showtasks_ids(mock_get_settings):
+    result = runner.invoke(app, ['tasks', '--ids'])
+    assert result.exit_code == 0
+    assert '@k2' in result.stdout
+    assert '@k3' in result.stdout
+
+    result = runner.invoke(app, ['tasks'])
+    assert '@k2' not in result.stdout
+
+
+@patch(
+    'pls_cli.utils.settings.Settings.get_settings',
+    return_value={
+        'user_name': 'Test name',
+        'initial_setup_done': True,
+        'tasks': [
+            {'id': '1', 'name': 'Task 1', 'done': True},
+            {'id': '2', 'name': 'Task 2', 'done': False},
+            {'id': '3', 'name': 'Task 3', 'done': True},
+        ],
+    },
+)
+@patch('pls_cli.utils.settings.Settings.write_settings')
+def test_archive_command(mock_write_settings, mock_get_settings, tmp_path):
+    archive = Archive(str(tmp_path))
+    with patch(
+        'pls_cli.utils.settings.Settings.get_archive', return_value=archive
+    ):
+        result = runner.invoke(app, ['archive'])
+    assert result.exit_code == 0
+    assert 'Archived 2 tasks' in result.stdout
+    assert [task['id'] for task in mock_get_settings.return_value['tasks']] == [
+        '2'
+    ]
+    assert mock_write_settings.call_args[0][1] == [
+        {'op': 'delete', 'index': 2, 'id': '3'},
+        {'op': 'delete', 'index': 0, 'id': '1'},
+    ]
+    assert [task['id'] for task in archive.iter_tasks()] == ['3', '1']
+
+
+@freeze_time('2024-01-10')
+@patch(
+    'pls_cli.utils.settings.Settings.get_settings',
+    return_value={
+        'user_name': 'Test name',
+        'initial_setup_done': True,
+        'archive_after_days': 7,
+        'tasks': [
+            {'id': '1', 'name': 'Old', 'done': True, 'done_at': '2024-01-02'},
+            {'id': '2', 'name': 'New', 'done': True, 'done_at': '2024-01-09'},
+        ],
+    },
+)
+@patch('pls_cli.utils.settings.Settings.write_settings')
+@patch('pls_cli.utils.settings.Settings.exists_settings', return_value=True)
+def test_greeting_auto_archives(
+    mock_exists_settings, mock_write_settings, mock_get_settings, tmp_path
+):
+    archive = Archive(str(tmp_path))
+    with patch(
+        'pls_cli.utils.settings.Settings.get_archive', return_value=archive
+    ):
+        result = runner.invoke(app, [])
+    assert result.exit_code == 0
+    assert [task['id'] for task in archive.iter_tasks()] == ['1']
+    assert mock_write_settings.call_args[0][1] == [
+        {'op': 'delete', 'index': 0, 'id': '1'},
+        {'op': 'set', 'key': 'last_auto_archive', 'value': '2024-01-10'},
+    ]
+
+    mock_write_settings.reset_mock()
+    runner.invoke(app, [])
+    mock_write_settings.assert_not_called()
+
+
+@patch(
+    'pls_cli.utils.settings.Settings.get_settings',
+    return_value={
+        'user_name': 'Test name',
+        'initial_setup_done': True,
+        'tasks': [{'id': '1', 'name': 'Task 1', 'done': False, 'rank': 'V'}],
+    },
+)
+@patch('pls_cli.utils.settings.Settings.write_settings')
+def test_archive_restore_command(
+    mock_write_settings, mock_get_settings, tmp_path
+):
+    archive = Archive(str(tmp_path))
+    archive.append(
+        [{'id': '2', 'name': 'Task 2', 'done': True, 'rank': 'k'}],
+        '2024-01-01',
+    )
+    with patch(
+        'pls_cli.utils.settings.Settings.get_archive', return_value=archive
+    ):
+        result = runner.invoke(app, ['archive', 'restore', '@2'])
+        assert 'Restored "Task 2"' in result.stdout
+        result = runner.invoke(app, ['archive', 'restore', '@2'])
+        assert 'correct ID to restore' in result.stdout
+    assert mock_get_settings.return_value['tasks'][-1] == {
+        'id': '2',
+        'name': 'Task 2',
+        'done': True,
+        'rank': 'W',
+    }
+    assert list(archive.iter_tasks()) == []
+
+
+def test_archive_restore_same_id_twice(tmp_path):
+    archive = Archive(str(tmp_path / 'archive'))
+    archive.append(
+        [{'id': '2', 'name': 'Task 2', 'done': True, 'rank': 'k'}],
+        '2024-01-01',
+    )
+    settings = {
+        'user_name': 'Test name',
+        'tasks': [{'id': '1', 'name': 'Task 1', 'done': False, 'rank': 'V'}],
+    }
+    with patch(
+        'pls_cli.utils.settings.Settings.get_archive', return_value=archive
+    ), patch(
+        'pls_cli.utils.settings.Settings.get_settings', return_value=settings
+    ), patch('pls_cli.utils.settings.Settings.write_settings'):
+        result = runner.invoke(app, ['archive', 'restore', '@2', '@2'])
+    assert 'Restored "Task 2"' in result.stdout
+    assert [task['id'] for task in settings['tasks']] == ['1', '2']
+
+
+def test_archive_restore_keeps_tasks_until_written(tmp_path):
+    archive = Archive(str(tmp_path / 'archive'))
+    archive.append(
+        [{'id': '2', 'name': 'Task 2', 'done': True, 'rank': 'k'}],
+        '2024-01-01',
+    )
+    with patch(
+        'pls_cli.utils.settings.Settings.get_archive', return_value=archive
+    ), patch(
+        'pls_cli.utils.settings.Settings.write_settings',
+        side_effect=OSError('full'),
+    ):
+        result = runner.invoke(app, ['archive', 'restore', '@2'])
+    assert isinstance(result.exception, OSError)
+    assert [task['id'] for task in archive.iter_tasks()] == ['2']
+
+
+@patch('pls_cli.utils.settings.Settings.get_settings', return_value=TEN_TASKS)
+@patch('pls_cli.utils.settings.Settings.write_settings')
+def test_only_tasks_command_opens_pager(mock_write_settings, mock_get_settings):
+    with patch.object(
+        Console, 'is_terminal', new_callable=PropertyMock, return_value=True
+    ), patch.object(
+        Console, 'height', new_callable=PropertyMock, return_value=5
+    ), patch.object(Console, 'pager') as mock_pager:
+        runner.invoke(app, ['done', '1'])
+        assert not mock_pager.called
+
+        runner.invoke(app, ['tasks'])
+        assert mock_pager.called
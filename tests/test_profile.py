@@ -0,0 +1,43 @@
+from unittest.mock import patch
+
+from pls_cli.utils import profile
+
+
+def task_count(tasks):
+    return len(tasks)
+
+
+def test_disabled_profiler_returns_functions_untouched():
+    with patch.object(profile, 'ENABLED', False):
+        assert profile.profiled('count')(task_count) is task_count
+        assert profile.phase('count') is profile.phase('other')
+
+
+def test_enabled_profiler_records_phases():
+    phases = {}
+    with patch.object(profile, 'ENABLED', True), patch.object(
+        profile, '_phases', phases
+    ):
+        counted = profile.profiled('count')(task_count)
+        with profile.phase('load'):
+            assert counted([1, 2]) == 2
+            assert counted([]) == 0
+
+    assert list(phases) == ['load', 'count']
+    assert phases['load']['depth'] == 0
+    assert phases['count']['depth'] == 1
+    assert phases['count']['calls'] == 2
+
+
+def test_format_phases():
+    table = profile.format_phases(
+        {
+            'show': {'depth': 0, 'calls': 1, 'seconds': 0.25, 'bytes': 2048},
+            'showtasks': {'depth': 1, 'calls': 2, 'seconds': 0.1, 'bytes': 0},
+        },
+        0.5,
+    )
+    lines = table.splitlines()
+    assert lines[1].split() == ['show', '1', '250.0', '2.0']
+    assert lines[2].startswith('  showtasks')
+    assert lines[3].split() == ['total', '500.0']
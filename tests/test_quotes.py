@@ -0,0 +1,82 @@
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+from pls_cli.utils.quotes import (
+    BUILTIN_QUOTES_PATH,
+    QuoteStore,
+    build_quote_offsets,
+    get_quote_store,
+)
+from pls_cli.utils.settings import Settings
+
+QUOTES = [
+    {'content': 'First quote', 'author': 'Someone'},
+    {'content': 'Ação – “segunda” citação', 'author': 'Alguém'},
+    {'content': 'Third quote', 'author': 'Someone else'},
+]
+
+
+@pytest.fixture
+def quotes_path(tmp_path):
+    path = tmp_path / 'quotes.json'
+    with open(path, 'w', encoding='utf-8') as quotes_file:
+        json.dump(QUOTES, quotes_file, indent=2, ensure_ascii=False)
+    return path
+
+
+def test_build_quote_offsets(quotes_path):
+    raw = quotes_path.read_bytes()
+    quotes = [
+        json.loads(raw[start:end])
+        for start, end in build_quote_offsets(str(quotes_path))
+    ]
+    assert quotes == QUOTES
+
+
+def test_builtin_quotes_index():
+    with open(BUILTIN_QUOTES_PATH, encoding='utf-8') as quotes_file:
+        assert len(build_quote_offsets(BUILTIN_QUOTES_PATH)) == len(
+            json.load(quotes_file)
+        )
+
+
+def test_random_quote_builds_and_reuses_index(quotes_path, tmp_path):
+    store = QuoteStore(str(quotes_path), str(tmp_path / 'quotes.idx'))
+    assert store.random_quote() in QUOTES
+    assert os.path.exists(tmp_path / 'quotes.idx')
+
+    with patch.object(QuoteStore, 'build_index') as mock_build_index:
+        for _ in range(10):
+            assert store.random_quote() in QUOTES
+        mock_build_index.assert_not_called()
+
+
+def test_random_quote_rebuilds_stale_index(quotes_path, tmp_path):
+    store = QuoteStore(str(quotes_path), str(tmp_path / 'quotes.idx'))
+    store.random_quote()
+
+    new_quote = {'content': 'Only quote left', 'author': 'Someone'}
+    with open(quotes_path, 'w', encoding='utf-8') as quotes_file:
+        json.dump([new_quote], quotes_file)
+    assert store.random_quote() == new_quote
+
+
+def test_random_quote_empty_pack(tmp_path):
+    path = tmp_path / 'quotes.json'
+    path.write_text('[]')
+    store = QuoteStore(str(path), str(tmp_path / 'quotes.idx'))
+    assert store.random_quote() is None
+
+
+def test_quote_store_from_env(quotes_path, tmp_path, monkeypatch):
+    monkeypatch.setenv('PLS_QUOTES_FILE', str(quotes_path))
+    # The config directory is all it needs, not the settings of a list.
+    with patch.object(Settings, '__init__', side_effect=AssertionError):
+        store = get_quote_store()
+    assert store.quotes_path == str(quotes_path)
+    assert store.index_path == str(
+        tmp_path / '.config' / 'pls' / 'quotes-custom.idx'
+    )
@@ -0,0 +1,69 @@
+import random
+
+import pytest
+
+from pls_cli.utils.ranks import (
+    MAX_RANK_LENGTH,
+    appended_rank,
+    assign_task_ranks,
+    balanced_ranks,
+    moved_rank,
+    rank_between,
+)
+
+
+def test_rank_between():
+    assert rank_between(None, None) == 'V'
+    assert rank_between('V', None) == 'W'
+    assert rank_between(None, 'V') == 'U'
+    assert rank_between('A', 'C') == 'B'
+    assert rank_between('A', 'B') == 'AV'
+    assert rank_between('z', None) == 'z1'
+    assert rank_between(None, '1') == '0z'
+    with pytest.raises(ValueError):
+        rank_between('B', 'A')
+
+
+def test_rank_between_random_inserts_stay_sorted():
+    ranks = ['V']
+    for _ in range(500):
+        index = random.randint(0, len(ranks))
+        before = ranks[index - 1] if index > 0 else None
+        after = ranks[index] if index < len(ranks) else None
+        ranks.insert(index, rank_between(before, after))
+    assert ranks == sorted(set(ranks))
+    assert not any(rank.endswith('0') for rank in ranks)
+
+
+def test_balanced_ranks():
+    assert balanced_ranks(3) == ['F', 'V', 'k']
+    ranks = balanced_ranks(5000)
+    assert ranks == sorted(set(ranks))
+    assert max(map(len, ranks)) == 3
+
+
+def test_appended_rank_needs_rebalance_eventually():
+    tasks = [{'rank': 'z' * MAX_RANK_LENGTH}]
+    assert appended_rank(tasks) is None
+    assert appended_rank([]) == 'V'
+
+
+def test_moved_rank():
+    tasks = [{'rank': rank} for rank in ['F', 'V', 'k']]
+    assert moved_rank(tasks, 0, 2) > 'V'
+    assert moved_rank(tasks, 2, 0) < 'F'
+    assert 'F' < moved_rank(tasks, 2, 1) < 'V'
+    assert 'V' < moved_rank(tasks, 0, 1) < 'k'
+    with pytest.raises(IndexError):
+        moved_rank(tasks, 0, 3)
+
+
+def test_assign_task_ranks():
+    data = {'tasks': [{'name': 'Task 1'}, {'name': 'Task 2', 'rank': 'A'}]}
+    assert assign_task_ranks(data)
+    assert [task['rank'] for task in data['tasks']] == ['K', 'f']
+    assert not assign_task_ranks(data)
+
+    data['tasks'].reverse()
+    assert assign_task_ranks(data)
+    assert [task['name'] for task in data['tasks']] == ['Task 1', 'Task 2']
@@ -0,0 +1,75 @@
+import json
+import tracemalloc
+
+import pytest
+
+from pls_cli.utils import scan
+from pls_cli.utils.status import summarize
+
+CONFIGS = [
+    {'user_name': 'Test name', 'tasks': []},
+    {'user_name': 'Test name'},
+    {
+        'user_name': 'Test name',
+        'tasks': [
+            {'name': 'Task 1', 'done': True, 'id': '1'},
+            {'done': False, 'name': 'Task 2', 'id': '2'},
+            {'name': 'Task 3', 'done': False, 'id': '3'},
+        ],
+    },
+    {
+        'settings': {'tasks': [{'name': 'Not a task', 'done': False}]},
+        'tasks': [
+            {'name': 'a "done": false, {"done": false}', 'done': True},
+            {'name': 'ends with a backslash \\', 'done': True},
+            {'name': '\\"done": false', 'done': False},
+        ],
+        'last_task_id': 3,
+    },
+    {'tasks': [{'name': 'Done', 'done': True}], 'show_quotes': False},
+]
+
+
+def write_config(tmp_path, data, indent):
+    path = tmp_path / 'config.json'
+    path.write_text(json.dumps(data, indent=indent), encoding='utf-8')
+    return str(path)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 5, 64 * 1024])
+@pytest.mark.parametrize('indent', [None, 2])
+@pytest.mark.parametrize('data', CONFIGS)
+def test_scan_matches_decoded_config(
+    tmp_path, monkeypatch, chunk_size, indent, data
+):
+    monkeypatch.setattr(scan, 'CHUNK_SIZE', chunk_size)
+    path = write_config(tmp_path, data, indent)
+    tasks = data.get('tasks', [])
+    assert scan.summarize_config(path) == summarize(tasks)
+    assert scan.all_tasks_done(path) == all(task['done'] for task in tasks)
+
+
+def test_scan_rejects_truncated_config(tmp_path):
+    path = tmp_path / 'config.json'
+    path.write_text('{"tasks": [{"name": "Task 1", "do', encoding='utf-8')
+    with pytest.raises(ValueError):
+        scan.summarize_config(str(path))
+
+
+def test_scan_memory_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(scan, 'CHUNK_SIZE', 16 * 1024)
+    tasks = [
+        {'name': f'Task {index}', 'done': index % 3 == 0, 'id': str(index)}
+        for index in range(100_000)
+    ]
+    path = write_config(tmp_path, {'tasks': tasks}, 2)
+
+    tracemalloc.start()
+    try:
+        status = scan.summarize_config(path)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    assert status['total'] == 100_000
+    assert peak < 256 * 1024
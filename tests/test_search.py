@@ -0,0 +1,136 @@
+import pytest
+
+from pls_cli.utils import search
+from pls_cli.utils.search import SearchIndex, tokenize
+
+
+@pytest.fixture
+def index(tmp_path):
+    search_index = SearchIndex(str(tmp_path / 'search.db'))
+    yield search_index
+    search_index.close()
+
+
+def test_tokenize():
+    assert tokenize('Fix the CLI, fix it!') == ['fix', 'the', 'cli', 'it']
+
+
+def test_search_matches_word_prefixes(index):
+    index.add('1', 'Write the release notes')
+    index.add('2', 'Rewrite tests')
+    assert index.search(['wri'], 10) == ([('1', 'Write the release notes')], 1)
+    assert index.search(['RE'], 10) == (
+        [('1', 'Write the release notes'), ('2', 'Rewrite tests')],
+        2,
+    )
+
+
+def test_search_needs_every_term(index):
+    index.add('1', 'Buy milk')
+    index.add('2', 'Buy bread')
+    assert index.search(['buy', 'bre'], 10) == ([('2', 'Buy bread')], 1)
+    assert index.search(['milk bread'], 10) == ([], 0)
+    assert index.search(['!!'], 10) == ([], 0)
+
+
+def test_search_limit_keeps_count(index):
+    for number in range(1, 6):
+        index.add(str(number), f'Task {number}')
+    rows, count = index.search(['task'], 2)
+    assert rows == [('1', 'Task 1'), ('2', 'Task 2')]
+    assert count == 5
+
+
+def test_search_past_count_limit_walks_tasks(index, monkeypatch):
+    monkeypatch.setattr(search, 'COUNT_LIMIT', 3)
+    for number in range(1, 6):
+        index.add(str(number), f'Task {number}')
+    index.add('6', 'Something else')
+    assert index.search(['task'], 2) == ([('1', 'Task 1'), ('2', 'Task 2')], 3)
+    assert index.search(['task', '4'], 2) == ([('4', 'Task 4')], 1)
+
+
+def test_search_oldest_first(index):
+    index.sync(
+        [
+            {'id': 'a', 'name': 'Task ten', 'done': False},
+            {'id': '2', 'name': 'Task two', 'done': False},
+            {'id': '10', 'name': 'Task thirty-six', 'done': False},
+        ],
+        'stamp',
+    )
+    index.add('2', 'Task two, renamed')
+    expected = [
+        ('2', 'Task two, renamed'),
+        ('a', 'Task ten'),
+        ('10', 'Task thirty-six'),
+    ]
+    assert index.search(['task'], 10) == (expected, 3)
+    assert index.search(['task', 't'], 2) == (expected[:2], 3)
+
+
+def test_search_past_count_limit_oldest_first(index, monkeypatch):
+    monkeypatch.setattr(search, 'COUNT_LIMIT', 2)
+    for task_id in ('10', 'a', '2'):
+        index.add(task_id, f'Task {task_id}')
+    assert index.search(['task'], 2) == ([('2', 'Task 2'), ('a', 'Task a')], 2)
+
+
+def test_by_rarity(index):
+    for number in range(1, 6):
+        index.add(str(number), f'Common task {number}')
+    index.add('6', 'Common rare')
+    assert index.by_rarity(['com', 'rare', 'task']) == ['rare', 'task', 'com']
+
+
+def test_add_replaces_name(index):
+    index.add('1', 'Old name')
+    index.add('1', 'New name')
+    assert index.search(['old'], 10) == ([], 0)
+    assert index.search(['name'], 10) == ([('1', 'New name')], 1)
+
+
+def test_apply_changes(index):
+    data = {'tasks': [{'id': '1', 'name': 'First', 'done': False}]}
+    index.apply(data, [{'op': 'add', 'task': data['tasks'][0]}], 'a')
+    data['tasks'][0]['name'] = 'Renamed'
+    index.apply(
+        data,
+        [
+            {'op': 'update', 'index': 0, 'fields': {'name': 'Renamed'}},
+            {'op': 'update', 'index': 0, 'fields': {'done': True}},
+        ],
+        'b',
+    )
+    assert index.search(['renamed'], 10) == ([('1', 'Renamed')], 1)
+    assert index.stamp == 'b'
+
+    data['tasks'].pop()
+    index.apply(data, [{'op': 'delete', 'index': 0, 'id': '1'}], 'c')
+    assert index.search(['renamed'], 10) == ([], 0)
+    assert index.stamp == 'c'
+
+
+def test_apply_delete_without_id_resyncs(index):
+    index.add('1', 'First')
+    index.add('2', 'Second')
+    data = {'tasks': [{'id': '2', 'name': 'Second', 'done': False}]}
+    index.apply(data, [{'op': 'delete', 'index': 0}], 'stamp')
+    assert index.search(['first'], 10) == ([], 0)
+    assert index.search(['second'], 10) == ([('2', 'Second')], 1)
+
+
+def test_sync(index):
+    index.add('1', 'Stale')
+    index.add('2', 'Kept')
+    index.sync(
+        [
+            {'id': '2', 'name': 'Kept', 'done': False},
+            {'id': '3', 'name': 'Fresh', 'done': False},
+        ],
+        'stamp',
+    )
+    assert index.search(['stale'], 10) == ([], 0)
+    assert index.search(['kept'], 10) == ([('2', 'Kept')], 1)
+    assert index.search(['fresh'], 10) == ([('3', 'Fresh')], 1)
+    assert index.stamp == 'stamp'
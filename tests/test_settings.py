@@ -0,0 +1,544 @@
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+from typer.testing import CliRunner
+
+from pls_cli.please import app
+from pls_cli.utils import (
+    codec,
+    settings as settings_module,
+)
+from pls_cli.utils.settings import Settings
+from pls_cli.utils.sqlite_store import SqliteStore
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def config_dir(home):
+    config_dir = home / '.config' / 'pls'
+    config_dir.mkdir(parents=True)
+    return config_dir
+
+
+def write_config(config_dir, data):
+    Settings().wait_for_write()
+    with open(config_dir / 'config.json', 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+
+def test_get_settings_parses_file_once(config_dir):
+    write_config(
+        config_dir,
+        {
+            'user_name': 'Test name',
+            'tasks': [
+                {'name': 'Task 1', 'done': True},
+                {'name': 'Task 2', 'done': False},
+            ],
+        },
+    )
+    with patch('pls_cli.utils.codec.loads', wraps=codec.loads) as mock_load:
+        settings = Settings()
+        assert settings.get_name() == 'Test name'
+        assert settings.count_tasks_done() == 1
+        assert settings.count_tasks_undone() == 1
+        assert not Settings().all_tasks_done()
+        assert mock_load.call_count == 1
+
+
+def test_get_settings_reloads_after_external_change(config_dir):
+    write_config(config_dir, {'user_name': 'Old name', 'tasks': []})
+    assert Settings().get_name() == 'Old name'
+
+    write_config(config_dir, {'user_name': 'New longer name', 'tasks': []})
+    assert Settings().get_name() == 'New longer name'
+
+
+def test_write_settings_refreshes_snapshot(config_dir):
+    write_config(config_dir, {'user_name': 'Test name', 'tasks': []})
+    settings = Settings().get_settings()
+    settings['tasks'].append({'name': 'Task 1', 'done': False})
+    Settings().write_settings(settings)
+
+    with patch('json.load') as mock_load:
+        assert Settings().count_tasks_undone() == 1
+        mock_load.assert_not_called()
+
+
+def test_invalidate_drops_unsaved_changes(config_dir):
+    write_config(config_dir, {'user_name': 'Test name', 'tasks': []})
+    Settings().get_settings()['user_name'] = 'Unsaved'
+    Settings().invalidate()
+    assert Settings().get_name() == 'Test name'
+
+
+def test_write_settings_writes_in_background(config_dir):
+    write_config(config_dir, {'user_name': 'Test name', 'tasks': []})
+    settings = Settings().get_settings()
+    settings['tasks'].append({'id': '1', 'name': 'Task 1', 'done': False})
+    Settings().write_settings(settings)
+    assert Settings().count_tasks_undone() == 1
+
+    Settings().wait_for_write()
+    assert settings_module._locks[Settings().lock_path].depth == 0
+    with open(config_dir / 'config.json') as config_file:
+        assert json.load(config_file)['tasks'][0]['name'] == 'Task 1'
+    with open(config_dir / 'config.lock') as lock_file:
+        assert lock_file.read() == '1'
+    with patch('json.load') as mock_load:
+        assert Settings().get_status()['undone'] == 1
+        mock_load.assert_not_called()
+
+
+def test_background_write_error_is_raised(config_dir):
+    write_config(config_dir, {'user_name': 'Test name', 'tasks': []})
+    settings = Settings().get_settings()
+    settings['user_name'] = 'New name'
+    with patch(
+        'pls_cli.utils.durability.write_atomic', side_effect=OSError('full')
+    ):
+        Settings().write_settings(settings)
+        with pytest.raises(OSError, match='full'):
+            Settings().wait_for_write()
+
+    assert settings_module._locks[Settings().lock_path].depth == 0
+    assert Settings().get_name() == 'Test name'
+
+
+def test_wait_for_writes_of_every_list(config_dir):
+    Settings('work').create_list()
+    settings = Settings('work').get_settings()
+    settings['tasks'] = [{'id': '1', 'name': 'Task 1', 'done': False}]
+    with patch(
+        'pls_cli.utils.durability.write_atomic', side_effect=OSError('full')
+    ):
+        Settings('work').write_settings(settings)
+        # The list in use is another one by now.
+        Settings().wait_for_write()
+        with pytest.raises(OSError, match='full'):
+            settings_module.wait_for_writes()
+    assert settings_module._writes == {}
+
+
+def test_get_settings_without_file(config_dir):
+    assert not os.path.exists(config_dir / 'config.json')
+    assert Settings().get_settings() == {'user_name': '', 'tasks': []}
+
+
+@pytest.fixture
+def journal_storage(config_dir, monkeypatch):
+    monkeypatch.setenv('PLS_STORAGE', 'journal')
+    write_config(config_dir, {'user_name': 'Test name', 'tasks': []})
+    return config_dir
+
+
+def test_journal_appends_changes_without_rewriting(journal_storage):
+    config_before = (journal_storage / 'config.json').read_text()
+    settings = Settings().get_settings()
+    new_task = {'id': '1', 'name': 'Task 1', 'done': False, 'rank': 'V'}
+    settings['tasks'].append(new_task)
+    Settings().write_settings(settings, [{'op': 'add', 'task': new_task}])
+    settings['tasks'].update_task(0, {'done': True})
+    Settings().write_settings(
+        settings, [{'op': 'update', 'index': 0, 'fields': {'done': True}}]
+    )
+
+    assert (journal_storage / 'config.json').read_text() == config_before
+    assert (
+        len((journal_storage / 'config.journal').read_text().splitlines()) == 2
+    )
+
+    Settings().invalidate()
+    assert Settings().get_tasks() == [
+        {'id': '1', 'name': 'Task 1', 'done': True, 'rank': 'V'}
+    ]
+
+
+def test_journal_replay_skips_torn_record(journal_storage):
+    with open(journal_storage / 'config.journal', 'w') as journal_file:
+        journal_file.write(
+            '{"op":"add","task":'
+            '{"id":"1","name":"Task 1","done":false,"rank":"V"}}\n'
+            '{"op":"add","task":{"na'
+        )
+    assert Settings().get_tasks() == [
+        {'id': '1', 'name': 'Task 1', 'done': False, 'rank': 'V'}
+    ]
+
+
+def test_journal_append_after_torn_record(journal_storage):
+    with open(journal_storage / 'config.journal', 'w') as journal_file:
+        journal_file.write('{"op":"add","task":{"na')
+    settings = Settings().get_settings()
+    for task_id in ('1', '2'):
+        new_task = {'id': task_id, 'name': f'Task {task_id}', 'done': False}
+        settings['tasks'].append(new_task)
+        Settings().write_settings(settings, [{'op': 'add', 'task': new_task}])
+
+    Settings().invalidate()
+    assert [task['id'] for task in Settings().get_tasks()] == ['1', '2']
+
+
+def test_journal_corrupt_record_raises(journal_storage):
+    with open(journal_storage / 'config.journal', 'w') as journal_file:
+        journal_file.write('{"op":"add","task":{"na\n{"op":"set"}\n')
+    with pytest.raises(ValueError):
+        Settings().get_settings()
+
+
+def test_journal_full_write_folds_journal(journal_storage):
+    settings = Settings().get_settings()
+    settings['user_name'] = 'New name'
+    Settings().write_settings(
+        settings, [{'op': 'set', 'key': 'user_name', 'value': 'New name'}]
+    )
+    settings['tasks'] = []
+    Settings().write_settings(settings)
+    Settings().wait_for_write()
+
+    assert not os.path.exists(journal_storage / 'config.journal')
+    with open(journal_storage / 'config.json') as config_file:
+        assert json.load(config_file)['user_name'] == 'New name'
+
+
+def test_journal_compacts_past_threshold(journal_storage, monkeypatch):
+    monkeypatch.setenv('PLS_JOURNAL_MAX_BYTES', '100')
+    settings = Settings().get_settings()
+    for index in range(5):
+        new_task = {'name': f'Task {index}', 'done': False}
+        settings['tasks'].append(new_task)
+        Settings().write_settings(settings, [{'op': 'add', 'task': new_task}])
+    Settings().wait_for_compaction()
+
+    journal_size = Settings().journal.size()
+    assert journal_size <= 100
+    Settings().invalidate()
+    assert len(Settings().get_tasks()) == 5
+
+
+@pytest.fixture
+def sqlite_storage(config_dir, monkeypatch):
+    monkeypatch.setenv('PLS_STORAGE', 'sqlite')
+    write_config(
+        config_dir,
+        {
+            'user_name': 'Test name',
+            'show_quotes': False,
+            'last_task_id': 3,
+            'tasks': [
+                {'id': '1', 'name': 'Task 1', 'done': True},
+                {'id': '2', 'name': 'Task 2', 'done': False},
+                {'id': '3', 'name': 'Task 3', 'done': False},
+            ],
+        },
+    )
+    return config_dir
+
+
+def test_sqlite_migrates_config_json(sqlite_storage):
+    settings = Settings()
+    assert settings.get_name() == 'Test name'
+    assert not settings.show_quotes()
+    assert settings.count_tasks_done() == 1
+    assert settings.count_tasks_undone() == 2
+    assert os.path.exists(sqlite_storage / 'config.db')
+    assert [task['name'] for task in settings.iter_tasks()] == [
+        'Task 1',
+        'Task 2',
+        'Task 3',
+    ]
+
+
+def test_sqlite_applies_changes(sqlite_storage):
+    settings = Settings().get_settings()
+    Settings().write_settings(
+        settings,
+        [
+            {'op': 'update', 'index': 1, 'fields': {'done': True}},
+            {'op': 'delete', 'index': 0},
+            {
+                'op': 'add',
+                'task': {
+                    'id': '4',
+                    'name': 'Task 4',
+                    'done': False,
+                    'rank': 'x',
+                },
+            },
+            {'op': 'move', 'from': 2, 'to': 0, 'rank': 'A'},
+            {'op': 'swap', 'first': 1, 'second': 2},
+            {'op': 'set', 'key': 'user_name', 'value': 'New name'},
+        ],
+    )
+
+    Settings().invalidate()
+    assert Settings().get_settings() == {
+        'user_name': 'New name',
+        'show_quotes': False,
+        'last_task_id': 3,
+        'tasks': [
+            {'id': '4', 'name': 'Task 4', 'done': False, 'rank': 'A'},
+            {'id': '3', 'name': 'Task 3', 'done': False, 'rank': 'V'},
+            {'id': '2', 'name': 'Task 2', 'done': True, 'rank': 'k'},
+        ],
+    }
+    assert Settings().get_all_tasks_undone() == [
+        {'id': '4', 'name': 'Task 4', 'done': False, 'rank': 'A'},
+        {'id': '3', 'name': 'Task 3', 'done': False, 'rank': 'V'},
+    ]
+
+
+def test_sqlite_repeated_moves_keep_order(sqlite_storage):
+    tasks = [
+        {'id': str(index), 'name': f'Task {index}', 'done': False}
+        for index in range(4)
+    ]
+    Settings().write_settings({'user_name': 'Test name', 'tasks': tasks})
+    # Always moving the last task to second place keeps halving the same
+    # gap, which eventually forces a renumber.
+    for _ in range(80):
+        Settings().write_settings(
+            Settings().get_settings(), [{'op': 'move', 'from': 3, 'to': 1}]
+        )
+        tasks.insert(1, tasks.pop(3))
+
+    assert [task['id'] for task in Settings().iter_tasks()] == [
+        task['id'] for task in tasks
+    ]
+
+
+def test_sqlite_changes_rows_without_loading_tasks(sqlite_storage):
+    Settings().get_settings()  # Gives the tasks their rank keys.
+    Settings().invalidate()
+
+    with patch.object(SqliteStore, 'load', side_effect=AssertionError):
+        for args in (
+            ['done', '2', '@3'],
+            ['undone', '1'],
+            ['move', '3', '1'],
+            ['swap', '2', '3'],
+            ['del', '@2'],
+        ):
+            assert runner.invoke(app, args).exit_code == 0
+        assert [
+            (task['id'], task['done']) for task in Settings().iter_tasks()
+        ] == [('3', True), ('1', False)]
+        assert Settings().get_status() == {
+            'done': 1,
+            'undone': 1,
+            'total': 2,
+            'next': 'Task 1',
+            'stamp': Settings().get_store_stamp(),
+        }
+
+
+def test_sqlite_greeting_without_loading_tasks(sqlite_storage):
+    Settings().get_settings()
+    Settings().invalidate()
+
+    with patch.object(SqliteStore, 'load', side_effect=AssertionError):
+        result = runner.invoke(app, [])
+    assert result.exit_code == 0
+    assert 'Task 1' in result.stdout
+
+
+def test_sqlite_row_changes_follow_tasks_moved_meanwhile(sqlite_storage):
+    Settings().get_settings()
+    Settings().invalidate()
+    settings = Settings()
+    task = settings.get_task_rows()[2]
+    assert task['id'] == '3'
+
+    # Another process deletes the first task in between.
+    with settings.lock() as lock:
+        settings.get_store().apply([{'op': 'delete', 'index': 0}])
+        lock.write_version(lock.read_version() + 1)
+
+    settings.change_tasks(
+        [{'op': 'update', 'index': 2, 'id': '3', 'fields': {'name': 'New'}}]
+    )
+    assert [task['name'] for task in Settings().iter_tasks()] == [
+        'Task 2',
+        'New',
+    ]
+
+
+def test_write_settings_updates_status_cache(config_dir):
+    Settings().write_settings(
+        {
+            'user_name': 'Test name',
+            'tasks': [
+                {'name': 'Task 1', 'done': True},
+                {'name': 'Task 2', 'done': False},
+            ],
+        }
+    )
+    Settings().wait_for_write()
+    with open(config_dir / 'status.json') as status_file:
+        status = json.load(status_file)
+    assert status['done'] == 1
+    assert status['undone'] == 1
+    assert status['total'] == 2
+    assert status['next'] == 'Task 2'
+
+    with patch('json.load') as mock_load:
+        assert Settings().get_status()['next'] == 'Task 2'
+        mock_load.assert_not_called()
+
+
+def test_status_cache_recomputed_when_stale(config_dir):
+    Settings().write_settings({'user_name': 'Test name', 'tasks': []})
+    write_config(
+        config_dir,
+        {
+            'user_name': 'Test name',
+            'tasks': [{'name': 'Task 1', 'done': False}],
+        },
+    )
+    assert Settings().get_status()['undone'] == 1
+
+    os.remove(config_dir / 'status.json')
+    assert Settings().get_status()['total'] == 1
+    assert os.path.exists(config_dir / 'status.json')
+
+
+def test_counts_scanned_without_decoding(config_dir):
+    write_config(
+        config_dir,
+        {
+            'user_name': 'Test name',
+            'tasks': [
+                {'name': 'Task 1', 'done': True},
+                {'name': 'Task 2', 'done': False},
+            ],
+        },
+    )
+    with patch('pls_cli.utils.codec.loads') as mock_load:
+        settings = Settings()
+        assert settings.count_tasks_done() == 1
+        assert settings.count_tasks_undone() == 1
+        assert not settings.all_tasks_done()
+        assert settings.get_status()['next'] == 'Task 2'
+        mock_load.assert_not_called()
+
+
+def test_status_without_config(config_dir):
+    assert Settings().get_status() == {
+        'done': 0,
+        'undone': 0,
+        'total': 0,
+        'next': None,
+    }
+
+
+def test_tasks_without_ids_are_migrated(config_dir):
+    write_config(
+        config_dir,
+        {
+            'user_name': 'Test name',
+            'tasks': [
+                {'name': 'Task 1', 'done': True},
+                {'name': 'Task 2', 'done': False},
+            ],
+        },
+    )
+    assert [task['id'] for task in Settings().get_tasks()] == ['1', '2']
+    Settings().wait_for_write()
+
+    with open(config_dir / 'config.json') as config_file:
+        data = json.load(config_file)
+    assert data['last_task_id'] == 2
+    assert [task['id'] for task in data['tasks']] == ['1', '2']
+
+
+def test_get_task_position(config_dir):
+    write_config(
+        config_dir,
+        {
+            'user_name': 'Test name',
+            'last_task_id': 40,
+            'tasks': [
+                {'id': 'z', 'name': 'Task 1', 'done': False},
+                {'id': '10', 'name': 'Task 2', 'done': False},
+            ],
+        },
+    )
+    settings = Settings()
+    assert settings.get_task_position('10') == 1
+    assert settings.get_task_position('z') == 0
+    with pytest.raises(KeyError):
+        settings.get_task_position('11')
+
+    data = settings.get_settings()
+    data['tasks'].reverse()
+    settings.write_settings(data)
+    assert settings.get_task_position('10') == 0
+
+
+def test_tasks_are_loaded_in_rank_order(config_dir):
+    write_config(
+        config_dir,
+        {
+            'user_name': 'Test name',
+            'last_task_id': 2,
+            'tasks': [
+                {'id': '1', 'name': 'Task 1', 'done': False, 'rank': 'k'},
+                {'id': '2', 'name': 'Task 2', 'done': False, 'rank': 'F'},
+            ],
+        },
+    )
+    assert [task['name'] for task in Settings().get_tasks()] == [
+        'Task 2',
+        'Task 1',
+    ]
+
+
+def test_search_index_follows_writes(config_dir):
+    write_config(
+        config_dir,
+        {
+            'user_name': 'Test name',
+            'tasks': [
+                {'name': 'Buy milk', 'done': False},
+                {'name': 'Walk the dog', 'done': False},
+            ],
+        },
+    )
+    settings = Settings()
+    assert settings.search_tasks(['mil'], 10) == ([('1', 'Buy milk')], 1)
+
+    data = settings.get_settings()
+    task = {'id': '3', 'name': 'Buy dog food', 'done': False, 'rank': 'x'}
+    data['tasks'].append(task)
+    settings.write_settings(data, [{'op': 'add', 'task': task}])
+    deleted = data['tasks'].pop(0)
+    settings.write_settings(
+        data, [{'op': 'delete', 'index': 0, 'id': deleted['id']}]
+    )
+    assert settings.search_tasks(['dog'], 10) == (
+        [('2', 'Walk the dog'), ('3', 'Buy dog food')],
+        2,
+    )
+    assert settings.search_tasks(['buy'], 10) == ([('3', 'Buy dog food')], 1)
+
+
+def test_search_index_resyncs_after_external_change(config_dir):
+    write_config(
+        config_dir,
+        {'user_name': 'Test name', 'tasks': [{'name': 'Old', 'done': False}]},
+    )
+    settings = Settings()
+    assert settings.search_tasks(['old'], 10)[1] == 1
+
+    write_config(
+        config_dir,
+        {
+            'user_name': 'Test name',
+            'tasks': [{'id': '1', 'name': 'Brand new', 'done': False}],
+        },
+    )
+    assert settings.search_tasks(['old'], 10) == ([], 0)
+    assert settings.search_tasks(['new'], 10) == ([('1', 'Brand new')], 1)
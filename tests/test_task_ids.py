@@ -0,0 +1,37 @@
+from pls_cli.utils.task_ids import (
+    assign_task_ids,
+    build_task_positions,
+    format_task_id,
+    new_task_ids,
+)
+
+
+def test_format_task_id():
+    assert format_task_id(0) == '0'
+    assert format_task_id(35) == 'z'
+    assert format_task_id(36) == '10'
+    assert format_task_id(1295) == 'zz'
+
+
+def test_new_task_ids():
+    data = {'last_task_id': 35}
+    assert new_task_ids(data, 2) == ['10', '11']
+    assert data['last_task_id'] == 37
+
+
+def test_assign_task_ids():
+    data = {
+        'last_task_id': 1,
+        'tasks': [
+            {'id': '1', 'name': 'Task 1', 'done': False},
+            {'name': 'Task 2', 'done': False},
+        ],
+    }
+    assert assign_task_ids(data)
+    assert data['tasks'][1]['id'] == '2'
+    assert not assign_task_ids(data)
+
+
+def test_build_task_positions():
+    tasks = [{'id': 'a', 'name': 'Task 1'}, {'id': 'b', 'name': 'Task 2'}]
+    assert build_task_positions(tasks) == {'a': 0, 'b': 1}
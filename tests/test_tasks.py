@@ -0,0 +1,113 @@
+import copy
+import json
+
+import pytest
+
+from pls_cli.utils import codec
+from pls_cli.utils.journal import apply_change
+from pls_cli.utils.tasks import TaskList
+
+
+def make_tasks(*done):
+    return TaskList(
+        {'name': f'Task {index}', 'done': value}
+        for index, value in enumerate(done)
+    )
+
+
+def assert_counts(tasks):
+    done = sum(1 for task in tasks if task['done'])
+    assert tasks.done_count == done
+    assert tasks.undone_count == len(tasks) - done
+
+
+def test_counts_on_load():
+    tasks = make_tasks(True, False, False)
+    assert tasks.done_count == 1
+    assert tasks.undone_count == 2
+
+
+def test_counts_follow_list_operations():
+    tasks = make_tasks(True, False, True, False)
+    tasks.append({'name': 'a', 'done': True})
+    assert_counts(tasks)
+    tasks.insert(0, {'name': 'b', 'done': True})
+    assert_counts(tasks)
+    tasks.extend([{'name': 'c', 'done': True}, {'name': 'd', 'done': False}])
+    assert_counts(tasks)
+    tasks += [{'name': 'e', 'done': True}]
+    assert isinstance(tasks, TaskList)
+    assert_counts(tasks)
+    tasks.pop(0)
+    assert_counts(tasks)
+    tasks.pop()
+    assert_counts(tasks)
+    tasks.remove(tasks[0])
+    assert_counts(tasks)
+    del tasks[1]
+    assert_counts(tasks)
+    del tasks[:2]
+    assert_counts(tasks)
+    tasks[0] = {'name': 'f', 'done': not tasks[0]['done']}
+    assert_counts(tasks)
+    tasks[:1] = [{'name': 'g', 'done': True}, {'name': 'h', 'done': True}]
+    assert_counts(tasks)
+    tasks.clear()
+    assert tasks.done_count == 0
+    assert tasks.undone_count == 0
+
+
+def test_update_task():
+    tasks = make_tasks(False, False)
+    tasks.update_task(0, {'done': True, 'done_at': '2026-10-18'})
+    tasks.update_task(0, {'done': True})
+    tasks.update_task(1, {'name': 'Renamed'})
+    assert tasks.done_count == 1
+    assert tasks[0]['done_at'] == '2026-10-18'
+    tasks.update_task(0, {'done': False})
+    assert tasks.done_count == 0
+
+
+def test_apply_change_keeps_counts():
+    data = {'tasks': make_tasks(False, True, False)}
+    changes = [
+        {'op': 'add', 'task': {'name': 'New', 'done': False}},
+        {'op': 'update', 'index': 0, 'fields': {'done': True}},
+        {'op': 'delete', 'index': 1},
+        {'op': 'move', 'from': 0, 'to': 2},
+        {'op': 'swap', 'first': 0, 'second': 1},
+    ]
+    for change in changes:
+        apply_change(data, change)
+        assert_counts(data['tasks'])
+
+
+def test_copies_and_json():
+    tasks = make_tasks(True, False)
+    copied = copy.deepcopy(tasks)
+    assert isinstance(copied, TaskList)
+    assert copied == tasks
+    assert copied.done_count == 1
+    assert json.loads(json.dumps(tasks, default=dict)) == list(tasks)
+    for name in ('json', 'orjson'):
+        try:
+            dumps = codec.load_codec(name).dumps
+        except ImportError:
+            continue
+        assert json.loads(dumps({'tasks': tasks})) == {'tasks': tasks}
+
+
+def test_tasks_are_read_only():
+    tasks = make_tasks(False, True)
+    with pytest.raises(TypeError):
+        tasks[0]['done'] = True
+    for task in (*tasks, *reversed(tasks), *tasks[:]):
+        with pytest.raises(TypeError):
+            task['done'] = False
+    assert_counts(tasks)
+
+    copied = TaskList(tasks)
+    copied.extend(tasks)
+    copied.update_task(2, {'done': True})
+    assert copied.done_count == 3
+    assert tasks[0]['done'] is False
@@ -0,0 +1,47 @@
+import json
+
+from rich.default_styles import DEFAULT_STYLES
+from rich.style import Style
+
+from pls_cli.utils.theme import DEFAULT_THEME, load_theme
+
+
+def test_defaults(tmp_path):
+    theme = load_theme(str(tmp_path / 'theme.json'))
+    assert theme['PLS_TASK_DONE_STYLE'] == Style.parse('#a0a0a0')
+    assert theme['PLS_BACKGROUND_BAR_STYLE'] == DEFAULT_STYLES['bar.back']
+    assert set(theme) == set(DEFAULT_THEME)
+
+
+def test_env_overrides_theme_file(tmp_path, monkeypatch):
+    path = tmp_path / 'theme.json'
+    path.write_text(
+        json.dumps(
+            {
+                'PLS_TASK_DONE_STYLE': '#9399B2',
+                'PLS_TASK_PENDING_STYLE': '#CBA6F7 bold',
+            }
+        )
+    )
+    monkeypatch.setenv('PLS_TASK_PENDING_STYLE', 'red')
+    theme = load_theme(str(path))
+    assert theme['PLS_TASK_DONE_STYLE'] == Style.parse('#9399B2')
+    assert theme['PLS_TASK_PENDING_STYLE'] == Style.parse('red')
+
+
+def test_invalid_style_falls_back_to_default(tmp_path, monkeypatch):
+    monkeypatch.setenv('PLS_QUOTE_STYLE', 'not a style')
+    theme = load_theme(str(tmp_path / 'theme.json'))
+    assert theme['PLS_QUOTE_STYLE'] == Style.parse('#a0a0a0')
+
+
+def test_compiled_once_per_change(tmp_path):
+    path = tmp_path / 'theme.json'
+    path.write_text(json.dumps({'PLS_QUOTE_STYLE': 'blue'}))
+    theme = load_theme(str(path))
+    assert load_theme(str(path)) is theme
+
+    path.write_text(json.dumps({'PLS_QUOTE_STYLE': 'green on black'}))
+    assert load_theme(str(path))['PLS_QUOTE_STYLE'] == Style.parse(
+        'green on black'
+    )